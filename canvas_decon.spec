@@ -47,6 +47,8 @@ a = Analysis(
         'func.getQuizStatus',
         'func.utilPdfBookmark',
         'func.utilPdfSplitter',
+        # Custom widgets of .ui files
+        'gui._internal.wgtRecordList',
         # Dynamically imported login/ modules
         'login.getCookie',
         'login.getTotp',
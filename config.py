@@ -33,6 +33,7 @@ HIS_TODO_FILE = os.path.join(JSONS_DIR, 'his_todo.json')
 LEARN_PREFERENCES_FILE = os.path.join(JSONS_DIR, 'learn_preferences.json')
 PREFERENCES_FILE = os.path.join(JSONS_DIR, 'preferences.json')
 DONE_FILE = os.path.join(JSONS_DIR, 'Done.txt')
+AI_LEDGER_DB = os.path.join(AAFS_DIR, 'ai_ledger.sqlite3')  # One row per AI call (tokens, latency, cost)
 
 # TODO 工作目录 (统一自动化工作空间)
 TODO_DIR = os.path.join(AAFS_DIR, 'todo')
@@ -43,6 +44,19 @@ COURSES_DIR = os.path.join(AAFS_DIR, 'courses')
 # 输出目录 (统一所有生成文件: quiz + homework)
 OUTPUT_DIR = os.path.join(AAFS_DIR, 'output')
 
+# 缓存目录 (内容哈希寻址, 可随时删除重建)
+CACHE_DIR = os.path.join(AAFS_DIR, 'cache')
+DECON_CACHE_DIR = os.path.join(CACHE_DIR, 'decon')
+REPORTS_CACHE_DIR = os.path.join(CACHE_DIR, 'reports')
+ENCODED_CACHE_DIR = os.path.join(CACHE_DIR, 'encoded')  # base64 payloads for inline AI uploads
+CHUNKS_CACHE_DIR = os.path.join(CACHE_DIR, 'chunks')  # map-step checkpoints of chunked reports
+RESPONSES_CACHE_DIR = os.path.join(CACHE_DIR, 'responses')  # opt-in AI response cache (gzip, LRU by size)
+CONVERTED_CACHE_DIR = os.path.join(CACHE_DIR, 'converted')  # Office → PDF conversions
+SOFFICE_PROFILE_DIR = os.path.join(CACHE_DIR, 'soffice')  # private LibreOffice profiles (one per instance)
+PAGES_CACHE_DIR = os.path.join(CACHE_DIR, 'pages')  # per-page text of PDFs for the retrieval index
+HTML_CACHE_DIR = os.path.join(CACHE_DIR, 'html')  # rendered markdown (tabs, reports, previews)
+THUMBS_CACHE_DIR = os.path.join(CACHE_DIR, 'thumbs')  # downscaled preview images (content-addressed)
+
 # Legacy compatibility
 SUBMISSION_DIR = OUTPUT_DIR
 QUIZ_RES_DIR = OUTPUT_DIR
@@ -174,3 +188,4 @@ def ensure_dirs():
     os.makedirs(TODO_DIR, exist_ok=True)
     os.makedirs(COURSES_DIR, exist_ok=True)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
@@ -1,13 +1,17 @@
 """AI Utilities - Model listing and API calls for Gemini/Claude"""
-import os, sys, re, time, base64
+import os, sys, re, time, json, base64, threading
 import requests
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import config
+from func.utilTokens import OUTPUT_RESERVE
+from func.mgrRateLimit import (MAX_RETRIES, get_rate_limiter, is_rate_limit_error, retry_hint, backoff,
+                               estimate_request_tokens)
 
 # Fallback models
 FALLBACK_GEMINI = ['gemini-2.5-pro', 'gemini-2.5-flash', 'gemini-2.0-flash']
 FALLBACK_CLAUDE = ['claude-opus-4-5-20251101', 'claude-sonnet-4-5-20250929', 'claude-haiku-4-5-20251001']
+CLAUDE_FILES_BETA = 'files-api-2025-04-14'
 
 
 # === Model Listing ===
@@ -34,7 +38,7 @@ def _sort_claude(name):
 
 
 def get_gemini_models(api_key=None):
-    """Get sorted Gemini model list"""
+    """Get sorted Gemini model list (network - prefer get_best_model / get_all_models)"""
     api_key = api_key or getattr(config, 'GEMINI_API_KEY', None)
     if not api_key:
         return FALLBACK_GEMINI
@@ -53,7 +57,7 @@ def get_gemini_models(api_key=None):
 
 
 def get_claude_models(api_key=None):
-    """Get sorted Claude model list"""
+    """Get sorted Claude model list (network - prefer get_best_model / get_all_models)"""
     api_key = api_key or getattr(config, 'CLAUDE_API_KEY', None)
     if not api_key:
         return FALLBACK_CLAUDE
@@ -70,32 +74,65 @@ def get_claude_models(api_key=None):
 
 
 def get_all_models():
-    """Get all models (for GUI)"""
-    return {'Gemini': get_gemini_models(), 'Claude': get_claude_models()}
+    """Get all models (for GUI) - cached, see func/mgrModels"""
+    from func.mgrModels import get_model_registry
+    return get_model_registry().all()
 
 
 def get_best_model(product):
-    """Get best model for product"""
-    if product == 'Gemini':
-        return get_gemini_models()[0] if get_gemini_models() else "gemini-2.5-pro"
-    return get_claude_models()[0] if get_claude_models() else "claude-opus-4-5-20251101"
+    """Get best model for product (no network on the hot path)"""
+    if product == 'Fake':
+        return FAKE_MODEL
+    from func.mgrModels import get_model_registry
+    return get_model_registry().best(product)
 
 
-# === File Upload ===
+# === Client Pool ===
+
+_clients = {}  # product -> (api_key, client)
+_clients_lock = threading.Lock()
+
 
-def upload_files(files, product):
-    """Pre-upload files for API calls"""
+def _new_client(product, api_key):
     if product == 'Gemini':
-        return _upload_gemini(files)
+        from google import genai
+        return genai.Client(api_key=api_key)
     elif product == 'Claude':
-        return _upload_claude(files)
+        import anthropic
+        return anthropic.Anthropic(api_key=api_key, base_url="https://api.anthropic.com")
     raise ValueError(f"Unknown product: {product}")
 
 
+def get_client(product):
+    """Shared SDK client for product
+
+    SDK clients are thread-safe and keep an HTTP connection pool, so batch
+    workers share connections instead of paying setup + TLS per call.
+    Rebuilt lazily when config.reload_config() changed the API key.
+    """
+    api_key = config.GEMINI_API_KEY if product == 'Gemini' else config.CLAUDE_API_KEY
+    with _clients_lock:
+        cached = _clients.get(product)
+        if cached and cached[0] == api_key:
+            return cached[1]
+        client = _new_client(product, api_key)
+        _clients[product] = (api_key, client)  # Old client stays usable for in-flight calls
+        return client
+
+
+# === File Upload ===
+
+def upload_files(files, product, keys=None, margin=None):
+    """Pre-upload files for API calls (parallel, reuses live uploads - see func/mgrUploads)
+
+    margin: Remaining lifetime (s) a reused upload must have (default mgrUploads.EXPIRY_MARGIN)
+    """
+    return get_provider(product).upload(files, keys, margin)
+
+
 def _upload_gemini(files):
-    """Gemini file upload"""
-    from google import genai
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
+    """Gemini file upload (uncached, sequential)"""
+    client = get_client('Gemini')
     uploaded = []
     for f in files:
         if os.path.exists(f):
@@ -124,65 +161,756 @@ def _upload_claude(files):
 
 # === AI Calls ===
 
-def call_ai(prompt, product, model, files=[], uploaded_info=None, thinking=False, status_callback=None):
-    """Unified AI call interface"""
-    if product == 'Gemini':
-        return _call_gemini(prompt, model, uploaded_info, status_callback)
-    elif product == 'Claude':
-        return _call_claude(prompt, model, uploaded_info, thinking)
-    raise ValueError(f"Unknown product: {product}")
-
+def call_ai(prompt, product, model, files=[], uploaded_info=None, thinking=False, status_callback=None, on_chunk=None,
+            prefix=None, usage=None, cache=False, max_tokens=None):
+    """Unified AI call interface
+
+    on_chunk: Optional callable(text) - stream the response; each text delta is
+              passed as it arrives. The full text is still returned.
+    prefix:   Optional stable instruction block shared by many calls. It is sent
+              first and marked for provider prompt caching; prompt is then only
+              the per-call suffix.
+    usage:    Optional PromptCacheStats collecting input / cached token counts.
+    cache:    Answer identical requests from the local response cache
+              (func/mgrResponseCache). Hits are reported via status_callback;
+              a streamed hit arrives as a single chunk.
+    max_tokens: Output limit (default OUTPUT_RESERVE, one report); raise it for
+              responses holding several reports.
+
+    Every call (hits and failures included) is written to the AI ledger
+    (func/mgrLedger): tokens, latency, time to first chunk, retries, cost.
+
+    Calls are admitted by the shared limiter of (product, model) (func/mgrRateLimit).
+    Throttling errors are retried - with the server's retry hint or jittered backoff -
+    as long as nothing has been streamed yet; waits are reported via status_callback.
+    """
+    key = None
+    if cache:
+        content_keys = [i.get('content_key') for i in uploaded_info or []]
+        if all(content_keys):  # Attachments without a content hash cannot be keyed
+            key = response_cache_key(prompt, product, model, content_keys, prefix, thinking)
+            text = cached_response(key, status_callback)
+            if text is not None:
+                _record_call(product, model, {'latency': 0}, cache_hit=True)
+                if on_chunk:
+                    on_chunk(text)
+                return text
+
+    call = {}  # Filled by the provider call (tokens) and _call_limited (timings, retries)
+    provider = get_provider(product)
+
+    def attempt(info):
+        send = lambda chunk: provider.call(prompt, model, info, thinking, chunk, prefix, usage, call, max_tokens)
+        return _call_limited(product, model, estimate_request_tokens(prompt, prefix, info), send, on_chunk,
+                             status_callback, call)
 
-def _call_gemini(prompt, model, uploaded_info=None, status_callback=None):
-    """Gemini API call with retry"""
-    from google import genai
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
-    contents = [prompt] + ([i['uploaded_obj'] for i in uploaded_info] if uploaded_info else [])
-
-    for attempt in range(3):
+    try:
+        try:
+            text = attempt(uploaded_info)
+        except Exception as e:
+            from func.mgrUploads import get_upload_manager, is_stale_handle_error
+            if product not in ('Gemini', 'Claude') or 'ttfb' in call or not is_stale_handle_error(e, uploaded_info):
+                raise
+            # Registered upload deleted on the provider side: drop the handles, upload again, retry once
+            print(f"[WARN] {product} rejected an uploaded file ({e}) - re-uploading")
+            if status_callback:
+                status_callback(f"[WARN] {product} lost an uploaded file - re-uploading")
+            text = attempt(get_upload_manager().refresh(uploaded_info, product))
+    except Exception as e:
+        _record_call(product, model, call, error=e)
+        raise
+    _record_call(product, model, call)
+
+    if key and text:
+        if call.get('stop_reason') in TRUNCATED:  # Never replay a report cut off at the output limit
+            print(f"[WARN] {product} response hit the output limit - not cached")
+        else:
+            from func.mgrResponseCache import get_response_cache
+            get_response_cache().put(key, text, model=model)
+    return text
+
+
+def _call_limited(product, model, tokens, send, on_chunk=None, status_callback=None, call=None):
+    """send(on_chunk) under the shared rate limiter, retrying throttling errors before the first streamed byte
+
+    call: optional dict receiving queued (s, limiter waits incl. cooldowns), latency
+          (s, last attempt), ttfb (s, first streamed chunk) and retries.
+    """
+    limiter = get_rate_limiter(product, model)
+    call = {} if call is None else call
+    call.setdefault('queued', 0.0)
+    streamed = []
+
+    def chunk(text):
+        if not streamed:
+            call['ttfb'] = time.monotonic() - call['sent']
+        streamed.append(True)
+        on_chunk(text)
+
+    for attempt in range(MAX_RETRIES + 1):
+        call['retries'] = attempt
+        queued = time.monotonic()
+        limiter.acquire(tokens)
+        call['sent'] = time.monotonic()
+        call['queued'] += call['sent'] - queued
         try:
-            return client.models.generate_content(model=model, contents=contents).text
+            return send(chunk if on_chunk else None)
         except Exception as e:
-            if "RESOURCE_EXHAUSTED" in str(e) or "429" in str(e):
-                if attempt < 2:
-                    wait = 60 * (attempt + 1)
-                    msg = f"[WARN] Rate limit. Waiting {wait}s..."
-                    print(msg)
-                    if status_callback:
-                        status_callback(msg)
-                    time.sleep(wait)
-                    continue
-            raise
-    return ""
-
-
-def _call_claude(prompt, model, uploaded_info=None, thinking=False):
-    """Claude API call"""
-    import anthropic
-    client = anthropic.Anthropic(api_key=config.CLAUDE_API_KEY, base_url="https://api.anthropic.com")
-
-    content = [{"type": "text", "text": prompt}]
+            # The caller already holds partial output once a byte was streamed
+            if streamed or not is_rate_limit_error(e) or attempt == MAX_RETRIES:
+                raise
+            hint = retry_hint(e)
+            wait = backoff(attempt, hint)
+            limiter.throttled(wait)  # Every caller of this model pauses, not just this thread
+            msg = f"[WARN] {product} rate limit - retry {attempt + 1}/{MAX_RETRIES} in {wait:.0f}s" + (" (server hint)" if hint else "")
+            print(msg)
+            if status_callback:
+                status_callback(msg)
+        finally:
+            call['latency'] = time.monotonic() - call['sent']
+
+
+def _record_call(product, model, call, error=None, cache_hit=False):
+    """Write one call_ai() outcome to the ledger (never raises)"""
+    ms = lambda key: int(call[key] * 1000) if call.get(key) is not None else None
+    try:
+        from func.mgrLedger import get_ledger
+        get_ledger().record(product, model, input_tokens=call.get('input_tokens', 0),
+                            output_tokens=call.get('output_tokens', 0), cached_tokens=call.get('cached_tokens', 0),
+                            cache_write_tokens=call.get('cache_write_tokens', 0), latency_ms=ms('latency'),
+                            ttfb_ms=ms('ttfb'), queued_ms=ms('queued') or 0, retries=call.get('retries', 0),
+                            cache_hit=int(cache_hit), ok=int(error is None),
+                            error=str(error)[:500] if error is not None else None)
+    except Exception as e:
+        print(f"[ai] ledger unavailable: {e}")
+
+
+# === Response Cache ===
+
+def response_cache_key(prompt, product, model, content_keys=(), prefix=None, thinking=False):
+    """Deterministic key of a request: model + prompt hash + attachment content hashes"""
+    from func.utilHash import sha256_text
+    return sha256_text(json.dumps([product, model, bool(thinking), sha256_text(prefix or ''), sha256_text(prompt),
+                                   list(content_keys)]))
+
+
+def cached_response(key, status_callback=None):
+    """Cached response text for key (see response_cache_key), or None"""
+    from func.mgrResponseCache import get_response_cache
+    text = get_response_cache().get(key)
+    if text is not None:
+        msg = f"♻️ Response cache hit ({len(text):,} chars, no AI call)"
+        print(f"[ai] {msg}")
+        if status_callback:
+            status_callback(msg)
+    return text
+
+
+# === Prompt Caching ===
+
+class PromptCacheStats:
+    """Thread-safe prompt-cache counters for one batch"""
+
+    def __init__(self):
+        self.calls = self.hits = 0
+        self.input_tokens = self.cached_tokens = self.cache_write_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, input_tokens=0, cached_tokens=0, cache_write_tokens=0):
+        with self._lock:
+            self.calls += 1
+            self.hits += 1 if cached_tokens else 0
+            self.input_tokens += input_tokens or 0
+            self.cached_tokens += cached_tokens or 0
+            self.cache_write_tokens += cache_write_tokens or 0
+
+    def summary(self):
+        rate = self.hits / self.calls * 100 if self.calls else 0
+        share = self.cached_tokens / self.input_tokens * 100 if self.input_tokens else 0
+        return (f"prompt cache: {self.hits}/{self.calls} calls hit ({rate:.0f}%), "
+                f"{self.cached_tokens:,} of {self.input_tokens:,} input tokens from cache ({share:.0f}%)")
+
+
+GEMINI_CACHE_TTL = 900  # Explicit context cache lifetime (s); refreshed on demand
+_gemini_caches = {}     # (model, prefix sha) → (cache name or None, expires_at)
+_gemini_pending = {}    # (model, prefix sha) → Future of a caches.create in flight
+_gemini_caches_lock = threading.Lock()
+
+
+def _gemini_cached_prefix(client, model, prefix):
+    """Name of a Gemini context cache holding prefix, or None (below the size minimum / unsupported)
+
+    Without an explicit cache the prefix is still sent first, so Gemini's
+    implicit caching can discount repeated prefixes. The lock only guards the
+    tables; one caller per key creates the cache while the others wait on it.
+    """
+    import hashlib
+    from concurrent.futures import Future
+    key = (model, hashlib.sha256(prefix.encode('utf-8')).hexdigest())
+    with _gemini_caches_lock:
+        name, expires = _gemini_caches.get(key, (None, 0))
+        if time.time() < expires - 60:
+            return name
+        pending = _gemini_pending.get(key)
+        if pending is None:
+            pending = _gemini_pending[key] = Future()
+            owner = True
+        else:
+            owner = False
+    if not owner:
+        return pending.result()
+    try:
+        from google.genai import types
+        cache = client.caches.create(model=model, config=types.CreateCachedContentConfig(
+            contents=[prefix], ttl=f"{GEMINI_CACHE_TTL}s"))
+        name = cache.name
+    except Exception as e:
+        print(f"[ai] Gemini context cache unavailable ({str(e)[:80]}), using implicit caching")
+        name = None
+    with _gemini_caches_lock:
+        _gemini_caches[key] = (name, time.time() + GEMINI_CACHE_TTL)
+        del _gemini_pending[key]
+    pending.set_result(name)
+    return name
+
+
+TRUNCATED = ('max_tokens', 'MAX_TOKENS')  # call['stop_reason'] of output cut off (Claude / Gemini)
+
+
+def _gemini_finish(response, call=None):
+    """Record the finish reason of a Gemini response (or last stream chunk) in call['stop_reason']"""
+    candidates = getattr(response, 'candidates', None)
+    if call is not None and candidates:
+        reason = getattr(candidates[0], 'finish_reason', None)
+        if reason is not None:
+            call['stop_reason'] = getattr(reason, 'name', str(reason))
+
+
+def _gemini_usage(usage, meta, call=None):
+    if meta is None:
+        return
+    total = getattr(meta, 'prompt_token_count', 0) or 0
+    cached = getattr(meta, 'cached_content_token_count', 0) or 0
+    if call is not None:  # Thinking tokens are billed as output
+        call.update(input_tokens=total, cached_tokens=cached,
+                    output_tokens=(getattr(meta, 'candidates_token_count', 0) or 0)
+                    + (getattr(meta, 'thoughts_token_count', 0) or 0))
+    if usage is not None:
+        usage.add(total, cached)
+
+
+def _claude_usage(usage, meta, call=None):
+    if meta is None:
+        return
+    cached = getattr(meta, 'cache_read_input_tokens', 0) or 0
+    written = getattr(meta, 'cache_creation_input_tokens', 0) or 0
+    total = (meta.input_tokens or 0) + cached + written
+    if call is not None:
+        call.update(input_tokens=total, cached_tokens=cached, cache_write_tokens=written,
+                    output_tokens=getattr(meta, 'output_tokens', 0) or 0)
+    if usage is not None:
+        usage.add(total, cached, written)
+
+
+def _gemini_part(info):
+    """Content part for an uploaded file (registry hits carry only the URI)"""
+    if info.get('uploaded_obj') is not None:
+        return info['uploaded_obj']
+    from google.genai import types
+    return types.Part.from_uri(file_uri=info['file_uri'], mime_type=info['mime_type'])
+
+
+def _call_gemini(prompt, model, uploaded_info=None, on_chunk=None, prefix=None, usage=None, call=None, max_tokens=None):
+    """Gemini API call (one attempt - retries and rate limiting are done by call_ai)"""
+    client = get_client('Gemini')
+    files = [_gemini_part(i) for i in uploaded_info] if uploaded_info else []
+    settings = {'max_output_tokens': max_tokens} if max_tokens else {}  # Default: the model's own limit
+    if prefix:
+        cache_name = _gemini_cached_prefix(client, model, prefix)
+        if cache_name:
+            settings['cached_content'] = cache_name
+            contents = [prompt] + files
+        else:
+            contents = [prefix, prompt] + files  # Stable prefix first → implicit cache hits
+    else:
+        contents = [prompt] + files
+    kwargs = {}
+    if settings:
+        from google.genai import types
+        kwargs['config'] = types.GenerateContentConfig(**settings)
+
+    if on_chunk is None:
+        response = client.models.generate_content(model=model, contents=contents, **kwargs)
+        _gemini_usage(usage, getattr(response, 'usage_metadata', None), call)
+        _gemini_finish(response, call)
+        return response.text
+    parts, meta = [], None
+    for chunk in client.models.generate_content_stream(model=model, contents=contents, **kwargs):
+        meta = getattr(chunk, 'usage_metadata', None) or meta
+        _gemini_finish(chunk, call)  # Set on the last chunk
+        if chunk.text:
+            parts.append(chunk.text)
+            on_chunk(chunk.text)
+    _gemini_usage(usage, meta, call)
+    return ''.join(parts)
+
+
+def _claude_source(info):
+    """Content source for an uploaded file: Files API reference, cached encoding or inline data"""
+    if info.get('file_id'):
+        return {"type": "file", "file_id": info['file_id']}
+    if info.get('data_file'):
+        if not os.path.exists(info['data_file']) and info.get('path'):  # Evicted since upload(): encode again
+            from func.mgrUploads import encoded_payload
+            info['data_file'] = encoded_payload(info['path'], info.get('content_key'))
+        with open(info['data_file'], 'r', encoding='ascii') as f:
+            data = f.read()
+    else:
+        data = info['data']
+    return {"type": "base64", "media_type": info['mime'], "data": data}
+
+
+def _claude_content(prompt, uploaded_info=None, prefix=None):
+    """Message content blocks + whether any block references the Files API
+
+    With a prefix: [prefix (cache breakpoint), files..., prompt] so the shared
+    instructions are a cacheable leading block.
+    """
+    content = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}] if prefix else []
+    if not prefix:
+        content.append({"type": "text", "text": prompt})
     if uploaded_info:
         for i in uploaded_info:
-            if i['type'] == 'image':
-                content.append({"type": "image", "source": {"type": "base64", "media_type": i['mime'], "data": i['data']}})
-            elif i['type'] == 'document':
-                content.append({"type": "document", "source": {"type": "base64", "media_type": i['mime'], "data": i['data']}})
+            if i['type'] in ('image', 'document'):
+                content.append({"type": i['type'], "source": _claude_source(i)})
+    if prefix:
+        content.append({"type": "text", "text": prompt})
+    return content, any(i.get('file_id') for i in uploaded_info or [])
+
 
-    params = {"model": model, "max_tokens": 16384, "messages": [{"role": "user", "content": content}]}
+def _call_claude(prompt, model, uploaded_info=None, thinking=False, on_chunk=None, prefix=None, usage=None,
+                 call=None, max_tokens=None):
+    """Claude API call (one attempt - retries and rate limiting are done by call_ai)"""
+    client = get_client('Claude')
+
+    content, uses_files = _claude_content(prompt, uploaded_info, prefix)
+    params = {"model": model, "max_tokens": max_tokens or OUTPUT_RESERVE, "messages": [{"role": "user", "content": content}]}
     if thinking:
         params["thinking"] = {"type": "enabled", "budget_tokens": 8000}
 
-    msg = client.messages.create(**params)
-    return next((b.text for b in msg.content if hasattr(b, 'text')), "")
+    if uses_files:
+        api, params["betas"] = client.beta.messages, [CLAUDE_FILES_BETA]
+    else:
+        api = client.messages
+
+    if on_chunk is None:
+        msg = api.create(**params)
+        _claude_usage(usage, getattr(msg, 'usage', None), call)
+        if call is not None:
+            call['stop_reason'] = getattr(msg, 'stop_reason', None)
+        return next((b.text for b in msg.content if hasattr(b, 'text')), "")
+
+    parts = []
+    with api.stream(**params) as stream:
+        for text in stream.text_stream:
+            parts.append(text)
+            on_chunk(text)
+        final = stream.get_final_message()
+        _claude_usage(usage, getattr(final, 'usage', None), call)
+        if call is not None:
+            call['stop_reason'] = getattr(final, 'stop_reason', None)
+    return ''.join(parts)
+
+
+# === Providers ===
+# A provider is anything with upload(files, keys) → uploaded_info and
+# call(prompt, model, uploaded_info, thinking, on_chunk, prefix, usage, call, max_tokens) → text
+# (call receives tokens and the stop reason, see TRUNCATED).
+# call() makes one attempt: rate limiting, retries, response cache and the ledger
+# are applied around it by call_ai. Register more with register_provider().
+
+class _GeminiProvider:
+    def upload(self, files, keys=None, margin=None):
+        from func.mgrUploads import EXPIRY_MARGIN, get_upload_manager
+        return get_upload_manager().upload(files, 'Gemini', keys, margin or EXPIRY_MARGIN)
+
+    def call(self, prompt, model, uploaded_info=None, thinking=False, on_chunk=None, prefix=None, usage=None, call=None,
+             max_tokens=None):
+        return _call_gemini(prompt, model, uploaded_info, on_chunk, prefix, usage, call, max_tokens)
+
+
+class _ClaudeProvider:
+    def upload(self, files, keys=None, margin=None):
+        from func.mgrUploads import EXPIRY_MARGIN, get_upload_manager
+        return get_upload_manager().upload(files, 'Claude', keys, margin or EXPIRY_MARGIN)
+
+    def call(self, prompt, model, uploaded_info=None, thinking=False, on_chunk=None, prefix=None, usage=None, call=None,
+             max_tokens=None):
+        return _call_claude(prompt, model, uploaded_info, thinking, on_chunk, prefix, usage, call, max_tokens)
+
+
+FAKE_MODEL = 'fake-model'
+
+# Simulated service (override with configure_fake() or FAKE_AI="ttfb=0.2,tps=800,rpm=60")
+FAKE_DEFAULTS = {
+    'ttfb': 0.5,                 # s before the first chunk
+    'tps': 400,                  # output tokens/s while streaming
+    'output_tokens': 800,        # length of a generated report
+    'jitter': 0.2,               # ± fraction applied to every delay
+    'rpm': 0,                    # server-side requests/min before 429s (0 = unlimited)
+    'rate_limit_rate': 0.0,      # probability of a random 429
+    'error_rate': 0.0,           # probability of a 500
+    'retry_after': 2,            # s suggested by 429s (0 = no hint)
+    'max_request_tokens': 1_000_000,
+    'max_file_bytes': 50 * 1024 * 1024,
+    'upload_mbps': 0,            # 0 = instant uploads
+    'seed': 0,                   # 0 = unseeded
+}
+
+
+class _FakeProvider:
+    """
+    Offline stand-in for a provider API (no network, no key)
+
+    Simulates first-chunk latency, streaming at a token rate, a server-side
+    requests/min quota and random 429s (with a retryDelay hint the limiter
+    parses), 500s, request/file size limits (400, not retried) and prompt
+    caching of repeated prefixes. Responses follow the requested shape:
+    packed reports get one section per file, TOC prompts get JSON, anything
+    else a markdown report of output_tokens tokens. Prompts containing
+    '[fake-error]' always fail.
+    """
+
+    def __init__(self):
+        self.settings = dict(FAKE_DEFAULTS)
+        for pair in filter(None, os.environ.get('FAKE_AI', '').split(',')):
+            key, _, value = pair.partition('=')
+            key = key.strip()
+            if key not in self.settings:
+                print(f"[WARN] FAKE_AI: unknown setting '{key}' ignored")
+                continue
+            try:
+                self.settings[key] = float(value)
+            except ValueError:  # Built at import: a typo must not take the app down
+                print(f"[WARN] FAKE_AI: bad value for {key} ({value!r}), using {self.settings[key]:g}")
+        self._lock = threading.Lock()
+        self._recent = []        # request timestamps (rpm quota)
+        self._prefixes = set()   # prefixes seen → served from "cache"
+        self._seed()
+
+    def _seed(self):
+        import random
+        self._rng = random.Random(self.settings['seed'] or None)
+
+    def configure(self, **settings):
+        unknown = set(settings) - set(FAKE_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown fake settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            self.settings.update(settings)
+            self._recent.clear()
+            self._seed()
+
+    def _sleep(self, seconds):
+        with self._lock:
+            factor = 1 + self._rng.uniform(-1, 1) * self.settings['jitter']
+        if seconds > 0:
+            time.sleep(seconds * factor)
+
+    def upload(self, files, keys=None, margin=None):
+        from func.utilHash import sha256_file
+        uploaded = []
+        for f, key in zip(files, keys or [None] * len(files)):
+            if not os.path.exists(f):
+                continue
+            size = os.path.getsize(f)
+            if self.settings['upload_mbps']:
+                self._sleep(size / (self.settings['upload_mbps'] * 1024 * 1024))
+            uploaded.append({'filename': os.path.basename(f), 'path': f, 'size': size, 'type': 'document',
+                             'content_key': key or sha256_file(f)})
+        return uploaded
+
+    def _admit(self):
+        """Server side of the quota: raise like the real APIs do"""
+        s = self.settings
+        hint = f" retryDelay: '{s['retry_after']:g}s'" if s['retry_after'] else ""
+        with self._lock:
+            now = time.time()
+            self._recent = [t for t in self._recent if now - t < 60]
+            if s['rpm'] and len(self._recent) >= s['rpm']:
+                raise RuntimeError(f"429 RESOURCE_EXHAUSTED: fake quota of {s['rpm']:g} requests/min exceeded.{hint}")
+            self._recent.append(now)
+            roll = self._rng.random()
+        if roll < s['rate_limit_rate']:
+            raise RuntimeError(f"429 RESOURCE_EXHAUSTED: fake rate limit.{hint}")
+        if roll < s['rate_limit_rate'] + s['error_rate']:
+            raise RuntimeError("500 INTERNAL: fake server error")
+
+    def _response(self, prompt, model, uploaded_info):
+        packed = re.findall(r'^### File: (.+)$', prompt, re.M) if '===== REPORT: ' in prompt else []
+        if packed:
+            return '\n\n'.join(f"===== REPORT: {name} =====\n# Fake report: {name}\n\nModel: {model}" for name in packed)
+        if 'Table of Contents' in prompt and 'JSON' in prompt:
+            return json.dumps({'delta': 0, 'chapters': [{'chapter': i, 'name': f"Fake Chapter {i}", 'book_page': 1 + (i - 1) * 10}
+                                                        for i in range(1, 4)]})
+        head = (f"# Fake report\n\nModel: {model}\nPrompt: {len(prompt):,} chars, "
+                f"{len(uploaded_info or [])} file(s)\n\n")
+        filler = "This paragraph stands in for generated text so timings and sizes look like a real report. "
+        body = ''.join(f"## Section {i + 1}\n\n{filler * 3}\n\n"
+                       for i in range(max(int(self.settings['output_tokens']) * 4 // (len(filler) * 3 + 20), 1)))
+        return head + body
+
+    def call(self, prompt, model, uploaded_info=None, thinking=False, on_chunk=None, prefix=None, usage=None, call=None,
+             max_tokens=None):
+        from func.utilTokens import estimate_tokens
+        s = self.settings
+        input_tokens = estimate_request_tokens(prompt, prefix, uploaded_info)
+        if input_tokens > s['max_request_tokens']:
+            raise RuntimeError(f"400 INVALID_ARGUMENT: request of ~{input_tokens:,} tokens exceeds the fake limit "
+                               f"of {s['max_request_tokens']:,.0f}")
+        too_big = [i['filename'] for i in uploaded_info or [] if (i.get('size') or 0) > s['max_file_bytes']]
+        if too_big:
+            raise RuntimeError(f"400 INVALID_ARGUMENT: file too large: {', '.join(too_big)}")
+        self._admit()
+        if '[fake-error]' in prompt:
+            raise RuntimeError("500 INTERNAL: fake error requested by prompt")
+
+        text = self._response(prompt, model, uploaded_info)
+        stop_reason = 'end_turn'
+        if max_tokens and estimate_tokens(text) > max_tokens:  # Cut off like a real model
+            text, stop_reason = text[:max_tokens * 4], 'max_tokens'
+        output_tokens = estimate_tokens(text)
+        self._sleep(s['ttfb'])
+        if on_chunk:
+            step = max(int(s['tps'] * 0.1) * 4, 1)  # ~100 ms of output per chunk
+            for i in range(0, len(text), step):
+                self._sleep(len(text[i:i + step]) / 4 / s['tps'])
+                on_chunk(text[i:i + step])
+        else:
+            self._sleep(output_tokens / s['tps'])
+
+        cached = 0
+        if prefix:
+            with self._lock:
+                cached = estimate_tokens(prefix) if prefix in self._prefixes else 0
+                self._prefixes.add(prefix)
+        if call is not None:
+            call.update(input_tokens=input_tokens, cached_tokens=cached, output_tokens=output_tokens,
+                        stop_reason=stop_reason)
+        if usage is not None:
+            usage.add(input_tokens, cached)
+        return text
+
+
+_providers = {'Gemini': _GeminiProvider(), 'Claude': _ClaudeProvider(), 'Fake': _FakeProvider()}
+
+
+def get_provider(product):
+    if product not in _providers:
+        raise ValueError(f"Unknown product: {product}")
+    return _providers[product]
+
+
+def register_provider(product, provider):
+    """Add or replace a provider (see the interface above)"""
+    _providers[product] = provider
+
+
+def configure_fake(**settings):
+    """Change the simulated service (keys of FAKE_DEFAULTS); resets its quota window"""
+    _providers['Fake'].configure(**settings)
+
+
+# === Batch API (asynchronous, discounted, results within 24 h) ===
+
+def submit_batch(product, model, requests):
+    """
+    Submit prompts to the provider's asynchronous batch endpoint
+
+    Args:
+        product: 'Gemini', 'Claude' or 'Fake' (offline stand-in)
+        model: Model name
+        requests: list of {'id': str, 'prompt': str, 'uploaded_info': list or None}
+                  (ids: letters, digits, '_' and '-', max 64 chars)
+
+    Returns:
+        dict: JSON-serializable batch handle - persist it to resume polling later
+    """
+    return _batch_backend(product).submit(model, requests)
+
+
+def poll_batch(handle):
+    """
+    Check a submitted batch
+
+    Returns:
+        (state, results): state is 'running', 'done' or 'failed';
+        results maps request id → {'text': str} or {'error': str} once finished
+    """
+    return _batch_backend(handle['product']).poll(handle)
+
+
+def _batch_backend(product):
+    backends = {'Gemini': _GeminiBatch, 'Claude': _ClaudeBatch, 'Fake': _FakeBatch}
+    if product not in backends:
+        raise ValueError(f"Unknown product: {product}")
+    return backends[product]()
+
+
+class _ClaudeBatch:
+    """Anthropic Message Batches"""
+
+    def submit(self, model, requests):
+        client = get_client('Claude')
+        reqs, uses_files = [], False
+        for r in requests:
+            content, files = _claude_content(r['prompt'], r.get('uploaded_info'))
+            uses_files = uses_files or files
+            reqs.append({"custom_id": r['id'],
+                         "params": {"model": model, "max_tokens": OUTPUT_RESERVE, "messages": [{"role": "user", "content": content}]}})
+        if uses_files:
+            batch = client.beta.messages.batches.create(requests=reqs, betas=[CLAUDE_FILES_BETA])
+        else:
+            batch = client.messages.batches.create(requests=reqs)
+        return {'product': 'Claude', 'id': batch.id, 'beta': uses_files}
+
+    def poll(self, handle):
+        client = get_client('Claude')
+        api = client.beta.messages.batches if handle.get('beta') else client.messages.batches
+        if api.retrieve(handle['id']).processing_status != 'ended':
+            return 'running', {}
+        results = {}
+        for r in api.results(handle['id']):
+            if r.result.type == 'succeeded':
+                results[r.custom_id] = {'text': next((b.text for b in r.result.message.content if hasattr(b, 'text')), "")}
+            else:
+                results[r.custom_id] = {'error': r.result.type}
+        return 'done', results
+
+
+class _GeminiBatch:
+    """Gemini batch mode (inline requests; responses come back in request order)"""
+    FINAL_STATES = ('JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED')
+
+    def submit(self, model, requests):
+        src = [{'contents': [{'role': 'user', 'parts': [{'text': r['prompt']}] + [
+                    {'file_data': {'file_uri': i['file_uri'], 'mime_type': i['mime_type']}} for i in r.get('uploaded_info') or []]}]}
+               for r in requests]
+        job = get_client('Gemini').batches.create(model=model, src=src, config={'display_name': f"learn-{int(time.time())}"})
+        return {'product': 'Gemini', 'id': job.name, 'ids': [r['id'] for r in requests]}
+
+    def poll(self, handle):
+        job = get_client('Gemini').batches.get(name=handle['id'])
+        state = job.state.name
+        if state not in self.FINAL_STATES:
+            return 'running', {}
+        if state != 'JOB_STATE_SUCCEEDED':
+            return 'failed', {rid: {'error': state} for rid in handle['ids']}
+        results = {}
+        for rid, resp in zip(handle['ids'], job.dest.inlined_responses):
+            results[rid] = {'error': str(resp.error)} if resp.error else {'text': resp.response.text}
+        return 'done', results
+
+
+class _FakeBatch:
+    """
+    Offline batch stand-in (no network, no key)
+
+    Finishes FAKE_BATCH_DELAY seconds (env, default 2) after submission and
+    returns a stub report per request; prompts containing '[fake-error]' fail.
+    Stateless - everything lives in the handle, so resume-after-restart works too.
+    """
+
+    def submit(self, model, requests):
+        delay = float(os.environ.get('FAKE_BATCH_DELAY', 2))
+        items = {r['id']: {'chars': len(r['prompt']), 'files': len(r.get('uploaded_info') or []),
+                           'error': '[fake-error]' in r['prompt']} for r in requests}
+        return {'product': 'Fake', 'id': f"fake-{int(time.time() * 1000)}", 'model': model,
+                'ready_at': time.time() + delay, 'items': items}
+
+    def poll(self, handle):
+        if time.time() < handle['ready_at']:
+            return 'running', {}
+        return 'done', {rid: {'error': 'fake_error'} if it['error'] else
+                        {'text': f"# Fake report\n\nModel: {handle['model']}\nPrompt: {it['chars']:,} chars, {it['files']} file(s)\n"}
+                        for rid, it in handle['items'].items()}
 
 
 # === Compatibility exports ===
-get_best_gemini_model = lambda api_key=None: get_gemini_models(api_key)[0] if get_gemini_models(api_key) else "gemini-2.5-pro"
-get_best_claude_model = lambda api_key=None: get_claude_models(api_key)[0] if get_claude_models(api_key) else "claude-opus-4-5-20251101"
+get_best_gemini_model = lambda api_key=None: get_best_model('Gemini') if api_key is None else get_gemini_models(api_key)[0]
+get_best_claude_model = lambda api_key=None: get_best_model('Claude') if api_key is None else get_claude_models(api_key)[0]
+
+def benchmark_clients(product='Gemini', calls=20, workers=4):
+    """Latency of a cheap API call (model listing) with per-call vs pooled clients
+
+    Prints p50 / p95 / max per mode. Needs a valid API key; costs no tokens.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    api_key = config.GEMINI_API_KEY if product == 'Gemini' else config.CLAUDE_API_KEY
+
+    def timed(make_client):
+        t = time.perf_counter()
+        client = make_client()  # Construction counts: that is what per-call clients pay
+        if product == 'Gemini':
+            next(iter(client.models.list()), None)
+        else:
+            client.models.list(limit=1)
+        return time.perf_counter() - t
+
+    modes = {
+        'per-call': lambda _: timed(lambda: _new_client(product, api_key)),
+        'pooled': lambda _: timed(lambda: get_client(product)),
+    }
+    for mode, fn in modes.items():
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            lat = sorted(pool.map(fn, range(calls)))
+        p = lambda q: lat[min(int(q * len(lat)), len(lat) - 1)] * 1000
+        print(f"{product} {mode:9} n={calls} p50={p(0.5):6.0f}ms  p95={p(0.95):6.0f}ms  max={lat[-1] * 1000:6.0f}ms")
+
+
+def benchmark_fake(calls=40, workers=8, stream=True, **settings):
+    """Throughput of call_ai() against the fake provider (limiter, retries, ledger included; no network)
+
+    Example: benchmark_fake(100, 16, rpm=60, rate_limit_rate=0.05)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    if settings:
+        configure_fake(**settings)
+    limiter = get_rate_limiter('Fake', FAKE_MODEL)
+    before = dict(limiter.stats)
+
+    def one(i):
+        t = time.perf_counter()
+        try:
+            call_ai(f"Benchmark request {i}", 'Fake', FAKE_MODEL, on_chunk=(lambda _: None) if stream else None)
+            return time.perf_counter() - t, None
+        except Exception as e:
+            return time.perf_counter() - t, e
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(one, range(calls)))
+    wall = time.perf_counter() - start
+    lat = sorted(r[0] for r in results)
+    failed = sum(1 for r in results if r[1])
+    p = lambda q: lat[min(int(q * len(lat)), len(lat) - 1)]
+    throttled = limiter.stats['throttled'] - before['throttled']
+    print(f"Fake n={calls} workers={workers}: {calls / wall:.1f} calls/s, p50={p(0.5):.2f}s p95={p(0.95):.2f}s "
+          f"max={lat[-1]:.2f}s, {throttled} throttled, {failed} failed")
+    return {'wall': wall, 'p50': p(0.5), 'p95': p(0.95), 'throttled': throttled, 'failed': failed}
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench-fake':
+        args = [int(a) for a in sys.argv[2:4]]
+        benchmark_fake(*args)
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench-clients':
+        for prod in sys.argv[2:] or ['Gemini', 'Claude']:
+            benchmark_clients(prod)
+        sys.exit(0)
+
     print("=== Gemini Models ===")
     for i, m in enumerate(get_gemini_models()): print(f"{i+1:2}. {m}")
     print("\n=== Claude Models ===")
@@ -4,11 +4,11 @@ Supports interactive exclusion of specific items before cleaning.
 """
 import os
 import sys
-import shutil
 from pathlib import Path
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import config
+from func.utilWorkspace import remove_file, remove_tree
 
 # Files/dirs that should NEVER be deleted (core project files)
 PROTECTED = {
@@ -155,10 +155,10 @@ def clean_items(items, exclude_indices=None):
 
         try:
             if item_type == 'dir':
-                shutil.rmtree(path)
+                remove_tree(path)
                 print(f"  ✓ Deleted dir: {_rel_path(path)}")
             else:
-                os.remove(path)
+                remove_file(path)
                 print(f"  ✓ Deleted file: {_rel_path(path)}")
             deleted += 1
         except Exception as e:
@@ -1,5 +1,5 @@
 """Homework automation - fetch, LLM, submit"""
-import os, sys, re, json, time, mimetypes
+import os, sys, re, json, time, shutil, tempfile, mimetypes
 from pathlib import Path
 from urllib.parse import urlparse
 from html import unescape
@@ -46,7 +46,11 @@ def get_homework_details(url=None):
 
 
 def ask_llm_with_pdfs(description, product, model, prompt, ref_files=[]):
-    """Call LLM with prompt + description"""
+    """Call LLM with prompt + description + reference files
+
+    Big references are cut down to the pages relevant to the description
+    (func/mgrPageIndex) before upload.
+    """
     personal = ""
     try:
         info = json.load(open(config.PERSONAL_INFO_FILE))
@@ -54,9 +58,38 @@ def ask_llm_with_pdfs(description, product, model, prompt, ref_files=[]):
     except (IOError, json.JSONDecodeError, KeyError):
         pass
 
-    full_prompt = f"{prompt}\n{personal}\n\n**Description:**\n{description}"
-    log.info(f"Calling {product} {model}...")
-    return utilPromptFiles.call_ai(full_prompt, product, model, ref_files)
+    excerpt_dir = tempfile.mkdtemp(prefix='hw_refs_')
+    try:
+        uploaded_info, note = None, ""
+        if ref_files:
+            from func.mgrPageIndex import excerpt_for_query
+            files, note = excerpt_for_query(ref_files, description, excerpt_dir)
+            if product == 'Claude':
+                files, inline = _inline_for_claude(files)
+                note += inline
+            uploaded_info = utilPromptFiles.upload_files(files, product) or None
+
+        full_prompt = f"{prompt}\n{personal}\n\n**Description:**\n{description}{note}"
+        log.info(f"Calling {product} {model}...")
+        return utilPromptFiles.call_ai(full_prompt, product, model, uploaded_info=uploaded_info)
+    finally:
+        shutil.rmtree(excerpt_dir, ignore_errors=True)
+
+
+def _inline_for_claude(files):
+    """Claude only takes PDFs/images as attachments: text references go into the prompt, the rest is logged"""
+    from func.mgrUploads import claude_supported
+    from func.mgrPageIndex import TEXT_EXTENSIONS
+    kept, inline = [], ""
+    for f in files:
+        if claude_supported(f):
+            kept.append(f)
+        elif os.path.splitext(f)[1].lower() in TEXT_EXTENSIONS:
+            with open(f, 'r', encoding='utf-8', errors='ignore') as fh:
+                inline += f"\n\n--- {os.path.basename(f)} ---\n{fh.read()}"
+        else:
+            log.warning(f"Reference not sent to Claude (unsupported type): {os.path.basename(f)}")
+    return kept, inline
 
 
 def parse_img_requests(text):
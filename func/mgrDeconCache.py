@@ -0,0 +1,144 @@
+"""Decon result cache - chapter splits keyed by textbook SHA-256 + splitter version
+
+Layout:
+    AAFS/cache/decon/<sha256>_v<SPLITTER_VERSION>/
+        chapters.json       # chapter metadata (same format as <name>_chapters.json)
+        Chapter_1_xxx.pdf   # split outputs (hardlinked into each course's decon/)
+        ...
+
+Files are placed via func/utilWorkspace (reflink/hardlink), so a cache hit costs no disk.
+Entries are evicted least recently used first (manifest mtime, touched on each
+hit) once the cache exceeds DISK_BYTES; course copies are separate links and stay.
+"""
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+from func.utilHash import sha256_file
+from func.utilPdfSplitter import SPLITTER_VERSION
+from func.utilWorkspace import link_file, remove_tree
+
+MANIFEST = 'chapters.json'
+DISK_BYTES = 4 * 1024 * 1024 * 1024     # Size budget of all cached splits
+
+
+def _entry_dir(digest):
+    return os.path.join(config.DECON_CACHE_DIR, f"{digest}_v{SPLITTER_VERSION}")
+
+
+def lookup(pdf_path):
+    """Find a complete cache entry for pdf_path
+
+    Returns:
+        dict {'dir', 'chapters', 'files'} or None on miss
+    """
+    entry = _entry_dir(sha256_file(pdf_path))
+    manifest = os.path.join(entry, MANIFEST)
+    if not os.path.exists(manifest):
+        return None
+    try:
+        with open(manifest, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+
+    files = [os.path.join(entry, fn) for fn in data.get('files', [])]
+    if not files or not all(os.path.exists(p) for p in files):
+        return None  # Partially deleted entry - treat as miss
+    try:
+        os.utime(manifest)  # LRU order
+    except OSError:
+        pass
+    return {'dir': entry, 'chapters': data.get('chapters', []), 'files': files}
+
+
+def store(pdf_path, chapters, created_files):
+    """Record a finished decon run in the cache (files are hardlinked, not copied)
+
+    Returns:
+        Cache entry directory
+    """
+    entry = _entry_dir(sha256_file(pdf_path))
+    os.makedirs(entry, exist_ok=True)
+
+    names = []
+    for fp in created_files:
+        link_file(fp, os.path.join(entry, os.path.basename(fp)))
+        names.append(os.path.basename(fp))
+
+    # Manifest last: its presence marks the entry as complete
+    tmp = os.path.join(entry, MANIFEST + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'source': os.path.basename(pdf_path), 'splitter_version': SPLITTER_VERSION,
+                   'chapters': chapters, 'files': names}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, os.path.join(entry, MANIFEST))
+    _evict(keep=entry)
+    return entry
+
+
+def _entries():
+    """[(last use, bytes, dir)] of cache entries (incomplete ones by directory mtime)"""
+    out = []
+    if not os.path.isdir(config.DECON_CACHE_DIR):
+        return out
+    with os.scandir(config.DECON_CACHE_DIR) as it:
+        for e in it:
+            if not e.is_dir():
+                continue
+            try:
+                used = os.stat(os.path.join(e.path, MANIFEST)).st_mtime
+            except OSError:
+                used = e.stat().st_mtime
+            with os.scandir(e.path) as files:
+                size = sum(f.stat().st_size for f in files if f.is_file())
+            out.append((used, size, e.path))
+    return out
+
+
+def _evict(keep=None):
+    """Drop least recently used entries once the cache exceeds DISK_BYTES (down to 80%)"""
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    if total <= DISK_BYTES:
+        return
+    for _, size, path in entries:
+        if total <= DISK_BYTES * 0.8:
+            break
+        if path != keep:
+            remove_tree(path)
+            total -= size
+            print(f"[decon-cache] Evicted {os.path.basename(path)} ({size / 1024 / 1024:.0f} MB)")
+
+
+def materialize(entry, decon_dir, textbook_name):
+    """Place a cached decon result into a course's decon/ directory
+
+    Args:
+        entry: dict returned by lookup()
+        decon_dir: Target Files/Textbook/decon directory
+        textbook_name: Source PDF filename (for <name>_chapters.json)
+
+    Returns:
+        list: Paths of chapter PDFs in decon_dir
+    """
+    os.makedirs(decon_dir, exist_ok=True)
+
+    metadata_file = os.path.join(decon_dir, f"{os.path.splitext(textbook_name)[0]}_chapters.json")
+    with open(metadata_file, 'w', encoding='utf-8') as f:
+        json.dump(entry['chapters'], f, indent=2, ensure_ascii=False)
+
+    created = []
+    for src in entry['files']:
+        dst = os.path.join(decon_dir, os.path.basename(src))
+        link_file(src, dst)
+        created.append(dst)
+    return created
+
+
+def invalidate(pdf_path):
+    """Drop the cache entry for pdf_path (force rebuild)"""
+    entry = _entry_dir(sha256_file(pdf_path))
+    if os.path.exists(entry):
+        remove_tree(entry)
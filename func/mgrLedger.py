@@ -0,0 +1,232 @@
+"""AI call ledger - one SQLite row per call_ai() (model, tokens, latency, retries, cost)
+
+Calls are attributed to the task that made them: MissionControl opens a
+task_scope() around each task, and worker pools started inside a task carry it
+along when jobs are submitted with submit().
+
+Usage:
+    from func.mgrLedger import get_ledger, task_scope, submit
+    with task_scope(task_id, "Batch Learn"):
+        pool_future = submit(pool, work, arg)      # work's call_ai() rows → task_id
+    get_ledger().task_rollup(task_id)
+    get_ledger().model_summary(days=30)
+
+CLI:
+    python mgrLedger.py [days]      # per-model summary
+"""
+import os
+import sys
+import time
+import sqlite3
+import threading
+import contextvars
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+
+# USD per 1M tokens (input, output); first matching model prefix wins - keep longer prefixes first
+PRICES = [
+    ('gemini-2.5-flash-lite', 0.10, 0.40),
+    ('gemini-2.5-flash', 0.30, 2.50),
+    ('gemini-2.5-pro', 1.25, 10.00),
+    ('gemini-2.0-flash', 0.10, 0.40),
+    ('gemini', 1.25, 10.00),
+    ('claude-opus-4-5', 5.00, 25.00),
+    ('claude-opus', 15.00, 75.00),
+    ('claude-sonnet', 3.00, 15.00),
+    ('claude-haiku-4-5', 1.00, 5.00),
+    ('claude-3-5-haiku', 0.80, 4.00),
+    ('claude', 3.00, 15.00),
+]
+CACHED_INPUT = {'Gemini': 0.25, 'Claude': 0.10}   # Price factor of cache reads
+CACHE_WRITE = {'Claude': 1.25}                    # Price factor of cache writes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    task_id TEXT,
+    task_name TEXT,
+    product TEXT,
+    model TEXT,
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    cached_tokens INTEGER DEFAULT 0,
+    cache_write_tokens INTEGER DEFAULT 0,
+    latency_ms INTEGER,
+    ttfb_ms INTEGER,
+    queued_ms INTEGER DEFAULT 0,
+    retries INTEGER DEFAULT 0,
+    cache_hit INTEGER DEFAULT 0,
+    ok INTEGER DEFAULT 1,
+    error TEXT,
+    cost_usd REAL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS calls_task ON calls(task_id);
+CREATE INDEX IF NOT EXISTS calls_ts ON calls(ts);
+"""
+
+_task = contextvars.ContextVar('ai_task', default=None)  # (task_id, task_name)
+
+
+@contextmanager
+def task_scope(task_id, name):
+    """Attribute call_ai() rows made inside this block (and jobs submitted with submit()) to a task"""
+    token = _task.set((task_id, name))
+    try:
+        yield
+    finally:
+        _task.reset(token)
+
+
+def current_task():
+    """(task_id, task_name) of the running task, or None"""
+    return _task.get()
+
+
+def submit(pool, fn, *args, **kwargs):
+    """pool.submit() that keeps the caller's task attribution in the worker thread"""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def model_price(model):
+    """(input, output) USD per 1M tokens of model, or None if unknown"""
+    name = (model or '').lower()
+    return next(((pin, pout) for prefix, pin, pout in PRICES if name.startswith(prefix)), None)
+
+
+def estimate_cost(product, model, input_tokens=0, output_tokens=0, cached_tokens=0, cache_write_tokens=0):
+    """Estimated USD cost (input_tokens includes cached and cache-write tokens)"""
+    price = model_price(model)
+    if price is None:
+        return 0.0
+    pin, pout = price
+    fresh = max(input_tokens - cached_tokens - cache_write_tokens, 0)
+    return (fresh * pin + cached_tokens * pin * CACHED_INPUT.get(product, 1.0)
+            + cache_write_tokens * pin * CACHE_WRITE.get(product, 1.0) + output_tokens * pout) / 1e6
+
+
+class Ledger:
+    """Thread-safe SQLite call ledger"""
+
+    def __init__(self, path=None):
+        self.path = path or config.AI_LEDGER_DB
+        self._conn = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def add_listener(self, fn):
+        """fn(row dict) after every record (called on the recording thread)"""
+        self._listeners.append(fn)
+
+    def record(self, product, model, **fields):
+        """Insert one call; task attribution and cost are filled in. Returns the row dict."""
+        task = current_task()
+        row = dict(fields, ts=time.time(), product=product, model=model,
+                   task_id=task[0] if task else None, task_name=task[1] if task else None)
+        row['cost_usd'] = 0.0 if row.get('cache_hit') else estimate_cost(
+            product, model, row.get('input_tokens', 0), row.get('output_tokens', 0),
+            row.get('cached_tokens', 0), row.get('cache_write_tokens', 0))
+        cols = ', '.join(row)
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(f"INSERT INTO calls ({cols}) VALUES ({', '.join('?' * len(row))})", list(row.values()))
+                db.commit()
+        except sqlite3.Error as e:
+            print(f"[ledger] record failed: {e}")  # Accounting must never break an AI call
+            return row
+        for fn in list(self._listeners):
+            try:
+                fn(row)
+            except Exception as e:
+                print(f"[ledger] listener failed: {e}")
+        return row
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(r) for r in self._db().execute(sql, params).fetchall()]
+
+    def task_rollup(self, task_id):
+        """{'calls', 'errors', 'cache_hits', 'retries', 'input_tokens', 'output_tokens', 'cost_usd', 'avg_latency_ms'}"""
+        return self._query("""
+            SELECT COUNT(*) AS calls, SUM(1 - ok) AS errors, SUM(cache_hit) AS cache_hits, SUM(retries) AS retries,
+                   SUM(input_tokens) AS input_tokens, SUM(output_tokens) AS output_tokens,
+                   SUM(cost_usd) AS cost_usd, AVG(CASE WHEN cache_hit = 0 THEN latency_ms END) AS avg_latency_ms
+            FROM calls WHERE task_id = ?""", (task_id,))[0]
+
+    def model_summary(self, days=30):
+        """Per (product, model) over the last days: calls, errors, tokens, cost, latency, TTFB"""
+        return self._query("""
+            SELECT product, model, COUNT(*) AS calls, SUM(1 - ok) AS errors, SUM(cache_hit) AS cache_hits,
+                   SUM(retries) AS retries, SUM(input_tokens) AS input_tokens, SUM(output_tokens) AS output_tokens,
+                   SUM(cost_usd) AS cost_usd,
+                   AVG(CASE WHEN ok = 1 AND cache_hit = 0 THEN latency_ms END) AS avg_latency_ms,
+                   AVG(CASE WHEN ok = 1 AND cache_hit = 0 THEN ttfb_ms END) AS avg_ttfb_ms,
+                   SUM(CASE WHEN ok = 1 AND cache_hit = 0 THEN output_tokens END) * 1000.0 /
+                       NULLIF(SUM(CASE WHEN ok = 1 AND cache_hit = 0 THEN latency_ms END), 0) AS output_tps
+            FROM calls WHERE ts >= ? GROUP BY product, model ORDER BY cost_usd DESC""", (time.time() - days * 86400,))
+
+    def latency_samples(self, days=7):
+        """Real (non-cached) calls of the last days, oldest first - input of func/mgrModelSelect"""
+        return self._query("""
+            SELECT ts, product, model, input_tokens, output_tokens, latency_ms, ok
+            FROM calls WHERE ts >= ? AND cache_hit = 0 ORDER BY ts""", (time.time() - days * 86400,))
+
+    def task_summary(self, days=30, limit=20):
+        """Most expensive tasks over the last days"""
+        return self._query("""
+            SELECT task_name, MIN(ts) AS started, COUNT(*) AS calls, SUM(input_tokens) AS input_tokens,
+                   SUM(output_tokens) AS output_tokens, SUM(cost_usd) AS cost_usd
+            FROM calls WHERE ts >= ? AND task_id IS NOT NULL
+            GROUP BY task_id ORDER BY cost_usd DESC LIMIT ?""", (time.time() - days * 86400, limit))
+
+
+def format_rollup(r):
+    """One-line summary of a task_rollup() (TaskCards, batch logs)"""
+    if not r or not r['calls']:
+        return ""
+    parts = [f"{r['calls']} AI call{'s' if r['calls'] != 1 else ''}",
+             f"{(r['input_tokens'] or 0) / 1000:.1f}k→{(r['output_tokens'] or 0) / 1000:.1f}k tok",
+             f"${r['cost_usd'] or 0:.3f}"]
+    if r['avg_latency_ms']:
+        parts.append(f"{r['avg_latency_ms'] / 1000:.1f}s avg")
+    if r['cache_hits']:
+        parts.append(f"{r['cache_hits']} cached")
+    if r['errors']:
+        parts.append(f"{r['errors']} failed")
+    return " · ".join(parts)
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """Process-wide Ledger"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = Ledger()
+        return _ledger
+
+
+if __name__ == '__main__':
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    rows = get_ledger().model_summary(days)
+    print(f"AI usage, last {days} days")
+    print(f"{'model':<36} {'calls':>6} {'err':>4} {'in tok':>10} {'out tok':>9} {'cost $':>9} {'avg s':>6} {'ttfb s':>6} {'out/s':>6}")
+    for r in rows:
+        print(f"{r['model']:<36} {r['calls']:>6} {r['errors']:>4} {r['input_tokens'] or 0:>10,} {r['output_tokens'] or 0:>9,} "
+              f"{r['cost_usd'] or 0:>9.3f} {(r['avg_latency_ms'] or 0) / 1000:>6.1f} {(r['avg_ttfb_ms'] or 0) / 1000:>6.1f} "
+              f"{r['output_tps'] or 0:>6.0f}")
@@ -0,0 +1,208 @@
+"""Latency-aware model selection - the 'Auto (fast)' policy
+
+'Auto' takes the top of the name-sorted model list (largest, slowest model).
+'Auto (fast)' instead picks, per request, the cheapest model whose predicted
+latency for this input size meets LATENCY_TARGET:
+
+    latency  ≈ overhead + (input_tokens + OUTPUT_WEIGHT · output_tokens) · s/token
+               fitted per model from the AI ledger (func/mgrLedger); models with
+               fewer than MIN_SAMPLES recorded calls use PRIORS
+    cost     from mgrLedger.PRICES
+    health   models failing FAIL_STREAK times in a row are skipped for
+             FAIL_COOLDOWN, models above MAX_ERROR_RATE are skipped
+
+If no model meets the target, the fastest healthy one is used. Profiles and
+candidate lists can be passed in directly (synthetic latency profiles, fake provider).
+
+Usage:
+    from func.mgrModelSelect import select_model
+    product, model = select_model(['Gemini', 'Claude'], input_tokens=12000)
+
+CLI:
+    python mgrModelSelect.py [input_tokens]     # ranking from the local ledger
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+
+AUTO_FAST = 'Auto (fast)'
+LATENCY_TARGET = 90         # seconds per report
+EXPECTED_OUTPUT = 3000      # output tokens of a typical report
+OUTPUT_WEIGHT = 20          # an output token costs ~20× the time of an input token
+MIN_SAMPLES = 5             # recorded calls before the fit replaces the prior
+MAX_SAMPLES = 200           # most recent calls per model used for the fit
+HISTORY_DAYS = 7
+MAX_ERROR_RATE = 0.3
+FAIL_STREAK = 3
+FAIL_COOLDOWN = 15 * 60
+
+# (overhead s, s per weighted token) until a model has MIN_SAMPLES calls; first matching fragment wins
+PRIORS = [('flash-lite', (1.0, 0.00025)), ('flash', (2.0, 0.0003)), ('pro', (6.0, 0.0006)),
+          ('haiku', (1.0, 0.0003)), ('sonnet', (2.5, 0.0006)), ('opus', (4.0, 0.001))]
+DEFAULT_PRIOR = (5.0, 0.0006)
+
+# Listed models that are not general text/vision generators, or are unstable previews
+_EXCLUDE = re.compile(r'image|tts|embed|audio|live|native|imagen|veo|gemma|learnlm|aqa|robotics|computer-use|'
+                      r'preview|exp|latest|thinking', re.I)
+
+
+def _weighted(input_tokens, output_tokens):
+    return (input_tokens or 0) + OUTPUT_WEIGHT * (output_tokens or 0)
+
+
+def _prior(model):
+    name = (model or '').lower()
+    return next((p for fragment, p in PRIORS if fragment in name), DEFAULT_PRIOR)
+
+
+class ModelProfile:
+    """Latency fit + health of one model"""
+
+    def __init__(self, model, samples=()):
+        self.model = model
+        ok = [s for s in samples if s['ok'] and s.get('latency_ms')][-MAX_SAMPLES:]
+        self.calls = len(samples)
+        self.errors = sum(1 for s in samples if not s['ok'])
+        self.samples = len(ok)
+
+        # Failure streak: trailing consecutive failures, and when the last one happened
+        self.streak, self.last_failure = 0, 0.0
+        for s in reversed(samples):
+            if s['ok']:
+                break
+            self.streak += 1
+            self.last_failure = max(self.last_failure, s.get('ts') or 0)
+
+        self.overhead, self.per_token = _prior(model)
+        if len(ok) >= MIN_SAMPLES:
+            self._fit([_weighted(s['input_tokens'], s['output_tokens']) for s in ok],
+                      [s['latency_ms'] / 1000 for s in ok])
+
+    def _fit(self, xs, ys):
+        """Least squares latency = overhead + per_token · x (slope kept from the prior if sizes barely vary)"""
+        n = len(xs)
+        mx, my = sum(xs) / n, sum(ys) / n
+        var = sum((x - mx) ** 2 for x in xs)
+        if var > 0 and max(xs) > 2 * min(xs) + 1000:
+            slope = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+            if slope > 0:
+                self.per_token = slope
+        self.overhead = max(my - self.per_token * mx, 0.0)
+
+    def predict(self, input_tokens, output_tokens=EXPECTED_OUTPUT):
+        """Predicted seconds for a call of this size"""
+        return self.overhead + self.per_token * _weighted(input_tokens, output_tokens)
+
+    @property
+    def error_rate(self):
+        return self.errors / self.calls if self.calls else 0.0
+
+    def healthy(self, now=None):
+        if self.streak >= FAIL_STREAK and (now or time.time()) - self.last_failure < FAIL_COOLDOWN:
+            return False
+        return self.calls < MIN_SAMPLES or self.error_rate <= MAX_ERROR_RATE
+
+
+class ModelSelector:
+    """Ranks candidate models for an input size
+
+    Args:
+        candidates: {product: [models best-first]}; default: cached model registry
+        samples: ledger-style rows (ts, product, model, input_tokens, output_tokens,
+                 latency_ms, ok); default: the local AI ledger
+    """
+
+    def __init__(self, candidates=None, samples=None, latency_target=LATENCY_TARGET):
+        self.latency_target = latency_target
+        self._candidates = candidates
+        if samples is None:
+            from func.mgrLedger import get_ledger
+            samples = get_ledger().latency_samples(HISTORY_DAYS)
+        by_model = {}
+        for s in samples:
+            by_model.setdefault(s['model'], []).append(s)
+        self._samples = by_model
+
+    def candidates(self, product):
+        if self._candidates is not None:
+            return list(self._candidates.get(product, []))
+        from func.mgrModels import get_model_registry
+        from func.mgrLedger import model_price
+        return [m.replace('models/', '') for m in get_model_registry().models(product)
+                if not _EXCLUDE.search(m) and model_price(m.replace('models/', ''))]
+
+    def rank(self, products, input_tokens, output_tokens=EXPECTED_OUTPUT):
+        """All candidates as dicts (product, model, seconds, cost, healthy, samples, meets_target), best first"""
+        from func.mgrLedger import estimate_cost
+        now = time.time()
+        rows = []
+        for product in products:
+            for order, model in enumerate(self.candidates(product)):
+                profile = ModelProfile(model, self._samples.get(model, []))
+                seconds = profile.predict(input_tokens, output_tokens)
+                rows.append({'product': product, 'model': model, 'seconds': seconds, 'order': order,
+                             'cost': estimate_cost(product, model, input_tokens, output_tokens),
+                             'healthy': profile.healthy(now), 'samples': profile.samples,
+                             'error_rate': profile.error_rate, 'meets_target': seconds <= self.latency_target})
+        # Healthy first; within target by cost (then list order = quality); otherwise by speed
+        rows.sort(key=lambda r: (not r['healthy'], not r['meets_target'],
+                                 (r['cost'], r['order']) if r['meets_target'] else (r['seconds'], r['cost'])))
+        return rows
+
+    def select(self, products, input_tokens, output_tokens=EXPECTED_OUTPUT):
+        """(product, model) for this request, or None if there is no candidate"""
+        ranked = self.rank(products, input_tokens, output_tokens)
+        if not ranked:
+            return None
+        best = ranked[0]
+        return best['product'], best['model']
+
+
+def select_model(products, input_tokens, output_tokens=EXPECTED_OUTPUT, log=None):
+    """'Auto (fast)' resolution over the local ledger + model registry → (product, model) or None"""
+    ranked = ModelSelector().rank(products, input_tokens, output_tokens)
+    if not ranked:
+        return None
+    best = ranked[0]
+    if log:
+        why = ("within target" if best['meets_target'] else "fastest available") + \
+              (f", {best['samples']} calls measured" if best['samples'] >= MIN_SAMPLES else ", prior estimate")
+        log(f"⚡ Auto (fast): {best['model']} (~{best['seconds']:.0f}s, ~${best['cost']:.3f} for "
+            f"~{input_tokens:,} tokens; {why})")
+    return best['product'], best['model']
+
+
+def configured_products(default):
+    """Providers with an API key (the default first); [default] if none is configured"""
+    keyed = [p for p, key in (('Gemini', config.GEMINI_API_KEY), ('Claude', config.CLAUDE_API_KEY)) if key]
+    return sorted(keyed, key=lambda p: p != default) or [default]
+
+
+def material_tokens(path, max_pages=None):
+    """Rough input tokens of a learning material file (no AI call); max_pages: only the leading PDF pages are sent"""
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == '.pdf':
+            from PyPDF2 import PdfReader
+            pages = len(PdfReader(path).pages)
+            return (min(pages, max_pages) if max_pages else pages) * 800
+        if ext in ('.csv', '.xlsx'):
+            return 4000  # Only the data profile is sent
+        if ext in ('.docx', '.pptx', '.doc', '.ppt'):
+            return 2000 + os.path.getsize(path) // 50
+        from func.utilTokens import file_tokens
+        return file_tokens(path)
+    except Exception:
+        return 2000 + os.path.getsize(path) // 4
+
+
+if __name__ == '__main__':
+    tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"Models for ~{tokens:,} input tokens (target {LATENCY_TARGET}s)")
+    for r in ModelSelector().rank(['Gemini', 'Claude'], tokens):
+        flags = ('' if r['healthy'] else ' unhealthy') + ('' if r['meets_target'] else ' slow')
+        print(f"  {r['model']:<36} ~{r['seconds']:>6.1f}s  ${r['cost']:.4f}  {r['samples']:>3} samples{flags}")
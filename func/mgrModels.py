@@ -0,0 +1,132 @@
+"""Model registry - cached Gemini/Claude model lists with TTL + background refresh
+
+Model resolution ('Auto' → best model) runs for every file in a batch, so it
+must not hit the network. Lists are kept in memory, persisted to
+AAFS/jsons/models.json, and refreshed on a background thread once stale.
+Until the first listing arrives the FALLBACK_* lists from func/ai are used.
+
+Usage:
+    from func.mgrModels import get_model_registry
+    get_model_registry().best('Gemini')     # memory only
+    get_model_registry().refresh(wait=True)  # explicit refresh (network)
+"""
+import os
+import sys
+import json
+import time
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+from func.utilHash import sha256_text
+
+REGISTRY_FILE = os.path.join(config.JSONS_DIR, 'models.json')
+MODELS_TTL = 24 * 3600   # Successful listing
+FAILED_TTL = 10 * 60     # Listing failed (fallback list) - retry soon
+PRODUCTS = ('Gemini', 'Claude')
+
+
+def _fetchers():
+    from func.ai import get_gemini_models, get_claude_models, FALLBACK_GEMINI, FALLBACK_CLAUDE
+    return {'Gemini': (get_gemini_models, FALLBACK_GEMINI), 'Claude': (get_claude_models, FALLBACK_CLAUDE)}
+
+
+def _key_fingerprint(product):
+    api_key = config.GEMINI_API_KEY if product == 'Gemini' else config.CLAUDE_API_KEY
+    return sha256_text(api_key or '')[:12]
+
+
+class ModelRegistry:
+    """Thread-safe model list cache; reads never block on the network"""
+
+    def __init__(self, registry_file=REGISTRY_FILE):
+        self.registry_file = registry_file
+        self._data = None
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._data is None:
+            self._data = {}
+            if os.path.exists(self.registry_file):
+                try:
+                    with open(self.registry_file, 'r', encoding='utf-8') as f:
+                        self._data = json.load(f)
+                except (json.JSONDecodeError, IOError):
+                    pass
+        return self._data
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.registry_file), exist_ok=True)
+        tmp = self.registry_file + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, indent=2)
+        os.replace(tmp, self.registry_file)
+
+    def models(self, product):
+        """Sorted model list for product (memory/disk only; stale lists trigger a background refresh)"""
+        with self._lock:
+            rec = self._load().get(product)
+        if rec and rec.get('key') == _key_fingerprint(product):
+            ttl = MODELS_TTL if rec.get('ok') else FAILED_TTL
+            if time.time() - rec.get('fetched_at', 0) > ttl:
+                self.refresh(product)
+            return list(rec['models'])
+
+        # Never listed (or the API key changed): answer with the fallback, list in background
+        self.refresh(product)
+        return list(_fetchers()[product][1])
+
+    def best(self, product):
+        """Best model for product (first of the sorted list)"""
+        return self.models(product)[0]
+
+    def all(self):
+        return {p: self.models(p) for p in PRODUCTS}
+
+    def refresh(self, product=None, wait=False):
+        """Re-list models from the APIs
+
+        Args:
+            product: 'Gemini', 'Claude' or None for both
+            wait: Block until done (explicit user refresh); otherwise run on a daemon thread
+        """
+        products = [product] if product else list(PRODUCTS)
+        if wait:
+            for p in products:
+                self._fetch(p)
+            return
+
+        with self._lock:
+            products = [p for p in products if p not in self._refreshing]
+            self._refreshing.update(products)
+        for p in products:
+            threading.Thread(target=self._fetch, args=(p, True), daemon=True, name=f'models-{p.lower()}').start()
+
+    def _fetch(self, product, background=False):
+        fetch, fallback = _fetchers()[product]
+        try:
+            models = fetch()
+            with self._lock:
+                self._load()[product] = {'models': models, 'ok': models != fallback,
+                                         'fetched_at': time.time(), 'key': _key_fingerprint(product)}
+                self._save()
+        except Exception as e:
+            print(f"[models] {product} refresh failed: {e}")
+        finally:
+            if background:
+                with self._lock:
+                    self._refreshing.discard(product)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Process-wide ModelRegistry singleton"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
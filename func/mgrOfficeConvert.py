@@ -0,0 +1,349 @@
+"""Office → PDF conversion service - long-lived headless LibreOffice + content-hash cache
+
+Spawning `soffice --headless --convert-to pdf` per file pays several seconds of
+startup every time. Instead:
+
+    cache    : AAFS/cache/converted/<sha256>/<name>.pdf - each deck/document is
+               converted once per content hash, whatever folder or course it is in;
+               least recently used PDFs are evicted beyond CACHE_BYTES
+    batching : requests queue up; a worker takes everything that arrives within
+               BATCH_WINDOW (up to BATCH_MAX files) as one job
+    workers  : INSTANCES slots, each with a private LibreOffice profile
+               - UNO listener (persistent soffice, documents loaded/exported over
+                 a socket) when the `uno` bindings are importable
+               - else one `soffice --convert-to pdf f1 f2 ...` per batch
+
+Concurrent requests for the same content share one conversion.
+
+Usage:
+    from func.mgrOfficeConvert import get_office_converter
+    pdf_path = get_office_converter().convert('slides.pptx')
+"""
+import os
+import sys
+import time
+import queue
+import shutil
+import atexit
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+from func.utilHash import sha256_file
+
+INSTANCES = 2
+BATCH_WINDOW = 0.3      # seconds to wait for more requests before starting a batch
+BATCH_MAX = 8
+FILE_TIMEOUT = 60       # seconds per document (batch timeout scales with size)
+CALL_TIMEOUT = FILE_TIMEOUT * BATCH_MAX  # convert() backstop: queue wait + own batch
+UNO_PORT = 2202         # slot n listens on UNO_PORT + n
+UNO_STARTUP = 30        # seconds to wait for a listener to accept connections
+CACHE_BYTES = 2 * 1024 * 1024 * 1024  # Size budget of converted PDFs (LRU by mtime)
+
+PDF_FILTERS = {'.docx': 'writer_pdf_Export', '.doc': 'writer_pdf_Export', '.odt': 'writer_pdf_Export',
+               '.pptx': 'impress_pdf_Export', '.ppt': 'impress_pdf_Export', '.odp': 'impress_pdf_Export'}
+
+
+def _profile_url(slot):
+    path = os.path.join(config.SOFFICE_PROFILE_DIR, f"profile{slot}")
+    os.makedirs(path, exist_ok=True)
+    return Path(path).as_uri()
+
+
+class _UnoInstance:
+    """One persistent soffice process driven over UNO"""
+
+    def __init__(self, slot):
+        import uno  # LibreOffice's Python bindings (python3-uno); ImportError → CLI backend
+        self._uno = uno
+        self.port = UNO_PORT + slot
+        self.proc = subprocess.Popen(
+            ['soffice', '--headless', '--invisible', '--nologo', '--norestore', '--nodefault',
+             f"-env:UserInstallation={_profile_url(slot)}",
+             f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext('com.sun.star.bridge.UnoUrlResolver', local)
+        deadline = time.time() + UNO_STARTUP
+        while True:
+            try:
+                ctx = resolver.resolve(f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext")
+                break
+            except Exception:
+                if time.time() > deadline or self.proc.poll() is not None:
+                    self.close()
+                    raise RuntimeError(f"LibreOffice listener on port {self.port} did not start")
+                time.sleep(0.25)
+        self.desktop = ctx.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', ctx)
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def _props(self, **kwargs):
+        from com.sun.star.beans import PropertyValue
+        props = []
+        for name, value in kwargs.items():
+            p = PropertyValue()
+            p.Name, p.Value = name, value
+            props.append(p)
+        return tuple(props)
+
+    def convert(self, src, dst, timeout=FILE_TIMEOUT):
+        """Export src as PDF to dst; a document still converting after timeout kills the process"""
+        expired = threading.Event()
+
+        def watchdog():
+            expired.set()
+            self.kill()  # Unblocks the pending UNO call; the slot restarts the instance
+
+        timer = threading.Timer(timeout, watchdog)
+        timer.daemon = True
+        timer.start()
+        try:
+            url = self._uno.systemPathToFileUrl(os.path.abspath(src))
+            doc = self.desktop.loadComponentFromURL(url, '_blank', 0, self._props(Hidden=True, ReadOnly=True))
+            try:
+                doc.storeToURL(self._uno.systemPathToFileUrl(os.path.abspath(dst)),
+                               self._props(FilterName=PDF_FILTERS[os.path.splitext(src)[1].lower()]))
+            finally:
+                doc.close(True)
+        except Exception:
+            if expired.is_set():
+                raise TimeoutError(f"{os.path.basename(src)} not converted within {timeout}s") from None
+            raise
+        finally:
+            timer.cancel()
+
+    def kill(self):
+        try:
+            self.proc.kill()
+        except OSError:
+            pass
+
+    def close(self):
+        try:
+            self.proc.terminate()
+            self.proc.wait(timeout=10)
+        except Exception:
+            self.proc.kill()
+
+
+class OfficeConverter:
+    """Thread-safe conversion queue in front of INSTANCES LibreOffice workers"""
+
+    def __init__(self, instances=INSTANCES, cache_dir=None):
+        self.instances = instances
+        self.cache_dir = cache_dir or config.CONVERTED_CACHE_DIR
+        self._queue = queue.Queue()
+        self._inflight = {}  # digest → Future
+        self._lock = threading.Lock()
+        self._workers = []
+        self._uno = {}       # slot → _UnoInstance
+        self._use_uno = True
+        self.stats = {'hits': 0, 'converted': 0, 'batches': 0}
+
+    def _cache_path(self, digest, path):
+        return os.path.join(self.cache_dir, digest, os.path.splitext(os.path.basename(path))[0] + '.pdf')
+
+    @staticmethod
+    def _touch(out):
+        """Mark a cached PDF as used (LRU order); False if it is gone"""
+        try:
+            os.utime(out)
+            return True
+        except OSError:
+            return False
+
+    def cached(self, path):
+        """Converted PDF of path if this content was converted before, else None"""
+        out = self._cache_path(sha256_file(path), path)
+        return out if self._touch(out) else None
+
+    def submit(self, path):
+        """Queue path for conversion → Future[pdf path] (already done on a cache hit)"""
+        digest = sha256_file(path)
+        out = self._cache_path(digest, path)
+        with self._lock:
+            if self._touch(out):
+                self.stats['hits'] += 1
+                fut = Future()
+                fut.set_result(out)
+                return fut
+            fut = self._inflight.get(digest)
+            if fut is None:
+                fut = Future()
+                self._inflight[digest] = fut
+                self._queue.put((path, digest, out, fut))
+                self._start_workers()
+            return fut
+
+    def convert(self, path, timeout=CALL_TIMEOUT):
+        """Converted PDF path of path (blocking). Raises FileNotFoundError if LibreOffice is missing,
+        TimeoutError after timeout seconds."""
+        return self.submit(path).result(timeout)
+
+    # === Workers ===
+
+    def _start_workers(self):
+        while len(self._workers) < self.instances:
+            t = threading.Thread(target=self._worker, args=(len(self._workers),), daemon=True,
+                                 name=f"soffice-{len(self._workers)}")
+            self._workers.append(t)
+            t.start()
+
+    def _worker(self, slot):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + BATCH_WINDOW
+            while len(batch) < BATCH_MAX:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.time(), 0)))
+                except queue.Empty:
+                    break
+            try:
+                self._run_batch(slot, batch)
+            except Exception as e:
+                for _, _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            finally:
+                with self._lock:
+                    for _, digest, _, _ in batch:
+                        self._inflight.pop(digest, None)
+
+    def _count(self, key):
+        with self._lock:  # Slots run concurrently
+            self.stats[key] += 1
+
+    def _run_batch(self, slot, batch):
+        self._count('batches')
+        names = ', '.join(os.path.basename(p) for p, _, _, _ in batch)
+        print(f"[convert] slot {slot}: {len(batch)} file(s) → PDF ({names})")
+        start = time.time()
+
+        if self._uno_instance(slot):
+            for path, digest, out, fut in batch:
+                try:
+                    instance = self._uno_instance(slot)  # Restarted if the previous document timed out
+                    if instance is None:
+                        raise RuntimeError("LibreOffice listener could not be restarted")
+                    tmp = out + f".{slot}.tmp.pdf"
+                    os.makedirs(os.path.dirname(out), exist_ok=True)
+                    instance.convert(path, tmp)
+                    os.replace(tmp, out)
+                    self._count('converted')
+                    fut.set_result(out)
+                except Exception as e:
+                    fut.set_exception(e)
+        else:
+            self._run_cli_batch(slot, batch)
+        print(f"[convert] slot {slot}: done in {time.time() - start:.1f}s")
+        self._evict(keep={out for _, _, out, _ in batch})
+
+    def _evict(self, keep=()):
+        """Drop least recently used conversions once the cache exceeds CACHE_BYTES (down to 80%)"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return
+        for d in os.scandir(self.cache_dir):
+            if d.is_dir():
+                entries += [(f.stat().st_mtime, f.stat().st_size, f.path) for f in os.scandir(d.path)
+                            if f.name.endswith('.pdf') and '.tmp' not in f.name]
+        total = sum(size for _, size, _ in entries)
+        if total <= CACHE_BYTES:
+            return
+        for _, size, path in sorted(entries):
+            if total <= CACHE_BYTES * 0.8:
+                break
+            if path in keep:
+                continue
+            try:
+                os.unlink(path)
+                total -= size
+                os.rmdir(os.path.dirname(path))  # <sha256>/ holds one PDF
+            except OSError:
+                pass
+
+    def _uno_instance(self, slot):
+        """Live UNO instance for slot (restarted if it died), or None → CLI backend"""
+        if not self._use_uno:
+            return None
+        inst = self._uno.get(slot)
+        if inst and inst.alive():
+            return inst
+        try:
+            inst = self._uno[slot] = _UnoInstance(slot)
+            return inst
+        except ImportError:
+            self._use_uno = False  # No bindings in this interpreter: stay on the CLI backend
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            print(f"[convert] UNO listener unavailable ({e}), using soffice --convert-to")
+            self._use_uno = False
+        return None
+
+    def _run_cli_batch(self, slot, batch):
+        """One soffice process converts the whole batch (startup paid once)"""
+        work = tempfile.mkdtemp(prefix='soffice_')
+        try:
+            inputs = []
+            for path, digest, _, _ in batch:
+                src = os.path.join(work, f"{digest}{os.path.splitext(path)[1].lower()}")  # Unique names per batch
+                shutil.copyfile(path, src)
+                inputs.append(src)
+            subprocess.run(['soffice', '--headless', '--norestore', f"-env:UserInstallation={_profile_url(slot)}",
+                            '--convert-to', 'pdf', '--outdir', work] + inputs,
+                           check=True, capture_output=True, timeout=FILE_TIMEOUT * len(batch))
+
+            for path, digest, out, fut in batch:
+                produced = os.path.join(work, f"{digest}.pdf")
+                if os.path.exists(produced):
+                    os.makedirs(os.path.dirname(out), exist_ok=True)
+                    shutil.move(produced, out)
+                    self._count('converted')
+                    fut.set_result(out)
+                else:
+                    fut.set_exception(RuntimeError(f"Conversion succeeded but PDF not found: {os.path.basename(path)}"))
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    def shutdown(self):
+        for inst in list(self._uno.values()):
+            inst.close()
+        self._uno.clear()
+
+
+_converter = None
+_converter_lock = threading.Lock()
+
+
+def get_office_converter():
+    """Process-wide OfficeConverter (LibreOffice listeners are shut down at exit)"""
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            _converter = OfficeConverter()
+            atexit.register(_converter.shutdown)
+        return _converter
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python mgrOfficeConvert.py <file.docx|file.pptx> [...]")
+        sys.exit(1)
+
+    conv = get_office_converter()
+    t0 = time.time()
+    futures = {p: conv.submit(p) for p in sys.argv[1:]}
+    for p, fut in futures.items():
+        try:
+            print(f"✓ {p} → {fut.result()}")
+        except Exception as e:
+            print(f"✗ {p}: {e}")
+    print(f"{time.time() - t0:.1f}s, {conv.stats}")
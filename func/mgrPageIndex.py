@@ -0,0 +1,285 @@
+"""Page retrieval index - send only the relevant pages of big references to the AI
+
+Per-page text of PDFs (text files: ~PAGE_CHARS pseudo-pages) is extracted once
+per content hash into AAFS/cache/pages/<sha256>.json.gz. A BM25 index over
+those pages is built in memory (postings as NumPy arrays, vectorized scoring)
+and cached for the most recent file sets.
+
+Usage:
+    from func.mgrPageIndex import search, excerpt_for_query
+    hits = search(['textbook.pdf', 'lecture3.pdf'], "enzyme kinetics Michaelis-Menten")
+    files, note = excerpt_for_query(ref_files, description, out_dir)   # excerpt PDFs + prompt note
+
+CLI:
+    python mgrPageIndex.py "<query>" <file> [file ...]
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import threading
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+from func.utilHash import sha256_file
+
+K1, B = 1.5, 0.75           # BM25 parameters
+TOP_K = 8                   # best pages per query
+NEIGHBORS = 1               # pages kept on each side of a hit (topics span page breaks)
+MAX_PAGES = 24              # cap of pages sent per call
+SMALL_TOTAL = 20            # a reference of up to this many pages is sent whole
+PAGE_CHARS = 3000           # pseudo-page size of text files
+INDEX_CACHE = 4             # in-memory indexes kept (by file set)
+
+TEXT_EXTENSIONS = ('.txt', '.md', '.py', '.js', '.java', '.cpp', '.c', '.go', '.rs', '.html', '.xml', '.json', '.csv')
+
+_TOKEN = re.compile(r"[a-z0-9]+|[一-鿿]")
+_STOPWORDS = frozenset("""a an and are as at be by for from has have in is it its of on or that the this to was were
+will with which what when where who how why not no do does did can could should would may might than then there these
+those their they them we you your our i he she his her been being into about over under also more most such each per""".split())
+
+
+def tokenize(text):
+    """Lowercase terms without stopwords; trailing plural 's' folded"""
+    terms = []
+    for t in _TOKEN.findall(text.lower()):
+        if t in _STOPWORDS or (len(t) < 2 and not '一' <= t <= '鿿'):
+            continue
+        if len(t) > 3 and t.endswith('s') and not t.endswith('ss'):
+            t = t[:-1]
+        terms.append(t)
+    return terms
+
+
+# === Page text (cached per content hash) ===
+
+_text_lock = threading.Lock()
+
+
+def page_texts(path):
+    """Text of each page of path (PDF pages; text files split into ~PAGE_CHARS chunks)"""
+    digest = sha256_file(path)
+    cache_file = os.path.join(config.PAGES_CACHE_DIR, f"{digest}.json.gz")
+    try:
+        with gzip.open(cache_file, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if os.path.splitext(path)[1].lower() == '.pdf':
+        from PyPDF2 import PdfReader
+        pages = []
+        for page in PdfReader(path).pages:
+            try:
+                pages.append(page.extract_text() or '')
+            except Exception:  # Broken content stream: keep page numbering
+                pages.append('')
+    else:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+        pages, current = [], ''
+        for line in text.splitlines(keepends=True):
+            if current and len(current) + len(line) > PAGE_CHARS:
+                pages.append(current)
+                current = ''
+            current += line
+        pages.append(current)
+
+    with _text_lock:
+        os.makedirs(config.PAGES_CACHE_DIR, exist_ok=True)
+        tmp = f"{cache_file}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(pages, f)
+        os.replace(tmp, cache_file)
+    return pages
+
+
+# === BM25 ===
+
+class PageIndex:
+    """BM25 over pages: postings are (term-sorted) NumPy arrays, a query is a few vector adds"""
+
+    def __init__(self, pages):
+        """pages: [(source, page_no (1-based), text)]"""
+        import numpy as np
+        self.pages = [(src, no) for src, no, _ in pages]
+        n = max(len(pages), 1)
+        vocab, terms, docs = {}, [], []
+        lengths = np.zeros(n, dtype=np.float32)
+        for i, (_, _, text) in enumerate(pages):
+            ids = [vocab.setdefault(t, len(vocab)) for t in tokenize(text)]
+            lengths[i] = len(ids)
+            terms.extend(ids)
+            docs.extend([i] * len(ids))
+
+        # (term, page) pairs → unique pairs sorted by term, with term frequencies
+        pairs, tf = np.unique(np.asarray(terms, dtype=np.int64) * n + np.asarray(docs, dtype=np.int64),
+                              return_counts=True)
+        self.vocab = vocab
+        self._docs = (pairs % n).astype(np.int32)
+        self._tf = tf.astype(np.float32)
+        self._offsets = np.searchsorted(pairs // n, np.arange(len(vocab) + 1))
+        df = np.diff(self._offsets).astype(np.float32)
+        self._idf = np.log1p((len(pages) - df + 0.5) / (df + 0.5))
+        self._norm = K1 * (1 - B + B * lengths / max(float(lengths.mean()), 1.0))
+        self._n = len(pages)
+
+    def scores(self, query):
+        """BM25 score of every page for query (NumPy array)"""
+        import numpy as np
+        scores = np.zeros(self._n, dtype=np.float32)
+        ids = [self.vocab[t] for t in tokenize(query) if t in self.vocab]
+        for t, qtf in zip(*np.unique(np.asarray(ids, dtype=np.int64), return_counts=True)):
+            s, e = self._offsets[t], self._offsets[t + 1]
+            docs, tf = self._docs[s:e], self._tf[s:e]
+            scores[docs] += qtf * self._idf[t] * tf * (K1 + 1) / (tf + self._norm[docs])  # docs unique per term
+        return scores
+
+    def search(self, query, k=TOP_K):
+        """Top-k pages: [{'source', 'page', 'score'}] best first (pages scoring 0 are left out)"""
+        import numpy as np
+        if not self._n:
+            return []
+        scores = self.scores(query)
+        k = min(k, self._n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{'source': self.pages[i][0], 'page': self.pages[i][1], 'score': float(scores[i])}
+                for i in top if scores[i] > 0]
+
+
+_indexes = OrderedDict()  # tuple of content hashes → PageIndex
+_indexes_lock = threading.Lock()
+
+
+def get_index(paths):
+    """PageIndex over all pages of paths (recent file sets are kept in memory)"""
+    key = tuple(sha256_file(p) for p in paths)
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    index = PageIndex([(p, i + 1, text) for p in paths for i, text in enumerate(page_texts(p))])
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def search(paths, query, k=TOP_K):
+    return get_index(paths).search(query, k)
+
+
+# === Excerpts ===
+
+def select_pages(hits, page_counts, neighbors=NEIGHBORS, max_pages=MAX_PAGES):
+    """{source: sorted page numbers}: hits in score order plus neighbors, until max_pages"""
+    chosen, total = {}, 0
+    for hit in hits:
+        count = page_counts[hit['source']]
+        for page in range(max(hit['page'] - neighbors, 1), min(hit['page'] + neighbors, count) + 1):
+            pages = chosen.setdefault(hit['source'], set())
+            if page not in pages and total < max_pages:
+                pages.add(page)
+                total += 1
+    return {src: sorted(pages) for src, pages in chosen.items()}
+
+
+def write_excerpt_pdf(path, pages, out_path):
+    """PDF with only pages (1-based) of path"""
+    from PyPDF2 import PdfReader, PdfWriter
+    reader = PdfReader(path)
+    writer = PdfWriter()
+    for page in pages:
+        writer.add_page(reader.pages[page - 1])
+    with open(out_path, 'wb') as f:
+        writer.write(f)
+    return out_path
+
+
+def _ranges(pages):
+    """[3, 4, 5, 9] → '3-5, 9'"""
+    out, start = [], None
+    for i, page in enumerate(pages):
+        if start is None:
+            start = page
+        if i == len(pages) - 1 or pages[i + 1] != page + 1:
+            out.append(str(start) if start == page else f"{start}-{page}")
+            start = None
+    return ', '.join(out)
+
+
+def excerpt_for_query(paths, query, out_dir, k=TOP_K):
+    """
+    Reduce reference files to the pages relevant to query
+
+    Returns:
+        (files, note): files to attach (excerpt PDFs, small or unindexable files
+        as they are) and a prompt note naming the pages sent and the files
+        left out (text-file excerpts are included in the note itself).
+        Smallness is judged per file: a short rubric next to a textbook is
+        always attached whole.
+    """
+    indexable = [p for p in paths if os.path.splitext(p)[1].lower() in ('.pdf',) + TEXT_EXTENSIONS]
+    others = [p for p in paths if p not in indexable]
+    try:
+        counts = {p: len(page_texts(p)) for p in indexable}
+    except Exception as e:
+        print(f"[pages] Text extraction failed ({e}), sending files whole")
+        return list(paths), ""
+
+    textless = [p for p in indexable if not any(t.strip() for t in page_texts(p))]  # Scans: nothing to rank
+    small = [p for p in indexable if p not in textless and counts[p] <= SMALL_TOTAL]
+    indexable = [p for p in indexable if p not in textless and p not in small]
+    if not indexable:
+        return list(paths), ""
+
+    hits = search(indexable, query, k)
+    if not hits:
+        return list(paths), ""
+    selected = select_pages(hits, counts)
+
+    files, inline, omitted = others + textless + small, [], []
+    notes = [f"{os.path.basename(p)} (all {counts[p]} pages)" for p in small]
+    os.makedirs(out_dir, exist_ok=True)
+    for path in indexable:
+        pages = selected.get(path)
+        if not pages:
+            omitted.append(os.path.basename(path))
+            continue
+        name = os.path.basename(path)
+        notes.append(f"{name} pp. {_ranges(pages)} of {counts[path]}")
+        if path.lower().endswith('.pdf'):
+            out_name = f"{os.path.splitext(name)[0]}_{sha256_file(path)[:12]}_excerpt.pdf"  # Same basename, other folder
+            files.append(write_excerpt_pdf(path, pages, os.path.join(out_dir, out_name)))
+        else:
+            texts = page_texts(path)
+            inline.extend(f"--- {name} (part {p}) ---\n{texts[p - 1]}" for p in pages)
+
+    sent = sum(len(p) for p in selected.values())
+    print(f"[pages] Sending {sent} of {sum(counts[p] for p in indexable)} pages: {'; '.join(notes)}")
+    note = ("\n\n**Reference excerpts** (only the pages most relevant to this task are attached): "
+            + '; '.join(notes))
+    if omitted:
+        print(f"[pages] No relevant pages in: {', '.join(omitted)}")
+        note += f"\n\nNot attached (no pages matched this task): {', '.join(omitted)}"
+    if inline:
+        note += "\n\n" + "\n\n".join(inline)
+    return files, note
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('Usage: python mgrPageIndex.py "<query>" <file> [file ...]')
+        sys.exit(1)
+    import time
+    t0 = time.time()
+    index = get_index(sys.argv[2:])
+    t1 = time.time()
+    hits = index.search(sys.argv[1])
+    print(f"{len(index.pages)} pages, {len(index.vocab):,} terms; index {t1 - t0:.2f}s, query {(time.time() - t1) * 1000:.1f}ms")
+    for h in hits:
+        print(f"  {h['score']:6.2f}  {os.path.basename(h['source'])} p.{h['page']}")
@@ -0,0 +1,197 @@
+"""Process-wide AI rate limiter - token buckets per (provider, model)
+
+Every call_ai() goes through the limiter of its provider/model, so all Mission
+Control tasks, batch pools and one-off calls share one budget:
+    - requests/min and input tokens/min token buckets (refill continuously)
+    - callers are served first-come first-served (no starvation, no herd)
+    - a throttling error puts the whole model on cooldown: the server's retry
+      hint if it sent one, else jittered exponential backoff. Buckets are
+      drained, so callers resume one by one as they refill, not all at once.
+
+Limits are the interactive API tiers; tune LIMITS / MODEL_LIMITS to your account.
+
+Usage:
+    from func.mgrRateLimit import get_rate_limiter
+    limiter = get_rate_limiter('Gemini', 'gemini-2.5-pro')
+    limiter.acquire(tokens)
+"""
+import os
+import re
+import sys
+import time
+import random
+import threading
+from collections import deque
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Per provider default, per model overrides (first matching prefix wins)
+LIMITS = {
+    'Gemini': {'rpm': 150, 'tpm': 1_000_000},
+    'Claude': {'rpm': 50, 'tpm': 400_000},
+    'Fake': {'rpm': 600, 'tpm': 10_000_000},  # func/ai._FakeProvider (its own quota: FAKE_DEFAULTS['rpm'])
+}
+MODEL_LIMITS = {
+    'gemini-2.5-pro': {'rpm': 60, 'tpm': 1_000_000},
+}
+MAX_RETRIES = 4
+BACKOFF_BASE = 5      # seconds, doubled per attempt
+BACKOFF_CAP = 120
+
+RATE_LIMIT_STATUS = (429, 529)  # Too Many Requests, Anthropic "overloaded"
+_RATE_LIMIT_TEXT = re.compile(r"rate[ _-]?limit|RESOURCE_EXHAUSTED|overloaded|too many requests", re.I)
+
+_RETRY_HINTS = [re.compile(r"retry[_ ]?delay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", re.I),
+                re.compile(r"retry[- ]after['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)", re.I),
+                re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.I)]
+
+
+def status_code(e):
+    """HTTP status of an SDK error (anthropic: .status_code, google-genai: .code, else .response), or None"""
+    for value in (getattr(e, 'status_code', None), getattr(e, 'code', None),
+                  getattr(getattr(e, 'response', None), 'status_code', None)):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    return None
+
+
+def is_rate_limit_error(e):
+    """True for provider throttling / overload errors worth retrying
+
+    SDK errors are classified by their HTTP status. Other exceptions only by
+    phrases - bare digits like '429' also occur in file names, page counts
+    and request ids.
+    """
+    code = status_code(e)
+    if code is not None:
+        return code in RATE_LIMIT_STATUS
+    return bool(_RATE_LIMIT_TEXT.search(str(e)))
+
+
+def retry_hint(e):
+    """Server-suggested wait in seconds (Retry-After header or RetryInfo delay), or None"""
+    response = getattr(e, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    for name in ('retry-after', 'Retry-After'):
+        try:
+            return float(headers[name])
+        except (KeyError, TypeError, ValueError):
+            pass
+    for pattern in _RETRY_HINTS:
+        m = pattern.search(str(e))
+        if m:
+            return float(m.group(1))
+    return None
+
+
+def backoff(attempt, hint=None):
+    """Wait before retry attempt+1: the server hint (+ up to 10% jitter) or capped exponential, equal jitter"""
+    if hint is not None:
+        return hint * random.uniform(1.0, 1.1)
+    ceiling = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class TokenBucket:
+    """Continuously refilling bucket of capacity units per minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.stamp = time.monotonic()
+
+    def _refill(self, now):
+        if now > self.stamp:
+            self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+            self.stamp = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount is available (amount is capped at capacity: oversized calls run alone)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def drain(self, until):
+        """Empty the bucket; refilling starts at until (monotonic time)"""
+        self.level = min(self.level, 0.0)
+        self.stamp = max(self.stamp, until)
+
+
+class RateLimiter:
+    """Requests/min + tokens/min for one provider model; FIFO admission; shared cooldown"""
+
+    def __init__(self, name, rpm, tpm):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.cooldown_until = 0.0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self.stats = {'calls': 0, 'throttled': 0, 'waited': 0.0}
+
+    def acquire(self, tokens=0):
+        """Block until this call fits both buckets and every earlier caller has been admitted"""
+        ticket = object()
+        start = time.monotonic()
+        with self._cond:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = 0.0
+                    if self._queue[0] is ticket:
+                        wait = max(self.cooldown_until - now, self.requests.wait_time(1, now),
+                                   self.tokens.wait_time(tokens, now))
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            self.stats['calls'] += 1
+                            self.stats['waited'] += now - start
+                            return
+                    self._cond.wait(timeout=wait or None)
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def throttled(self, wait):
+        """A call was rejected: pause the model for wait seconds and restart the buckets from empty"""
+        with self._cond:
+            self.stats['throttled'] += 1
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + wait)
+            self.requests.drain(self.cooldown_until)
+            self.tokens.drain(self.cooldown_until)
+            self._cond.notify_all()
+
+
+def _limits_for(product, model):
+    for prefix, limits in MODEL_LIMITS.items():
+        if (model or '').startswith(prefix):
+            return limits
+    return LIMITS.get(product, LIMITS['Claude'])
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(product, model):
+    """Process-wide RateLimiter of (product, model)"""
+    key = (product, model)
+    with _limiters_lock:
+        if key not in _limiters:
+            limits = _limits_for(product, model)
+            _limiters[key] = RateLimiter(f"{product}/{model}", limits['rpm'], limits['tpm'])
+        return _limiters[key]
+
+
+def estimate_request_tokens(prompt, prefix=None, uploaded_info=None):
+    """Input-token estimate of a call (text: local estimate; attachments: size heuristic)"""
+    from func.utilTokens import estimate_tokens
+    tokens = estimate_tokens(prompt) + estimate_tokens(prefix or '')
+    for info in uploaded_info or []:
+        tokens += 2000 + (info.get('size') or 0) // 2000  # PDFs: ~258 tokens/page, pages are a few KB each
+    return tokens
@@ -0,0 +1,139 @@
+"""Learning-report cache - manifest of (source hash, prompt hash, product, model) per report
+
+Per course:  Learn/reports/manifest.json   {report.md: entry}
+Shared:      AAFS/cache/reports/<key>.md   (identical inputs in any course → same report)
+
+A report is fresh only if its manifest entry's key matches the current inputs,
+so edited sources and changed prompts/models are regenerated automatically.
+
+Reports are user-editable, so they are placed with hardlink=False (reflink or
+copy): an edit saved in place must not reach the shared cache or other courses.
+"""
+import os
+import sys
+import json
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+from func.utilHash import sha256_file, sha256_text
+from func.utilWorkspace import link_file
+
+MANIFEST_NAME = 'manifest.json'
+
+_lock = threading.Lock()
+
+
+def make_entry(source_path, template, product, model):
+    """Describe the inputs of one report (template = resolved prompt before file interpolation)"""
+    source_sha = sha256_file(source_path)
+    prompt_sha = sha256_text(template)
+    return {
+        'source': os.path.basename(source_path),
+        'source_sha256': source_sha,
+        'prompt_sha256': prompt_sha,
+        'product': product,
+        'model': model,
+        'key': sha256_text('|'.join([source_sha, prompt_sha, product, model])),
+    }
+
+
+def packed_entry(entry):
+    """Entry of the same inputs answered in a packed request (its own key: different prompt, shared output)"""
+    return dict(entry, packed=True, key=sha256_text(entry['key'] + '|packed'))
+
+
+def _manifest_path(output_md_path):
+    return os.path.join(os.path.dirname(output_md_path), MANIFEST_NAME)
+
+
+def load_manifest(reports_dir):
+    """Load a course's report manifest ({} if missing/corrupt)"""
+    path = os.path.join(reports_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+
+def _save_manifest(reports_dir, manifest):
+    path = os.path.join(reports_dir, MANIFEST_NAME)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _shared_path(key):
+    return os.path.join(config.REPORTS_CACHE_DIR, f"{key}.md")
+
+
+def recorded(output_md_path):
+    """Manifest entry of the report on disk (None if unrecorded or the report is gone)"""
+    with _lock:
+        rec = load_manifest(os.path.dirname(output_md_path)).get(os.path.basename(output_md_path))
+    return rec if rec and os.path.exists(output_md_path) else None
+
+
+def check(entry, output_md_path):
+    """Decide whether a report needs an AI call
+
+    Returns:
+        'fresh'  - report on disk matches the manifest entry
+        'shared' - identical report found in the shared cache and linked into place
+        None     - missing or stale, must regenerate
+    """
+    reports_dir = os.path.dirname(output_md_path)
+    with _lock:
+        rec = load_manifest(reports_dir).get(os.path.basename(output_md_path))
+    if rec and os.path.exists(output_md_path) and rec.get('key') in (entry['key'], packed_entry(entry)['key']):
+        return 'fresh'  # A packed report of the same inputs stays valid in place
+
+    shared = _shared_path(entry['key'])
+    if os.path.exists(shared):
+        link_file(shared, output_md_path, hardlink=False)
+        _update_manifest(entry, output_md_path)
+        return 'shared'
+    return None
+
+
+def detach(output_md_path):
+    """Give a report its own inode before rewriting it
+
+    Reports placed by older versions may be hardlinked with the shared cache;
+    writing through the link would silently change the cached report of the
+    *old* inputs.
+    """
+    if os.path.exists(output_md_path) and os.stat(output_md_path).st_nlink > 1:
+        tmp = output_md_path + '.tmp'
+        with open(output_md_path, 'rb') as src, open(tmp, 'wb') as dst:
+            dst.write(src.read())
+        os.replace(tmp, output_md_path)
+
+
+def forget(output_md_path):
+    """Drop a report's manifest entry (it is about to be rewritten)"""
+    reports_dir = os.path.dirname(output_md_path)
+    with _lock:
+        manifest = load_manifest(reports_dir)
+        if manifest.pop(os.path.basename(output_md_path), None) is not None:
+            _save_manifest(reports_dir, manifest)
+
+
+def record(entry, output_md_path):
+    """Register a freshly generated report (manifest + shared cache)"""
+    os.makedirs(config.REPORTS_CACHE_DIR, exist_ok=True)
+    link_file(output_md_path, _shared_path(entry['key']), hardlink=False)
+    _update_manifest(entry, output_md_path)
+
+
+def _update_manifest(entry, output_md_path):
+    reports_dir = os.path.dirname(output_md_path)
+    with _lock:
+        manifest = load_manifest(reports_dir)
+        manifest[os.path.basename(output_md_path)] = dict(entry, generated_at=datetime.now().isoformat(timespec='seconds'))
+        _save_manifest(reports_dir, manifest)
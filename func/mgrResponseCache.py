@@ -0,0 +1,172 @@
+"""AI response cache - identical requests are answered from disk
+
+Opt-in (call_ai(..., cache=True)). Entries are keyed by func.ai.response_cache_key:
+product, model, prompt (+ prefix, thinking) and the content hashes of the
+attachments - never by remote upload handles, which change on re-upload.
+
+Storage: AAFS/cache/responses/<key>.txt.gz + index.json
+    - per-entry TTL (default 30 days)
+    - LRU eviction once the compressed total exceeds MAX_BYTES
+    - hits only touch the in-memory index; access times reach index.json with
+      the next put/forget, at most every FLUSH_INTERVAL on hits, and at exit
+
+Usage:
+    from func.mgrResponseCache import get_response_cache
+    text = get_response_cache().get(key)
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import atexit
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+
+MAX_BYTES = 200 * 1024 * 1024   # Compressed size budget
+DEFAULT_TTL = 30 * 24 * 3600
+FLUSH_INTERVAL = 60             # s between index writes caused by hits alone
+
+
+class ResponseCache:
+    """Thread-safe gzip response store with TTL + size-bounded LRU"""
+
+    def __init__(self, cache_dir=None, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir or config.RESPONSES_CACHE_DIR
+        self.index_file = os.path.join(self.cache_dir, 'index.json')
+        self.max_bytes = max_bytes
+        self._index = None
+        self._dirty = False             # LRU times changed since the last write
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.txt.gz")
+
+    def _load(self):
+        if self._index is None:
+            self._index = {}
+            if os.path.exists(self.index_file):
+                try:
+                    with open(self.index_file, 'r', encoding='utf-8') as f:
+                        self._index = json.load(f)
+                except (json.JSONDecodeError, IOError):
+                    pass
+        return self._index
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self.index_file + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(tmp, self.index_file)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def flush(self):
+        """Write pending access times (hits) to index.json"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _drop(self, key):
+        self._index.pop(key, None)
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def get(self, key):
+        """Cached response text, or None (missing / expired)"""
+        with self._lock:
+            rec = self._load().get(key)
+            if not rec:
+                return None
+            now = time.time()
+            if rec['created'] + rec['ttl'] < now or not os.path.exists(self._path(key)):
+                self._drop(key)
+                self._save()
+                return None
+            rec['used'] = now
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= FLUSH_INTERVAL:
+                self._save()
+        try:
+            with gzip.open(self._path(key), 'rt', encoding='utf-8') as f:
+                return f.read()
+        except OSError:  # Evicted meanwhile by another thread
+            return None
+
+    def put(self, key, text, ttl=None, **meta):
+        """Store a response (meta: small JSON-able fields kept in the index, e.g. model)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+        now = time.time()
+        with self._lock:
+            index = self._load()
+            index[key] = dict(meta, size=os.path.getsize(path), created=now, used=now, ttl=ttl or DEFAULT_TTL)
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        now = time.time()
+        for key in [k for k, r in self._index.items() if r['created'] + r['ttl'] < now]:
+            self._drop(key)
+        total = sum(r['size'] for r in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]['used']):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]['size']
+            self._drop(key)
+
+    def forget(self, key):
+        """Drop one entry (e.g. the caller found the cached answer unusable)"""
+        with self._lock:
+            if key in self._load():
+                self._drop(key)
+                self._save()
+
+    def stats(self):
+        """{'entries', 'bytes'}"""
+        with self._lock:
+            index = self._load()
+            return {'entries': len(index), 'bytes': sum(r['size'] for r in index.values())}
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._load()):
+                self._drop(key)
+            self._save()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide ResponseCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+            atexit.register(_cache.flush)
+        return _cache
+
+
+if __name__ == '__main__':
+    cache = get_response_cache()
+    if sys.argv[1:] == ['clear']:
+        cache.clear()
+        print("✓ Response cache cleared")
+    else:
+        s = cache.stats()
+        print(f"{s['entries']} responses, {s['bytes'] / 1024 / 1024:.1f} MB (limit {cache.max_bytes / 1024 / 1024:.0f} MB)")
+        print("Usage: python mgrResponseCache.py [clear]")
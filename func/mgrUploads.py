@@ -0,0 +1,307 @@
+"""Provider file-upload manager - parallel, content-hash deduplicated, reusable uploads
+
+Gemini keeps uploaded files for 48 h. Instead of re-uploading the same chapter
+PDF for every report/retry, remote handles are stored in a persistent registry
+keyed by (product, API key fingerprint, content SHA-256) and reused until they
+are about to expire.
+
+Claude goes through the Files API (referenced by file_id). If that is not
+available, the base64 payload is encoded once per content hash into
+AAFS/cache/encoded/ (LRU, ENCODED_BYTES budget) and read back at request
+time instead of being re-encoded.
+
+Usage:
+    from func.mgrUploads import get_upload_manager
+    uploaded_info = get_upload_manager().upload([pdf1, pdf2], 'Gemini')
+"""
+import os
+import re
+import sys
+import json
+import time
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+from func.utilHash import sha256_file, sha256_text
+
+REGISTRY_FILE = os.path.join(config.JSONS_DIR, 'uploads.json')
+GEMINI_TTL = 48 * 3600       # Gemini Files API retention
+CLAUDE_TTL = 30 * 24 * 3600  # Claude files persist until deleted; re-check monthly
+EXPIRY_MARGIN = 3600         # Re-upload when less than 1 h is left
+UPLOAD_WORKERS = 4
+ENCODE_CHUNK = 3 * 1024 * 1024  # Multiple of 3 → chunks concatenate into valid base64
+ENCODED_BYTES = 1024 * 1024 * 1024  # Size budget of cached base64 payloads (LRU by mtime)
+
+MIME_TYPES = {
+    'pdf': 'application/pdf', 'csv': 'text/csv', 'txt': 'text/plain',
+    'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'gif': 'image/gif', 'webp': 'image/webp',
+}
+
+CLAUDE_TYPES = {'application/pdf': 'document', 'image/png': 'image', 'image/jpeg': 'image',
+                'image/gif': 'image', 'image/webp': 'image'}
+
+
+def _mime_for(path):
+    return MIME_TYPES.get(os.path.splitext(path)[1].lower()[1:], 'application/octet-stream')
+
+
+def claude_supported(path):
+    """Claude takes PDFs and images as document/image blocks; other files must go into the prompt"""
+    return _mime_for(path) in CLAUDE_TYPES
+
+
+def _files_api_unsupported(e):
+    """Claude Files API missing for this SDK/key (→ inline payloads), as opposed to a failed request"""
+    from func.mgrRateLimit import status_code
+    if isinstance(e, (ImportError, AttributeError, TypeError)):  # Old SDK: no beta.files / betas argument
+        return True
+    code = status_code(e)
+    return code == 404 or (code in (400, 403) and 'beta' in str(e).lower())
+
+
+# A file handle the provider cannot resolve (not a bad key / unknown model, which also give 403/404)
+_STALE_FILE = re.compile(r"file.*(not found|not exist|expired|permission)|permission.*file", re.I)
+
+
+def is_stale_handle_error(e, uploaded_info):
+    """The provider no longer knows a registered file handle (deleted remotely, other project...)"""
+    from func.mgrRateLimit import status_code
+    if not any(i.get('file_id') or i.get('uri') for i in uploaded_info or []):
+        return False
+    return status_code(e) in (None, 400, 403, 404) and bool(_STALE_FILE.search(str(e)))
+
+
+def _transient(e):
+    """Upload errors worth retrying: throttling, 5xx, connection failures"""
+    from func.mgrRateLimit import is_rate_limit_error, status_code
+    if is_rate_limit_error(e) or (status_code(e) or 0) >= 500 or isinstance(e, (ConnectionError, TimeoutError)):
+        return True
+    connection_error = getattr(sys.modules.get('anthropic'), 'APIConnectionError', None)  # Includes APITimeoutError
+    return connection_error is not None and isinstance(e, connection_error)
+
+
+class UploadManager:
+    """Thread-safe upload registry + parallel uploader"""
+
+    def __init__(self, registry_file=REGISTRY_FILE):
+        self.registry_file = registry_file
+        self._registry = None
+        self._inflight = {}  # reg_key -> Future (concurrent requests for the same bytes share one upload)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix='upload')
+        self._claude_files_api = True
+
+    # === Registry ===
+
+    def _load(self):
+        if self._registry is None:
+            self._registry = {}
+            if os.path.exists(self.registry_file):
+                try:
+                    with open(self.registry_file, 'r', encoding='utf-8') as f:
+                        self._registry = json.load(f)
+                except (json.JSONDecodeError, IOError):
+                    pass
+        return self._registry
+
+    def _save(self):
+        now = time.time()
+        live = {k: v for k, v in self._registry.items() if v.get('expires_at', 0) > now}
+        os.makedirs(os.path.dirname(self.registry_file), exist_ok=True)
+        tmp = self.registry_file + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(live, f, indent=2)
+        os.replace(tmp, self.registry_file)
+        self._registry = live
+
+    @staticmethod
+    def _reg_key(product, content_key):
+        api_key = config.GEMINI_API_KEY if product == 'Gemini' else config.CLAUDE_API_KEY
+        return f"{product}:{sha256_text(api_key or '')[:12]}:{content_key}"
+
+    def lookup(self, product, content_key, margin=EXPIRY_MARGIN):
+        """Return [info] for an upload registered under content_key with more than margin seconds left, else None"""
+        with self._lock:
+            rec = self._load().get(self._reg_key(product, content_key))
+        if rec and rec['expires_at'] - margin > time.time():
+            return [dict(rec, content_key=content_key)]
+        return None
+
+    def forget(self, product, content_key):
+        """Drop a handle (e.g. the provider reports it no longer exists)"""
+        with self._lock:
+            if self._load().pop(self._reg_key(product, content_key), None):
+                self._save()
+
+    # === Upload ===
+
+    def upload(self, files, product, keys=None, margin=EXPIRY_MARGIN):
+        """Upload files (in parallel), reusing live remote handles
+
+        Args:
+            files: Local paths
+            product: 'Gemini' or 'Claude'
+            keys: Optional content keys (default: SHA-256 of each file)
+            margin: Remaining lifetime (s) a handle needs to be reused (batch jobs outlive the default)
+
+        Returns:
+            list: uploaded_info dicts in input order (missing/unsupported files skipped)
+        """
+        if product == 'Gemini':
+            upload_one = self._upload_gemini_one
+        elif product == 'Claude':
+            upload_one = self._upload_claude_one
+        else:
+            raise ValueError(f"Unknown product: {product}")
+
+        pairs = [(f, k) for f, k in zip(files, keys or [None] * len(files))
+                 if os.path.exists(f) and (product != 'Claude' or claude_supported(f))]
+        skipped = [os.path.basename(f) for f in files if product == 'Claude' and not claude_supported(f)]
+        if skipped:
+            print(f"[upload] Not sent to Claude (unsupported type): {', '.join(skipped)}")
+
+        futures, content_keys = [], []
+        for path, key in pairs:
+            key = key or sha256_file(path)
+            content_keys.append(key)
+            cached = self.lookup(product, key, margin)
+            if cached:
+                futures.append(cached[0])
+                continue
+            reg_key = self._reg_key(product, key)
+            with self._lock:
+                fut = self._inflight.get(reg_key)
+                if fut is None:
+                    fut = self._pool.submit(self._run_upload, upload_one, path, key, reg_key)
+                    self._inflight[reg_key] = fut
+            futures.append(fut)
+
+        results = [f.result() if isinstance(f, Future) else f for f in futures]
+        # content_key: stable identity of the bytes (response cache keys, unlike remote handles)
+        return [dict(info, filename=os.path.basename(path), path=path, content_key=key)
+                for info, (path, _), key in zip(results, pairs, content_keys)]
+
+    def refresh(self, uploaded_info, product):
+        """Forget the remote handles of uploaded_info and upload those files again → new uploaded_info"""
+        stale = [i for i in uploaded_info if (i.get('file_id') or i.get('uri')) and i.get('path')]
+        for i in stale:
+            self.forget(product, i['content_key'])
+        fresh = {i['content_key']: i for i in self.upload([i['path'] for i in stale], product,
+                                                          [i['content_key'] for i in stale])}
+        return [fresh.get(i['content_key'], i) if i in stale else i for i in uploaded_info]
+
+    def _run_upload(self, upload_one, path, key, reg_key):
+        try:
+            info, persist = upload_one(path, key)
+            if persist:
+                with self._lock:
+                    self._load()[reg_key] = {k: v for k, v in info.items() if k != 'uploaded_obj'}
+                    self._save()
+            return info
+        finally:
+            with self._lock:
+                self._inflight.pop(reg_key, None)
+
+    def _upload_gemini_one(self, path, key):
+        """Gemini Files API → (info, persist)"""
+        from func.ai import get_client
+        obj = get_client('Gemini').files.upload(file=str(path))
+        expiration = getattr(obj, 'expiration_time', None)
+        info = {
+            'filename': os.path.basename(path),
+            'size': os.path.getsize(path),
+            'uri': obj.name,  # 'files/...' handle (same as the legacy upload_files result)
+            'file_uri': getattr(obj, 'uri', None),
+            'mime_type': getattr(obj, 'mime_type', None) or _mime_for(path),
+            'expires_at': expiration.timestamp() if expiration else time.time() + GEMINI_TTL,
+            'uploaded_obj': obj,
+        }
+        print(f"[upload] {info['filename']} → {info['uri']}")
+        return info, True
+
+    def _upload_claude_one(self, path, key):
+        """Claude Files API → (info, persist); falls back to a cached base64 payload"""
+        mime = _mime_for(path)
+        info = {'filename': os.path.basename(path), 'size': os.path.getsize(path),
+                'mime': mime, 'type': CLAUDE_TYPES[mime]}
+
+        attempt = 0
+        while self._claude_files_api:
+            try:
+                from func.ai import CLAUDE_FILES_BETA, get_client
+                with open(path, 'rb') as fh:
+                    meta = get_client('Claude').beta.files.upload(file=(info['filename'], fh, mime), betas=[CLAUDE_FILES_BETA])
+                info.update(file_id=meta.id, expires_at=time.time() + CLAUDE_TTL)
+                print(f"[upload] {info['filename']} → {meta.id}")
+                return info, True
+            except Exception as e:
+                if _files_api_unsupported(e):
+                    # Old SDK / beta unavailable for this key: stay on inline payloads for this session
+                    print(f"[upload] Claude Files API unavailable ({e}), using inline base64")
+                    self._claude_files_api = False
+                    break
+                from func.mgrRateLimit import MAX_RETRIES, backoff, retry_hint
+                if not _transient(e) or attempt == MAX_RETRIES:
+                    raise
+                wait = backoff(attempt, retry_hint(e))
+                print(f"[upload] {info['filename']}: {e} - retry {attempt + 1}/{MAX_RETRIES} in {wait:.0f}s")
+                time.sleep(wait)
+                attempt += 1
+
+        info['data_file'] = encoded_payload(path, key)
+        return info, False
+
+
+def encoded_payload(path, digest=None):
+    """Path of the cached base64 encoding of path (encoded once per content hash, streamed)"""
+    digest = digest or sha256_file(path)
+    out = os.path.join(config.ENCODED_CACHE_DIR, f"{digest}.b64")
+    if os.path.exists(out):
+        try:
+            os.utime(out)  # LRU order
+        except OSError:
+            pass
+        return out
+    os.makedirs(config.ENCODED_CACHE_DIR, exist_ok=True)
+    tmp = f"{out}.{threading.get_ident()}.tmp"
+    with open(path, 'rb') as src, open(tmp, 'wb') as dst:
+        while chunk := src.read(ENCODE_CHUNK):
+            dst.write(base64.standard_b64encode(chunk))
+    os.replace(tmp, out)
+    _evict_encoded(keep=out)
+    return out
+
+
+def _evict_encoded(keep=None):
+    """Drop least recently used payloads once the cache exceeds ENCODED_BYTES (down to 80%)"""
+    with os.scandir(config.ENCODED_CACHE_DIR) as it:
+        entries = sorted((e.stat().st_mtime, e.stat().st_size, e.path) for e in it if e.name.endswith('.b64'))
+    total = sum(size for _, size, _ in entries)
+    if total <= ENCODED_BYTES:
+        return
+    for _, size, path in entries:
+        if total <= ENCODED_BYTES * 0.8:
+            break
+        if path == keep:
+            continue
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_upload_manager():
+    """Process-wide UploadManager singleton"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = UploadManager()
+        return _manager
@@ -0,0 +1,214 @@
+"""
+Batch Learn - concurrent learning-report generation with per-provider budgets
+
+Pipeline (two pools, so Office conversions overlap with AI calls):
+    convert pool : prepare_material()  (local only; concurrent Office conversions
+                   are batched by the LibreOffice service, func/mgrOfficeConvert)
+         │
+         ▼
+    AI pool      : generate_material() gated per provider by concurrency slots;
+                   requests/tokens per minute and 429 retries are handled for
+                   every call_ai() by the shared limiter (func/mgrRateLimit)
+
+Tiny text files from one folder are packed into shared requests (one report
+each); oversized files are split by generate_material (func/procLearnChunked).
+"""
+import os
+import sys
+import threading
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Parallel calls per provider (rate limits: func/mgrRateLimit.LIMITS)
+PROVIDER_BUDGETS = {
+    'Gemini': {'concurrency': 4},
+    'Claude': {'concurrency': 2},
+    'Fake': {'concurrency': 8},     # Offline provider (func/ai._FakeProvider) for load tests
+}
+CONVERT_WORKERS = 4         # Mostly waiting on func/mgrOfficeConvert - more requests → fuller soffice batches
+PACK_FILE_TOKENS = 1500     # Text files below this are packed with siblings...
+PACK_BUDGET = 8000          # ...into requests of up to this many input tokens
+PACK_MAX_FILES = 4          # (max_tokens scales with the files, up to procLearnChunked.PACK_MAX_OUTPUT)
+
+
+class ProviderScheduler:
+    """Runs AI calls within each provider's concurrency slots"""
+
+    def __init__(self, budgets=None):
+        budgets = budgets or PROVIDER_BUDGETS
+        self.slots = {p: threading.BoundedSemaphore(b['concurrency']) for p, b in budgets.items()}
+        self.concurrency = {p: b['concurrency'] for p, b in budgets.items()}
+
+    def run(self, product, fn):
+        """Call fn() holding one of product's slots"""
+        with self.slots[product]:
+            return fn()
+
+
+def _job_product(job):
+    """Provider budget a prepared job runs under (product is already resolved from 'Auto')"""
+    return job['product'] if job['product'] in PROVIDER_BUDGETS else 'Gemini'
+
+
+def run_learn_batch(file_paths, course_dir, progress=None, use_preferences=True, scheduler=None, product=None,
+                    model=None):
+    """
+    Generate learning reports for many files concurrently
+
+    Args:
+        file_paths: Source files (Learn/ materials)
+        course_dir: Course directory
+        progress: Optional TaskProgress (per-file rows via progress.item)
+        use_preferences: Load prompt/product/model from Learn preferences
+        scheduler: Optional ProviderScheduler (shared across batches)
+        product, model: Override the preferences (e.g. 'Fake' for offline load tests)
+
+    Up-to-date reports (func/mgrReportCache manifest) and reports shared from
+    identical files in other courses are skipped without an AI call.
+
+    Returns:
+        dict: {'success': [report paths], 'cached': [report paths], 'failed': [filenames],
+               'prompt_cache': PromptCacheStats (hit rate / tokens served from cache)}
+    """
+    from func.procLearnMaterial import prepare_material, generate_material, generate_packed_material, cleanup_material
+    from func.utilTokens import file_tokens, pack
+
+    from func.ai import PromptCacheStats
+    from func.mgrLedger import submit, current_task, get_ledger, format_rollup
+
+    scheduler = scheduler or ProviderScheduler()
+    prompt_cache = PromptCacheStats()  # Shared templates go out as a cached prefix
+    total = len(file_paths)
+    done = [0]
+    result = {'success': [], 'cached': [], 'failed': []}
+    packable = {}  # (folder, product, model, prompt) → tiny text jobs
+    lock = threading.Lock()
+
+    def item(path, status, state):
+        if progress:
+            progress.item(os.path.basename(path), status, state)
+
+    def finish_one(path, report, cached=False):
+        with lock:
+            done[0] += 1
+            bucket = 'failed' if not report else ('cached' if cached else 'success')
+            result[bucket].append(report or os.path.basename(path))
+            if progress:
+                progress.update(progress=min(int(done[0] / total * 100), 99),
+                                status=f"[{done[0]}/{total}] {len(result['failed'])} failed")
+
+    def generate(path, job):
+        product = _job_product(job)
+
+        def on_status(text):
+            item(path, text, 'warning' if 'rate limit' in text else 'running')
+
+        def call():
+            item(path, f"Generating ({product})...", 'running')
+            return generate_material(job, on_status=on_status)
+
+        try:
+            report = scheduler.run(product, call)
+            item(path, "Done", 'done')
+            finish_one(path, report)
+        except Exception as e:
+            print(f"[BATCH] {os.path.basename(path)}: {e}")
+            item(path, f"Failed: {str(e)[:60]}", 'error')
+            finish_one(path, None)
+        finally:
+            cleanup_material(job)
+
+    def generate_pack(jobs):
+        product = _job_product(jobs[0])
+        names = [os.path.basename(j['source']) for j in jobs]
+
+        def call():
+            for j in jobs:
+                item(j['source'], f"Generating packed ({len(jobs)} files, {product})...", 'running')
+            return generate_packed_material(jobs)
+
+        try:
+            written = scheduler.run(product, call)
+        except Exception as e:
+            print(f"[BATCH] pack {names}: {e}")
+            written = []
+        for j in jobs:
+            ok = j['output'] in written
+            item(j['source'], "Done (packed)" if ok else "Failed: missing from packed response", 'done' if ok else 'error')
+            finish_one(j['source'], j['output'] if ok else None)
+
+    def convert(path):
+        item(path, "Preparing...", 'running')
+        try:
+            job = prepare_material(path, course_dir, None, use_preferences=use_preferences, product=product, model=model)
+        except Exception as e:
+            print(f"[BATCH] {os.path.basename(path)}: {e}")
+            job = None
+        if not job:
+            item(path, "Failed: unsupported or conversion error", 'error')
+            finish_one(path, None)
+            return
+        if job.get('cached'):
+            item(path, "Up to date" if job['cached'] == 'fresh' else "Reused cached report", 'done')
+            finish_one(path, job['output'], cached=True)
+            return
+        job['prompt_cache'] = prompt_cache
+        if job['kind'] == 'text' and job['path'] == job['source'] and file_tokens(job['path']) < PACK_FILE_TOKENS:
+            # Tiny text file: hold back and pack with siblings from the same folder
+            from func import mgrReportCache
+            if mgrReportCache.check(mgrReportCache.packed_entry(job['report']), job['output']) == 'shared':
+                item(path, "Reused cached report", 'done')  # Packed in another course
+                finish_one(path, job['output'], cached=True)
+                return
+            key = (os.path.dirname(job['source']), job['product'], job['model'], job['custom_prompt'])
+            with lock:
+                packable.setdefault(key, []).append(job)
+            item(path, "Queued for packing", 'pending')
+            return
+        item(path, f"Queued ({_job_product(job)})", 'pending')
+        submit(ai_pools[_job_product(job)], generate, path, job)
+
+    for path in file_paths:
+        item(path, "Waiting", 'pending')
+
+    # One AI pool per provider: a full Gemini queue never blocks Claude jobs behind it
+    with ExitStack() as stack:
+        ai_pools = {p: stack.enter_context(ThreadPoolExecutor(max_workers=n, thread_name_prefix=f'learn-{p.lower()}'))
+                    for p, n in scheduler.concurrency.items()}
+        with ThreadPoolExecutor(max_workers=CONVERT_WORKERS, thread_name_prefix='learn-convert') as convert_pool:
+            for path in file_paths:
+                submit(convert_pool, convert, path)  # Workers keep the task's ledger attribution
+        # convert_pool drained → submit packs (a lone tiny file goes alone); ExitStack waits for the AI pools
+        for jobs in packable.values():
+            sized = [(j, file_tokens(j['path'])) for j in jobs]
+            for group in pack(sized, PACK_BUDGET, PACK_MAX_FILES):
+                if len(group) == 1:
+                    submit(ai_pools[_job_product(group[0])], generate, group[0]['source'], group[0])
+                else:
+                    submit(ai_pools[_job_product(group[0])], generate_pack, group)
+
+    result['prompt_cache'] = prompt_cache
+    if prompt_cache.calls:
+        print(f"[BATCH] {prompt_cache.summary()}")
+    task = current_task()
+    if task:
+        print(f"[BATCH] {format_rollup(get_ledger().task_rollup(task[0])) or 'no AI calls'}")
+    if progress:
+        progress.finish(f"Done: {len(result['success'])} generated, {len(result['cached'])} cached, {len(result['failed'])} failed")
+    return result
+
+
+if __name__ == '__main__':
+    fake = '--fake' in sys.argv  # Offline run against func/ai._FakeProvider (tune with FAKE_AI=...)
+    sys.argv = [a for a in sys.argv if a != '--fake']
+    if len(sys.argv) < 3:
+        print("Usage: python procLearnBatch.py <course_dir> <file> [file ...] [--fake]")
+        sys.exit(1)
+
+    import uuid
+    from func.mgrLedger import task_scope
+    with task_scope(uuid.uuid4().hex, "Batch Learn (CLI)"):
+        res = run_learn_batch(sys.argv[2:], sys.argv[1], use_preferences=False, product='Fake' if fake else None)
+    print(f"\n✓ {len(res['success'])} reports, ✗ {len(res['failed'])} failed")
@@ -0,0 +1,295 @@
+"""
+Batch API Learn - overnight learning reports via the providers' asynchronous batch endpoints
+
+Flow:
+    submit : prepare_material() → build_request() → one provider batch per (product, model)
+             handles + report targets are persisted in AAFS/jsons/learn_batches.json
+             (PDFs over the per-request page limit are refused: they need chunked Learn)
+    poll   : check every pending batch (also ones left over from a previous run)
+             and write finished reports into Learn/reports/ as each batch lands;
+             an item leaves the state only once its report is written, so a
+             crashed poller leaves the rest of the batch to the next one
+
+Offline testing: pass product='Fake' (see func/ai._FakeBatch).
+
+CLI:
+    python procLearnBatchApi.py submit <course_dir> <file> [file ...] [--fake]
+    python procLearnBatchApi.py poll
+"""
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+
+STATE_FILE = os.path.join(config.JSONS_DIR, 'learn_batches.json')
+POLL_INTERVAL = 60  # seconds (Fake batches: 1 s)
+MAX_POLL_FAILURES = 5   # consecutive poll errors before a batch is given up (expired handle, revoked key...)
+MAX_AGE_HOURS = 48      # providers expire unfinished batches after 24 h
+CLAIM_TIMEOUT = 600     # s a poller's 'collecting' claim holds (a crashed poller's claim lapses)
+
+_lock = threading.Lock()
+
+
+def load_state():
+    """Pending batches: {batch_id: {'handle', 'submitted_at', 'items': {request_id: target}, 'poll_failures', 'collecting'}}"""
+    if not os.path.exists(STATE_FILE):
+        return {}
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+
+def _save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp = STATE_FILE + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, STATE_FILE)
+
+
+def submit_learn_batch(file_paths, course_dir, progress=None, use_preferences=True, product=None):
+    """
+    Prepare files and submit them as provider batches
+
+    Args:
+        file_paths: Source files (Learn/ materials)
+        course_dir: Course directory
+        progress: Optional TaskProgress (per-file rows via progress.item)
+        use_preferences: Load prompt/product/model from Learn preferences
+        product: Override product (e.g. 'Fake' for offline runs)
+
+    Returns:
+        dict: {'submitted': [batch ids], 'cached': [report paths], 'failed': [filenames]}
+    """
+    from func.ai import submit_batch
+    from func.procLearnMaterial import prepare_material, build_request, cleanup_material
+    from func.procLearnChunked import needs_chunking
+
+    result = {'submitted': [], 'cached': [], 'failed': []}
+    groups = {}  # (product, model) → [(request, target)]
+
+    def item(path, status, state):
+        if progress:
+            progress.item(os.path.basename(path), status, state)
+
+    for n, path in enumerate(file_paths):
+        item(path, "Preparing...", 'running')
+        job = None
+        try:
+            job = prepare_material(path, course_dir, None, use_preferences=use_preferences, product=product)
+            if not job:
+                raise ValueError("unsupported or conversion error")
+            if job.get('cached'):
+                item(path, "Up to date" if job['cached'] == 'fresh' else "Reused cached report", 'done')
+                result['cached'].append(job['output'])
+                continue
+            if job['path'].lower().endswith('.pdf') and needs_chunking(job['path'], job['product']):
+                raise ValueError("too many pages for one request, use regular Learn (chunked)")
+            # Reused uploads must outlive the batch, not just the next hour
+            prompt, uploaded_info = build_request(job, upload_margin=MAX_AGE_HOURS * 3600)
+        except Exception as e:
+            print(f"[BATCH-API] {os.path.basename(path)}: {e}")
+            item(path, f"Failed: {str(e)[:60]}", 'error')
+            result['failed'].append(os.path.basename(path))
+            continue
+        finally:
+            cleanup_material(job)  # Prompt/uploads are built, the converted file is no longer needed
+
+        request = {'id': f"r{n}", 'prompt': prompt, 'uploaded_info': uploaded_info}
+        target = {'source': os.path.basename(path), 'output': job['output'], 'report': job['report']}
+        groups.setdefault((job['product'], job['model']), []).append((request, target))
+        item(path, f"Queued for {job['product']} batch", 'pending')
+
+    for (prod, model), entries in groups.items():
+        try:
+            handle = submit_batch(prod, model, [r for r, _ in entries])
+        except Exception as e:
+            print(f"[BATCH-API] {prod} submit failed: {e}")
+            for _, target in entries:
+                item(target['source'], f"Submit failed: {str(e)[:50]}", 'error')
+                result['failed'].append(target['source'])
+            continue
+
+        with _lock:
+            state = load_state()
+            state[handle['id']] = {'handle': handle, 'submitted_at': datetime.now().isoformat(timespec='seconds'),
+                                   'items': {r['id']: t for r, t in entries}}
+            _save_state(state)
+        result['submitted'].append(handle['id'])
+        print(f"[BATCH-API] Submitted {len(entries)} requests → {prod} batch {handle['id']}")
+        for _, target in entries:
+            item(target['source'], f"Submitted ({prod} batch)", 'pending')
+
+    return result
+
+
+def _write_report(target, text):
+    """Write one batch result into Learn/reports/ and register it in the report cache"""
+    from func import mgrReportCache
+
+    mgrReportCache.detach(target['output'])
+    mgrReportCache.forget(target['output'])
+    tmp = target['output'] + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, target['output'])
+    mgrReportCache.record(target['report'], target['output'])
+
+
+def _claim(batch_id):
+    """Mark batch_id as being collected → its current record, or None if gone / another poller holds it"""
+    with _lock:
+        state = load_state()
+        rec = state.get(batch_id)
+        if rec is None or time.time() - rec.get('collecting', 0) < CLAIM_TIMEOUT:
+            return None
+        rec['collecting'] = time.time()
+        _save_state(state)
+        return rec
+
+
+def _collected(batch_id, request_ids):
+    """Drop handled items (report written or failed); the batch goes with its last item"""
+    with _lock:
+        state = load_state()
+        rec = state.get(batch_id)
+        if rec is None:
+            return
+        for rid in request_ids:
+            rec['items'].pop(rid, None)
+        if rec['items']:
+            rec['collecting'] = time.time()  # Still working: keep the claim alive
+        else:
+            del state[batch_id]
+        _save_state(state)
+
+
+def _poll_failed(batch_id, rec, error):
+    """Count a poll error; True if the batch has to be given up"""
+    age = datetime.now() - datetime.fromisoformat(rec['submitted_at'])
+    with _lock:
+        state = load_state()
+        if batch_id not in state:
+            return False
+        failures = state[batch_id]['poll_failures'] = state[batch_id].get('poll_failures', 0) + 1
+        _save_state(state)
+    print(f"[BATCH-API] Poll {batch_id} failed ({failures}/{MAX_POLL_FAILURES}): {error}")
+    return failures >= MAX_POLL_FAILURES or age.total_seconds() > MAX_AGE_HOURS * 3600
+
+
+def _poll_ok(batch_id, rec):
+    if rec.get('poll_failures'):
+        with _lock:
+            state = load_state()
+            if batch_id in state:
+                state[batch_id]['poll_failures'] = 0
+                _save_state(state)
+
+
+def poll_learn_batches(progress=None, wait=True, poll_interval=None):
+    """
+    Poll pending batches and write reports as each batch finishes
+
+    Args:
+        progress: Optional TaskProgress
+        wait: Keep polling until no batch is pending (else: single pass)
+        poll_interval: Seconds between passes (default POLL_INTERVAL)
+
+    Returns:
+        dict: {'success': [report paths], 'failed': [filenames], 'pending': [batch ids]}
+    """
+    from func.ai import poll_batch
+
+    result = {'success': [], 'failed': [], 'pending': []}
+
+    while True:
+        with _lock:
+            pending = load_state()
+
+        for batch_id, rec in pending.items():
+            try:
+                state, results = poll_batch(rec['handle'])
+            except Exception as e:
+                if not _poll_failed(batch_id, rec, e):
+                    continue
+                rec = _claim(batch_id)
+                if rec is None:
+                    continue
+                print(f"[BATCH-API] Giving up batch {batch_id} (submitted {rec['submitted_at']})")
+                _collected(batch_id, list(rec['items']))
+                for target in rec['items'].values():
+                    result['failed'].append(target['source'])
+                    if progress:
+                        progress.item(target['source'], f"Batch lost: {str(e)[:50]}", 'error')
+                continue
+            _poll_ok(batch_id, rec)
+            if state == 'running':
+                continue
+            rec = _claim(batch_id)
+            if rec is None:
+                continue  # Another poller (GUI / CLI) is writing these results
+
+            for rid, target in rec['items'].items():
+                res = results.get(rid, {'error': 'missing result'})
+                try:
+                    if 'error' in res:
+                        raise RuntimeError(res['error'])
+                    _write_report(target, res['text'])
+                    result['success'].append(target['output'])
+                    if progress:
+                        progress.item(target['source'], "Done", 'done')
+                except Exception as e:
+                    print(f"[BATCH-API] {target['source']}: {e}")
+                    result['failed'].append(target['source'])
+                    if progress:
+                        progress.item(target['source'], f"Failed: {str(e)[:60]}", 'error')
+                _collected(batch_id, [rid])
+            print(f"[BATCH-API] Batch {batch_id} {state}: {len(rec['items'])} requests")
+
+        with _lock:
+            remaining = load_state()
+        result['pending'] = list(remaining)
+        if not remaining or not wait:
+            return result
+
+        interval = poll_interval or (1 if all(r['handle']['product'] == 'Fake' for r in remaining.values()) else POLL_INTERVAL)
+        if progress:
+            progress.update(status=f"{len(remaining)} batch(es) pending, {len(result['success'])} reports written")
+        time.sleep(interval)
+
+
+def run_learn_batch_api(file_paths, course_dir, progress=None, use_preferences=True, product=None):
+    """Submit file_paths as provider batches, then poll (this and any earlier pending batches) to completion"""
+    submitted = submit_learn_batch(file_paths, course_dir, progress, use_preferences, product)
+    if progress:
+        progress.update(progress=10, status=f"Submitted {len(submitted['submitted'])} batch(es), waiting for results...")
+    polled = poll_learn_batches(progress)
+
+    result = {'success': polled['success'], 'cached': submitted['cached'],
+              'failed': submitted['failed'] + polled['failed']}
+    if progress:
+        progress.finish(f"Done: {len(result['success'])} generated, {len(result['cached'])} cached, {len(result['failed'])} failed")
+    return result
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--fake']
+    fake = '--fake' in sys.argv
+
+    if args[:1] == ['poll']:
+        res = poll_learn_batches()
+        print(f"\n✓ {len(res['success'])} reports, ✗ {len(res['failed'])} failed")
+    elif args[:1] == ['submit'] and len(args) >= 3:
+        res = run_learn_batch_api(args[2:], args[1], use_preferences=not fake, product='Fake' if fake else None)
+        print(f"\n✓ {len(res['success'])} reports, {len(res['cached'])} cached, ✗ {len(res['failed'])} failed")
+    else:
+        print("Usage: python procLearnBatchApi.py submit <course_dir> <file> [file ...] [--fake]")
+        print("       python procLearnBatchApi.py poll")
+        sys.exit(1)
@@ -0,0 +1,296 @@
+"""
+Chunked Learn - right-sized requests for learning reports
+
+Map-reduce for inputs too large for one request:
+    plan   : PDFs - decon chapter map (func/mgrDeconCache) if this PDF was
+             deconned, else page windows; long chapters are windowed too
+             Text  - logical blocks (functions/classes, headings) packed up to
+             the model's token budget (func/utilTokens)
+    map    : each chunk → dense notes (parallel), checkpointed to
+             AAFS/cache/chunks/<report key>/chunk_NN.md
+    reduce : all notes → the standard report layout, streamed into the .md
+
+A failed chunk fails the report, but finished chunks stay checkpointed, so the
+next run only retries what is missing.
+
+Packing: many tiny text files go out as one request that returns one report
+per file (generate_packed_text_reports).
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+
+# Pages per request before chunking kicks in (Claude rejects PDFs over 100 pages)
+MAX_PAGES = {'Gemini': 200, 'Claude': 90}
+CHUNK_PAGES = 50
+CHUNK_WORKERS = 3
+CHUNK_RETRIES = 1
+
+MAP_PROMPT = """You are preparing study notes for ONE PART of a larger document.
+
+Document: {filename}
+Part {index}/{total}: {label}
+
+Extract everything needed to later write a learning guide for the whole document:
+- Every knowledge point (知识点): core concept, technical terms with Chinese translations (专业术语)
+- All formulas with symbol definitions
+- Examples (例题) with full solutions (答案), key notes and common mistakes
+
+Be dense and complete, use markdown. Cover ONLY this part - no overview of the whole document.
+
+The final guide will follow this specification (for reference only):
+---
+{template}
+---{content}"""
+
+REDUCE_PROMPT = """{template}
+
+---
+The document was too large for a single request and was read in {total} parts.
+Below are detailed notes for each part, in order. Write the complete learning guide
+for the WHOLE document from these notes, following the format above exactly.
+
+{notes}"""
+
+
+def page_count(pdf_path):
+    from PyPDF2 import PdfReader
+    return len(PdfReader(pdf_path).pages)
+
+
+def needs_chunking(pdf_path, product):
+    """True if pdf_path is over the per-request page limit of product"""
+    try:
+        return page_count(pdf_path) > MAX_PAGES.get(product, MAX_PAGES['Claude'])
+    except Exception:
+        return False
+
+
+def plan_chunks(pdf_path, total_pages):
+    """
+    Chunk plan: [{'label', 'start', 'end'}] (1-based, inclusive)
+
+    Uses the decon chapter map when this exact PDF was deconned, else page windows.
+    """
+    from func import mgrDeconCache
+
+    sections = []
+    entry = mgrDeconCache.lookup(pdf_path)
+    if entry and entry['chapters']:
+        for ch in entry['chapters']:
+            start, end = ch.get('start_page', 1), min(ch.get('end_page') or total_pages, total_pages)
+            if 1 <= start <= end:
+                sections.append((f"Chapter {ch.get('chapter', '?')}: {ch.get('name') or 'Untitled'}", start, end))
+        if sections and sections[0][1] > 1:
+            sections.insert(0, ("Front matter", 1, sections[0][1] - 1))
+    if not sections:
+        sections = [("Pages", 1, total_pages)]
+
+    chunks = []
+    for label, start, end in sections:
+        for s in range(start, end + 1, CHUNK_PAGES):
+            e = min(s + CHUNK_PAGES - 1, end)
+            multi = end - start + 1 > CHUNK_PAGES
+            chunks.append({'label': f"{label} (pp. {s}-{e})" if multi or label == "Pages" else label, 'start': s, 'end': e})
+    return chunks
+
+
+def _extract_pages(pdf_path, start, end, out_path):
+    from PyPDF2 import PdfReader, PdfWriter
+    reader, writer = PdfReader(pdf_path), PdfWriter()
+    for i in range(start - 1, end):
+        writer.add_page(reader.pages[i])
+    with open(out_path, 'wb') as f:
+        writer.write(f)
+
+
+def _map_reduce(file_path, output_md_path, template, product, model_name, chunks, prepare_chunk, log, on_status):
+    """
+    Shared map → checkpoint → reduce loop
+
+    Args:
+        chunks: [{'label', ...}] plan (written to plan.json)
+        prepare_chunk: fn(i, tmp_dir) → (content appended to the map prompt, uploaded_info)
+    """
+    from func import mgrReportCache
+    from func.ai import call_ai
+    from func.procLearnMaterial import ReportStream
+    from func.mgrLedger import submit
+
+    filename = os.path.basename(file_path)
+
+    # Checkpoints live under the report key: new source/prompt/model → fresh directory
+    key = mgrReportCache.make_entry(file_path, template, product, model_name)['key']
+    ckpt_dir = os.path.join(config.CHUNKS_CACHE_DIR, key)
+    os.makedirs(ckpt_dir, exist_ok=True)
+    with open(os.path.join(ckpt_dir, 'plan.json'), 'w', encoding='utf-8') as f:
+        json.dump({'source': filename, 'chunks': [c['label'] for c in chunks]}, f, indent=2, ensure_ascii=False)
+
+    def ckpt(i):
+        return os.path.join(ckpt_dir, f"chunk_{i:02d}.md")
+
+    todo = [i for i in range(len(chunks)) if not os.path.exists(ckpt(i))]
+    log(f"🧩 Chunked mode: {len(chunks)} parts ({len(chunks) - len(todo)} checkpointed)")
+
+    def map_chunk(i):
+        tmp_dir = tempfile.mkdtemp(prefix='learn_chunk_')
+        try:
+            content, uploaded_info = prepare_chunk(i, tmp_dir)
+            prompt = MAP_PROMPT.format(filename=filename, index=i + 1, total=len(chunks), label=chunks[i]['label'],
+                                       template=template, content=content)
+            for attempt in range(CHUNK_RETRIES + 1):
+                try:
+                    notes = call_ai(prompt, product, model_name, uploaded_info=uploaded_info)
+                    break
+                except Exception:
+                    if attempt == CHUNK_RETRIES:
+                        raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        tmp = ckpt(i) + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(notes)
+        os.replace(tmp, ckpt(i))
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix='learn-chunk') as pool:
+        futures = {submit(pool, map_chunk, i): i for i in todo}
+        for n, fut in enumerate(as_completed(futures), 1):
+            i = futures[fut]
+            try:
+                fut.result()
+                log(f"  ✓ Part {i + 1}/{len(chunks)}: {chunks[i]['label']}")
+            except Exception as e:
+                failed.append(i)
+                log(f"  ✗ Part {i + 1}/{len(chunks)}: {e}")
+            if on_status:
+                on_status(f"Map {n}/{len(todo)} parts ({len(failed)} failed)")
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(chunks)} parts failed; finished parts are checkpointed - rerun to retry the rest")
+
+    notes = []
+    for i, c in enumerate(chunks):
+        with open(ckpt(i), 'r', encoding='utf-8') as f:
+            notes.append(f"## Part {i + 1}: {c['label']}\n\n{f.read()}")
+
+    log(f"🧩 Reduce: merging {len(chunks)} parts...")
+    with ReportStream(output_md_path, on_status) as stream:
+        call_ai(REDUCE_PROMPT.format(template=template, total=len(chunks), notes='\n\n'.join(notes)),
+                product, model_name, on_chunk=stream)
+
+    shutil.rmtree(ckpt_dir, ignore_errors=True)
+    log(f"✓ Report saved: {output_md_path} ({stream.summary()})")
+
+
+def generate_chunked_pdf_report(file_path, output_md_path, template, product, model_name, log=print, on_status=None):
+    """
+    Map-reduce report for a large PDF (product/model already resolved). Raises on failure.
+
+    Args:
+        template: Report prompt filled for this file (build_pdf_or_csv_prompt)
+    """
+    from func.ai import upload_files
+
+    total_pages = page_count(file_path)
+    chunks = plan_chunks(file_path, total_pages)
+    log(f"📄 {total_pages} pages over the {product} limit ({MAX_PAGES.get(product, MAX_PAGES['Claude'])})")
+
+    def prepare_chunk(i, tmp_dir):
+        c = chunks[i]
+        part_pdf = os.path.join(tmp_dir, f"{os.path.splitext(os.path.basename(file_path))[0]}_part{i + 1:02d}.pdf")
+        _extract_pages(file_path, c['start'], c['end'], part_pdf)
+        return f"\n\nThis part is PDF pages {c['start']}-{c['end']} (attached).", upload_files([part_pdf], product)
+
+    _map_reduce(file_path, output_md_path, template, product, model_name, chunks, prepare_chunk, log, on_status)
+
+
+def generate_chunked_text_report(file_path, output_md_path, template, content, product, model_name, log=print, on_status=None):
+    """
+    Map-reduce report for a text file over the model's token budget. Raises on failure.
+
+    Args:
+        template: Report prompt filled for this file, with the content left out
+        content: Full file content (split on functions/classes or headings)
+    """
+    from func.utilTokens import estimate_tokens, input_budget, split_text
+
+    budget = input_budget(model_name) - estimate_tokens(template) - estimate_tokens(MAP_PROMPT)
+    parts = split_text(content, os.path.splitext(file_path)[1], budget)
+    log(f"📝 ~{estimate_tokens(content):,} tokens over the {model_name} budget → {len(parts)} parts")
+
+    chunks = []
+    line = 1
+    for part in parts:
+        n = part.count('\n')
+        chunks.append({'label': f"lines {line}-{line + max(n - 1, 0)}"})
+        line += n
+
+    def prepare_chunk(i, tmp_dir):
+        return f"\n\n```\n{parts[i]}\n```", None
+
+    _map_reduce(file_path, output_md_path, template, product, model_name, chunks, prepare_chunk, log, on_status)
+
+
+PACK_SEPARATOR = "===== REPORT: {filename} ====="
+PACK_MAX_OUTPUT = 64000  # Output limit of current Claude/Gemini models: per-report budget shrinks beyond 3 files
+
+PACK_PROMPT = """You will write {count} SEPARATE learning guides, one for each small file below.
+
+Follow this specification for EACH file (the file's own name and content replace the example file):
+---
+{template}
+---
+
+Start each guide with exactly this line, then the guide:
+{separator}
+
+{files}"""
+
+
+def generate_packed_text_reports(file_paths, output_md_paths, template, product, model_name, log=print):
+    """
+    One request → one report per tiny text file. Raises on failure.
+
+    Args:
+        template: Text report template filled for the first file (content left out)
+
+    Returns:
+        list: output paths written (files missing from the response are not written)
+    """
+    from func.ai import call_ai
+    from func.utilTokens import OUTPUT_RESERVE
+
+    files = []
+    for path in file_paths:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            files.append(f"### File: {os.path.basename(path)}\n```\n{f.read()}\n```")
+
+    prompt = PACK_PROMPT.format(count=len(file_paths), template=template, files='\n\n'.join(files),
+                                separator=PACK_SEPARATOR.format(filename='<filename>'))
+    log(f"📦 Packed {len(file_paths)} small files into one request")
+    response = call_ai(prompt, product, model_name,
+                       max_tokens=min(OUTPUT_RESERVE * len(file_paths), PACK_MAX_OUTPUT))  # Every report gets its own budget
+
+    written = []
+    for path, out in zip(file_paths, output_md_paths):
+        marker = PACK_SEPARATOR.format(filename=os.path.basename(path))
+        start = response.find(marker)
+        if start < 0:
+            log(f"  ✗ {os.path.basename(path)}: missing from packed response")
+            continue
+        body = response[start + len(marker):]
+        nxt = body.find("===== REPORT: ")
+        tmp = out + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write((body[:nxt] if nxt >= 0 else body).strip() + '\n')
+        os.replace(tmp, out)  # New inode: never write through a link
+        written.append(out)
+    return written
@@ -5,8 +5,8 @@ Generates markdown reports for various file types
 """
 import os
 import sys
+import time
 import tempfile
-import subprocess
 from pathlib import Path
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -141,14 +141,12 @@ Provide a HIGH-DENSITY recap:
 
 Format with proper markdown: code blocks, tables, bullet points, emphasis."""
 
-DEFAULT_CSV_PROMPT = """You are an expert educational assistant (教育助手). Analyze this CSV data file and create a HIGH-DENSITY learning guide (高信息密度学习指南).
+DEFAULT_CSV_PROMPT = """You are an expert educational assistant (教育助手). Analyze this data file (CSV/Excel) and create a HIGH-DENSITY learning guide (高信息密度学习指南).
 
 File: {filename}
 
-Preview of data:
-```csv
+Data profile (computed over every row; one table per sheet):
 {csv_preview}
-```
 
 **CRITICAL REQUIREMENTS:**
 - Write in English with Chinese translations for technical terms (专业术语)
@@ -211,6 +209,28 @@ Provide a HIGH-DENSITY recap:
 Format with proper markdown: code blocks, tables, bullet points, emphasis."""
 
 
+TEXT_EXTENSIONS = ['.py', '.js', '.java', '.cpp', '.c', '.go', '.rs',
+                   '.txt', '.md', '.json', '.xml', '.html', '.css', '.sh']
+OFFICE_EXTENSIONS = ['.docx', '.pptx', '.xlsx']
+DATA_EXTENSIONS = ['.csv', '.xlsx']  # Sent as a data profile, not raw rows
+
+TEXT_FILE_TYPES = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.java': 'Java',
+    '.cpp': 'C++',
+    '.c': 'C',
+    '.go': 'Go',
+    '.rs': 'Rust',
+    '.txt': 'Text',
+    '.md': 'Markdown',
+    '.json': 'JSON',
+    '.xml': 'XML',
+    '.html': 'HTML',
+    '.css': 'CSS',
+}
+
+
 def get_learn_dir(course_dir):
     """Get or create Learn directory for course"""
     learn_dir = os.path.join(course_dir, 'Learn')
@@ -222,6 +242,16 @@ def get_learn_dir(course_dir):
     return learn_dir, reports_dir
 
 
+def get_prompt_type(file_path):
+    """Prompt template type for a file: 'text', 'csv' or 'pdf'"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in TEXT_EXTENSIONS:
+        return 'text'
+    elif ext in DATA_EXTENSIONS:
+        return 'csv'
+    return 'pdf'  # PDF and Office files converted to PDF
+
+
 def get_default_prompt(file_path):
     """
     Get appropriate default prompt template for file type
@@ -232,31 +262,175 @@ def get_default_prompt(file_path):
     Returns:
         Default prompt template string
     """
-    ext = os.path.splitext(file_path)[1].lower()
+    return {'text': DEFAULT_TEXT_PROMPT, 'csv': DEFAULT_CSV_PROMPT}.get(get_prompt_type(file_path), DEFAULT_PDF_PROMPT)
 
-    # Text files
-    text_extensions = ['.py', '.js', '.java', '.cpp', '.c', '.go', '.rs',
-                      '.txt', '.md', '.json', '.xml', '.html', '.css', '.sh']
 
-    if ext in text_extensions:
-        return DEFAULT_TEXT_PROMPT
-    elif ext == '.csv':
-        return DEFAULT_CSV_PROMPT
-    else:  # PDF and Office files converted to PDF
-        return DEFAULT_PDF_PROMPT
+def resolve_product_model(product, model, default_product, log=print, source=None):
+    """Resolve 'Auto' preferences to a concrete (product, model)
 
+    'Auto (fast)' picks by input size, recorded latency and price (func/mgrModelSelect);
+    with product 'Auto' it may choose any provider that has an API key.
+    """
+    from func.ai import get_best_model
+    from func.mgrModelSelect import AUTO_FAST, select_model, configured_products, material_tokens
+
+    if model == AUTO_FAST:
+        products = configured_products(default_product) if product in (None, 'Auto') else [product]
+        tokens = material_tokens(source) if source else 20000
+        choice = select_model(products, tokens, log=log)
+        if choice:
+            return choice
+        model = 'Auto'
+
+    if product is None or product == 'Auto':
+        product = default_product
+
+    if model is None or model == 'Auto':
+        # Auto-select best model for product
+        try:
+            model_name = get_best_model(product)
+            log(f"✓ Model: {model_name} ({product})")
+        except Exception:
+            model_name = 'Auto'
+            log(f"! Fallback model: Auto ({product})")
+    else:
+        model_name = model
+        log(f"✓ Model: {model_name} ({product})")
+    return product, model_name
 
-def process_text_file(file_path, output_md_path, console=None, custom_prompt=None, product=None, model=None):
+
+def split_prompt(template, values):
     """
-    Process text files (py, js, txt, etc.) with AI
+    Split a filled template into (stable prefix, per-file suffix) for prompt caching
 
-    Args:
-        file_path: Path to input file
-        output_md_path: Path to output markdown report
-        console: Optional console widget for output
-        custom_prompt: Optional custom prompt template (overrides default)
-        product: Optional product override (from preferences)
-        model: Optional model override (from preferences)
+    The prefix is the template with each {field} shown as <field>, identical for
+    every file of a batch; the suffix lists the per-file values.
+    """
+    import string
+    prefix, order = [], []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        prefix.append(literal)
+        if field is not None:
+            prefix.append(f"<{field}>")
+            if field not in order:
+                order.append(field)
+    prefix.append("\n\nThe <placeholders> above are filled in by FILE DETAILS below.")
+
+    suffix = ["FILE DETAILS"]
+    for field in order:
+        value = str(values.get(field, ''))
+        suffix.append(f"<{field}>:\n{value}" if '\n' in value else f"<{field}>: {value}")
+    return ''.join(prefix), '\n\n'.join(suffix)
+
+
+def _render(template, values, split):
+    return split_prompt(template, values) if split else template.format(**values)
+
+
+CONTENT_IN_PARTS = "[File content is provided separately, see below]"
+
+
+def build_text_prompt(file_path, custom_prompt=None, split=False, content=None):
+    """Fill the text template with the file's content (split=True → (prefix, suffix); content overrides the file)"""
+    if content is None:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+    file_type = TEXT_FILE_TYPES.get(os.path.splitext(file_path)[1].lower(), 'Code')
+    return _render(custom_prompt or DEFAULT_TEXT_PROMPT, {
+        'file_type': file_type,
+        'filename': os.path.basename(file_path),
+        'file_type_lower': file_type.lower(),
+        'content': content,
+    }, split)
+
+
+def data_profile_text(file_path):
+    """Compact profile of a CSV/XLSX (all rows, all sheets) - falls back to the first 5,000 chars of a CSV"""
+    try:
+        from func.utilDataProfile import profile_file, format_profiles
+        return format_profiles(profile_file(file_path))
+    except Exception as e:
+        print(f"! Data profile failed ({e}), using raw preview")
+        if not file_path.lower().endswith('.csv'):
+            return f"(profile unavailable: {e})"
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f"```csv\n{f.read(5000)}\n```"
+
+
+def build_pdf_or_csv_prompt(file_path, custom_prompt=None, split=False):
+    """Fill the PDF/CSV template (CSV/XLSX get a data profile; split=True → (prefix, suffix))"""
+    ext = os.path.splitext(file_path)[1].lower()
+    template = custom_prompt or (DEFAULT_CSV_PROMPT if ext in DATA_EXTENSIONS else DEFAULT_PDF_PROMPT)
+
+    values = {'filename': os.path.basename(file_path)}
+    if ext in DATA_EXTENSIONS and '{csv_preview}' in template:
+        values['csv_preview'] = data_profile_text(file_path)
+    return _render(template, values, split)
+
+
+class ReportStream:
+    """
+    Streamed report writer: the .md grows as chunks arrive
+
+    - on_status(text) gets a throttled one-line summary (Mission Control); it runs
+      on the worker thread, Mission Control hands it to the GUI via a Qt signal
+    - Time-to-first-byte is measured from construction
+    - If the stream fails, the partial report is kept with a marker at the end
+    - The old report is unlinked first: the stream gets its own inode, never one
+      shared with a link (the .md has to grow in place, so no temp + os.replace)
+    """
+    STATUS_INTERVAL = 0.5
+
+    def __init__(self, output_md_path, on_status=None):
+        self.path = output_md_path
+        self.on_status = on_status
+        self.start = time.monotonic()
+        self.ttfb = None
+        self.chars = 0
+        self._tail = ''
+        self._last_status = 0
+        if os.path.lexists(output_md_path):
+            os.unlink(output_md_path)
+        self._file = open(output_md_path, 'w', encoding='utf-8')
+
+    def __call__(self, chunk):
+        now = time.monotonic()
+        if self.ttfb is None:
+            self.ttfb = now - self.start
+            print(f"⏱ First byte after {self.ttfb:.1f}s: {os.path.basename(self.path)}")
+        self._file.write(chunk)
+        self._file.flush()
+        self.chars += len(chunk)
+
+        self._tail = (self._tail + chunk)[-200:]  # Tail for the status line
+
+        if self.on_status and now - self._last_status >= self.STATUS_INTERVAL:
+            self._last_status = now
+            tail = self._tail.rstrip('\n').rsplit('\n', 1)[-1].strip()
+            self.on_status(f"Streaming {self.summary()} | {tail[:40]}")
+
+    def summary(self):
+        ttfb = f"TTFB {self.ttfb:.1f}s" if self.ttfb is not None else "no data"
+        return f"{self.chars:,} chars, {ttfb}, {time.monotonic() - self.start:.0f}s"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and self.chars:
+            self._file.write(f"\n\n<!-- Stream interrupted after {self.chars:,} chars: {exc} -->\n")
+            print(f"! Partial report kept: {self.path}")
+        self._file.close()
+        return False
+
+
+def generate_text_report(file_path, output_md_path, console=None, custom_prompt=None, product=None, model=None, on_status=None,
+                         prompt_cache=None, response_cache=False):
+    """Text file → report (streamed). Raises on failure (see process_text_file for the safe wrapper).
+
+    prompt_cache: Optional func.ai.PromptCacheStats - send the template as a cached prefix (batches)
+    response_cache: Reuse the stored response of an identical earlier request (func/mgrResponseCache)
     """
     def log(msg):
         if console:
@@ -264,90 +438,68 @@ def process_text_file(file_path, output_md_path, console=None, custom_prompt=Non
         else:
             print(msg)
 
-    try:
-        from utilModels import get_best_gemini_model, get_best_claude_model
-        from utilPromptFiles import call_ai
+    def notify(msg):  # Cache hits / rate-limit waits: console + Mission Control row
+        log(msg)
+        if on_status:
+            on_status(msg)
 
-        log(f"📄 Processing text file: {os.path.basename(file_path)}")
+    from func.ai import call_ai
 
-        # Determine product/model from preferences or auto-select
-        if product is None or product == 'Auto':
-            product = 'Claude'  # Default for text files
+    log(f"📄 Processing text file: {os.path.basename(file_path)}")
+    product, model_name = resolve_product_model(product, model, 'Claude', log)  # Claude default for text
 
-        if model is None or model == 'Auto':
-            # Auto-select best model for product
-            try:
-                if product == 'Claude':
-                    model_name = get_best_claude_model()
-                else:  # Gemini
-                    model_name = get_best_gemini_model()
-                log(f"✓ Model: {model_name} ({product})")
-            except Exception as e:
-                model_name = 'Auto'
-                log(f"! Fallback model: Auto ({product})")
-        else:
-            model_name = model
-            log(f"✓ Model: {model_name} ({product})")
+    # Over the model's token budget → split on functions/classes/headings and map-reduce
+    from func.utilTokens import estimate_tokens, input_budget
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+    template = build_text_prompt(file_path, custom_prompt, content=CONTENT_IN_PARTS)
+    if estimate_tokens(content) + estimate_tokens(template) > input_budget(model_name):
+        from func.procLearnChunked import generate_chunked_text_report
+        return generate_chunked_text_report(file_path, output_md_path, template, content, product, model_name, log, on_status)
 
-        # Read file content
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+    prefix, prompt = (build_text_prompt(file_path, custom_prompt, split=True, content=content) if prompt_cache
+                      else (None, build_text_prompt(file_path, custom_prompt, content=content)))
 
-        # Detect file type
-        ext = os.path.splitext(file_path)[1].lower()
-        file_type_map = {
-            '.py': 'Python',
-            '.js': 'JavaScript',
-            '.java': 'Java',
-            '.cpp': 'C++',
-            '.c': 'C',
-            '.go': 'Go',
-            '.rs': 'Rust',
-            '.txt': 'Text',
-            '.md': 'Markdown',
-            '.json': 'JSON',
-            '.xml': 'XML',
-            '.html': 'HTML',
-            '.css': 'CSS',
-        }
-        file_type = file_type_map.get(ext, 'Code')
-
-        # Generate prompt
-        if custom_prompt:
-            prompt = custom_prompt.format(
-                file_type=file_type,
-                filename=os.path.basename(file_path),
-                file_type_lower=file_type.lower(),
-                content=content
-            )
-        else:
-            prompt = DEFAULT_TEXT_PROMPT.format(
-                file_type=file_type,
-                filename=os.path.basename(file_path),
-                file_type_lower=file_type.lower(),
-                content=content
-            )
+    log(f"🤖 Generating analysis with {product}...")
+    with ReportStream(output_md_path, on_status) as stream:
+        call_ai(prompt, product, model_name, on_chunk=stream, prefix=prefix, usage=prompt_cache,
+                cache=response_cache, status_callback=notify)
 
-        log(f"🤖 Generating analysis with {product}...")
-        result = call_ai(prompt, product, model_name)
+    log(f"✓ Report saved: {output_md_path} ({stream.summary()})")
 
-        # Save report
-        with open(output_md_path, 'w', encoding='utf-8') as f:
-            f.write(result)
 
-        log(f"✓ Report saved: {output_md_path}")
-        return True
+def process_text_file(file_path, output_md_path, console=None, custom_prompt=None, product=None, model=None):
+    """
+    Process text files (py, js, txt, etc.) with AI
 
+    Args:
+        file_path: Path to input file
+        output_md_path: Path to output markdown report
+        console: Optional console widget for output
+        custom_prompt: Optional custom prompt template (overrides default)
+        product: Optional product override (from preferences)
+        model: Optional model override (from preferences)
+    """
+    try:
+        generate_text_report(file_path, output_md_path, console, custom_prompt, product, model)
+        return True
     except Exception as e:
-        log(f"✗ Error processing text file: {e}")
-        import traceback
-        log(traceback.format_exc())
+        _log_error(console, f"✗ Error processing text file: {e}")
         return False
 
 
+def _log_error(console, msg):
+    import traceback
+    for line in (msg, traceback.format_exc()):
+        if console:
+            console.append(line)
+        else:
+            print(line)
+
+
 def convert_office_to_pdf(file_path, console=None):
     """
-    Convert Office files (docx, pptx, xlsx) to PDF/CSV
+    Convert Office documents (docx, pptx) to PDF (xlsx is profiled directly, see DATA_EXTENSIONS)
 
     Args:
         file_path: Path to input file
@@ -365,44 +517,17 @@ def convert_office_to_pdf(file_path, console=None):
     ext = os.path.splitext(file_path)[1].lower()
 
     try:
-        if ext == '.xlsx':
-            # Convert Excel to CSV
-            import pandas as pd
-            log(f"📊 Converting Excel to CSV...")
-
-            # Read Excel (first sheet)
-            df = pd.read_excel(file_path, sheet_name=0)
+        if ext in ['.docx', '.pptx']:
+            # Convert to PDF via the shared LibreOffice service (content-hash cached)
+            from func.mgrOfficeConvert import get_office_converter
+            converter = get_office_converter()
+            cached = converter.cached(file_path)
+            log(f"📄 {'Reusing converted PDF for' if cached else 'Converting'} {ext}...")
 
-            # Save as CSV
-            output_path = file_path.rsplit('.', 1)[0] + '_converted.csv'
-            df.to_csv(output_path, index=False)
-
-            log(f"✓ Converted to CSV: {output_path}")
-            return output_path
-
-        elif ext in ['.docx', '.pptx']:
-            # Convert to PDF using LibreOffice
-            log(f"📄 Converting {ext} to PDF...")
-
-            output_dir = os.path.dirname(file_path)
-
-            # Try LibreOffice command
             try:
-                subprocess.run([
-                    'soffice',
-                    '--headless',
-                    '--convert-to', 'pdf',
-                    '--outdir', output_dir,
-                    file_path
-                ], check=True, capture_output=True, timeout=60)
-
-                output_path = file_path.rsplit('.', 1)[0] + '.pdf'
-                if os.path.exists(output_path):
-                    log(f"✓ Converted to PDF: {output_path}")
-                    return output_path
-                else:
-                    log("! Conversion succeeded but PDF not found")
-                    return None
+                output_path = cached or converter.convert(file_path)
+                log(f"✓ Converted to PDF: {output_path}")
+                return output_path
 
             except FileNotFoundError:
                 log("! LibreOffice not found - trying python-docx fallback")
@@ -430,6 +555,65 @@ def convert_office_to_pdf(file_path, console=None):
         return None
 
 
+def generate_pdf_or_csv_report(file_path, output_md_path, console=None, custom_prompt=None, product=None, model=None, on_status=None,
+                               prompt_cache=None, response_cache=False):
+    """PDF/CSV → report (streamed). Raises on failure (see process_pdf_or_csv for the safe wrapper).
+
+    prompt_cache: Optional func.ai.PromptCacheStats - send the template as a cached prefix (batches)
+    response_cache: Reuse the stored response of an identical earlier request (func/mgrResponseCache)
+    """
+    def log(msg):
+        if console:
+            console.append(msg)
+        else:
+            print(msg)
+
+    def notify(msg):  # Cache hits / rate-limit waits: console + Mission Control row
+        log(msg)
+        if on_status:
+            on_status(msg)
+
+    from func.ai import upload_files, call_ai, response_cache_key, cached_response
+
+    ext = os.path.splitext(file_path)[1].lower()
+    log(f"📄 Processing {ext.upper()} file: {os.path.basename(file_path)}")
+    product, model_name = resolve_product_model(product, model, 'Gemini', log)  # Gemini default (better vision)
+
+    # Over the per-request page limit → map-reduce over chapters / page windows
+    from func.procLearnChunked import needs_chunking, generate_chunked_pdf_report
+    if ext == '.pdf' and needs_chunking(file_path, product):
+        return generate_chunked_pdf_report(file_path, output_md_path, build_pdf_or_csv_prompt(file_path, custom_prompt),
+                                           product, model_name, log, on_status)
+
+    # Data files go out as a profile in the prompt - uploading raw rows is slow and uninformative
+    if ext in DATA_EXTENSIONS:
+        log(f"📊 Profiling data file (all rows/sheets)...")
+    prefix, prompt = build_pdf_or_csv_prompt(file_path, custom_prompt, split=True) if prompt_cache else (None, build_pdf_or_csv_prompt(file_path, custom_prompt))
+
+    # Response cache hit → no upload either (the key uses content hashes, not upload handles)
+    if response_cache:
+        from func.utilHash import sha256_file
+        content_keys = [] if ext in DATA_EXTENSIONS else [sha256_file(file_path)]
+        text = cached_response(response_cache_key(prompt, product, model_name, content_keys, prefix), notify)
+        if text is not None:
+            with ReportStream(output_md_path, on_status) as stream:
+                stream(text)
+            log(f"✓ Report saved: {output_md_path} ({stream.summary()})")
+            return
+
+    uploaded_info = None
+    if ext not in DATA_EXTENSIONS:
+        log(f"📤 Uploading file to {product}...")
+        uploaded_info = upload_files([file_path], product)
+
+    log(f"🤖 Generating analysis with {product}...")
+    with ReportStream(output_md_path, on_status) as stream:
+        call_ai(prompt, product, model_name, uploaded_info=uploaded_info, on_chunk=stream, prefix=prefix, usage=prompt_cache,
+                cache=response_cache, status_callback=notify)
+
+    log(f"✓ Report saved: {output_md_path} ({stream.summary()})")
+
+
 def process_pdf_or_csv(file_path, output_md_path, console=None, custom_prompt=None, product=None, model=None):
     """
     Process PDF or CSV files with AI
@@ -442,97 +626,220 @@ def process_pdf_or_csv(file_path, output_md_path, console=None, custom_prompt=No
         product: Optional product override (from preferences)
         model: Optional model override (from preferences)
     """
+    try:
+        generate_pdf_or_csv_report(file_path, output_md_path, console, custom_prompt, product, model)
+        return True
+    except Exception as e:
+        _log_error(console, f"✗ Error processing file: {e}")
+        return False
+
+
+def prepare_material(file_path, course_dir, console=None, custom_prompt=None, use_preferences=True, force=False,
+                     product=None, model=None):
+    """
+    Stage 1 of learn_material: resolve preferences, check the report cache, convert Office files
+
+    Local work only (no AI calls), so batch runs can overlap it with generation.
+
+    Args:
+        force: Regenerate even if the report manifest says the report is up to date
+        product, model: Override the preferences (e.g. 'Fake' for offline batch runs)
+
+    Returns:
+        Job dict for generate_material(), or None if the file cannot be processed.
+        job['cached'] is set ('fresh' / 'shared') when no AI call is needed.
+    """
+    from func import mgrReportCache
+
     def log(msg):
         if console:
             console.append(msg)
         else:
             print(msg)
 
-    try:
-        from utilModels import get_best_gemini_model, get_best_claude_model
-        from utilPromptFiles import upload_files, call_ai
+    # Setup directories
+    learn_dir, reports_dir = get_learn_dir(course_dir)
 
-        ext = os.path.splitext(file_path)[1].lower()
-        log(f"📄 Processing {ext.upper()} file: {os.path.basename(file_path)}")
+    # Generate output filename
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    output_md_path = os.path.join(reports_dir, f"{base_name}.md")
 
-        # Determine product/model from preferences or auto-select
-        if product is None or product == 'Auto':
-            product = 'Gemini'  # Default for PDF/CSV (better vision)
+    log(f"=" * 80)
+    log(f"📚 Learn Material: {os.path.basename(file_path)}")
+    log(f"=" * 80)
 
-        if model is None or model == 'Auto':
-            # Auto-select best model for product
-            try:
-                if product == 'Gemini':
-                    model_name = get_best_gemini_model()
-                else:  # Claude
-                    model_name = get_best_claude_model()
-                log(f"✓ Model: {model_name} ({product})")
-            except Exception as e:
-                model_name = 'Auto'
-                log(f"! Fallback model: Auto ({product})")
-        else:
-            model_name = model
-            log(f"✓ Model: {model_name} ({product})")
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in TEXT_EXTENSIONS + OFFICE_EXTENSIONS + ['.pdf', '.csv']:
+        log(f"✗ Unsupported file type: {ext}")
+        log(f"  Supported: {', '.join(TEXT_EXTENSIONS + OFFICE_EXTENSIONS + ['.pdf', '.csv'])}")
+        return None
 
-        # Upload file for both Gemini and Claude
-        # Note: CSV requires special handling for Claude (no file upload, use text content)
-        if ext == '.csv' and product == 'Claude':
-            log(f"! Note: CSV with Claude - will use text content instead of file upload")
-            uploaded_info = None
-        else:
-            log(f"📤 Uploading file to {product}...")
-            uploaded_info = upload_files([file_path], product)
-
-        # Generate prompt
-        if custom_prompt:
-            # For custom prompts, check if it needs csv_preview
-            if ext == '.csv' and '{csv_preview}' in custom_prompt:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    csv_preview = f.read(5000)
-                prompt = custom_prompt.format(
-                    filename=os.path.basename(file_path),
-                    csv_preview=csv_preview
-                )
-            else:
-                prompt = custom_prompt.format(filename=os.path.basename(file_path))
+    prompt_type = get_prompt_type(file_path)
+
+    # Load preferences (prompt + product/model)
+    product_pref = None
+    model_pref = None
+    response_cache = False
+    if use_preferences:
+        from gui.learn import get_prompt, get_product, get_model, get_use_response_cache
+
+        # Get product/model from preferences
+        product_pref = get_product()
+        model_pref = get_model()
+        response_cache = get_use_response_cache()
+        log(f"✓ Using preferences: Product={product_pref}, Model={model_pref}"
+            f"{', response cache on' if response_cache else ''}")
+
+        # Get custom prompt if available
+        if custom_prompt is None:
+            custom_prompt = get_prompt(prompt_type)
+            if custom_prompt:
+                log(f"✓ Using custom prompt from preferences ({prompt_type})")
+
+    kind = 'text' if ext in TEXT_EXTENSIONS else 'pdf'
+    template = custom_prompt or {'text': DEFAULT_TEXT_PROMPT, 'csv': DEFAULT_CSV_PROMPT}.get(prompt_type, DEFAULT_PDF_PROMPT)
+    product, model = product or product_pref, model or model_pref
+
+    def make_job(product, model_name):
+        return {'source': file_path, 'path': file_path, 'output': output_md_path, 'custom_prompt': custom_prompt,
+                'product': product, 'model': model_name, 'kind': kind, 'temp': None, 'response_cache': response_cache,
+                'report': mgrReportCache.make_entry(file_path, template, product, model_name)}
+
+    # 'Auto (fast)' may pick another model on latency noise: a report any recorded model made stays valid
+    from func.mgrModelSelect import AUTO_FAST
+    if model == AUTO_FAST and not force:
+        rec = mgrReportCache.recorded(output_md_path)
+        if rec and product in (None, 'Auto', rec.get('product')):
+            job = make_job(rec['product'], rec['model'])
+            if mgrReportCache.check(job['report'], output_md_path) == 'fresh':
+                job['cached'] = 'fresh'
+                log(f"✓ Report is up to date (manifest match, {rec['model']})")
+                return job
+
+    product, model_name = resolve_product_model(product, model, 'Claude' if kind == 'text' else 'Gemini',
+                                                log, source=file_path)
+    job = make_job(product, model_name)
+
+    # Report cache: same source bytes + prompt + model → no AI call
+    if not force:
+        job['cached'] = mgrReportCache.check(job['report'], output_md_path)
+        if job['cached'] == 'fresh':
+            log("✓ Report is up to date (manifest match)")
+            return job
+        elif job['cached'] == 'shared':
+            log("✓ Reused identical report from cache")
+            return job
+
+    # Text files
+    if kind == 'text':
+        log("📝 Text file detected")
+
+    # Office files → Convert first
+    elif ext in OFFICE_EXTENSIONS and ext not in DATA_EXTENSIONS:
+        log(f"📄 Office file detected → Converting to PDF")
+        converted_path = convert_office_to_pdf(file_path, console)
+        if not converted_path:
+            log("✗ Conversion failed")
+            return None
+
+        log(f"✓ Conversion successful")
+        job['path'] = converted_path
+        job['kind'] = 'text' if converted_path.endswith('.txt') else 'pdf'
+        if converted_path != file_path and '_converted' in converted_path:
+            job['temp'] = converted_path
+
+    # PDF/CSV/XLSX
+    else:
+        log("📊 Data file detected" if ext in DATA_EXTENSIONS else "📄 PDF file detected")
+
+    return job
+
+
+def generate_material(job, console=None, on_status=None):
+    """Stage 2 of learn_material: AI call + streamed report write + manifest update. Raises on failure."""
+    from func import mgrReportCache
+
+    if job.get('cached'):
+        return job['output']
+
+    mgrReportCache.detach(job['output'])
+    mgrReportCache.forget(job['output'])  # A partial report must never look fresh
+    generate = generate_text_report if job['kind'] == 'text' else generate_pdf_or_csv_report
+    generate(job['path'], job['output'], console, job['custom_prompt'], job['product'], job['model'], on_status,
+             job.get('prompt_cache'), job.get('response_cache', False))
+    mgrReportCache.record(job['report'], job['output'])
+    return job['output']
+
+
+def generate_packed_material(jobs, console=None):
+    """
+    Several tiny text jobs (same product/model/prompt) → one AI call, one report each. Raises on failure.
+
+    Returns:
+        list: Output paths of the reports written (jobs missing from the response are left out)
+    """
+    from func import mgrReportCache
+    from func.procLearnChunked import generate_packed_text_reports
+
+    def log(msg):
+        if console:
+            console.append(msg)
         else:
-            # Use default prompts
-            if ext == '.pdf':
-                prompt = DEFAULT_PDF_PROMPT.format(filename=os.path.basename(file_path))
-            else:  # CSV
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    csv_preview = f.read(5000)
-                prompt = DEFAULT_CSV_PROMPT.format(
-                    filename=os.path.basename(file_path),
-                    csv_preview=csv_preview
-                )
-
-        log(f"🤖 Generating analysis with {product}...")
-        result = call_ai(prompt, product, model_name, uploaded_info=uploaded_info)
-
-        # Save report
-        with open(output_md_path, 'w', encoding='utf-8') as f:
-            f.write(result)
-
-        log(f"✓ Report saved: {output_md_path}")
-        return True
+            print(msg)
 
-    except Exception as e:
-        log(f"✗ Error processing file: {e}")
-        import traceback
-        log(traceback.format_exc())
-        return False
+    first = jobs[0]
+    template = (first['custom_prompt'] or DEFAULT_TEXT_PROMPT).format(
+        file_type='<file type>', filename='<filename>', file_type_lower='', content=CONTENT_IN_PARTS)
+    for job in jobs:
+        mgrReportCache.detach(job['output'])
+        mgrReportCache.forget(job['output'])
+
+    written = generate_packed_text_reports([j['path'] for j in jobs], [j['output'] for j in jobs], template,
+                                           first['product'], first['model'], log)
+    for job in jobs:
+        if job['output'] in written:
+            mgrReportCache.record(mgrReportCache.packed_entry(job['report']), job['output'])
+    return written
+
+
+def build_request(job, upload_margin=None):
+    """Prompt + uploaded files for a prepared job (what generate_material would send)
+
+    upload_margin: Remaining lifetime (s) reused uploads need (batch requests run for hours)
+    """
+    if job['kind'] == 'text':
+        return build_text_prompt(job['path'], job['custom_prompt']), None
+
+    from func.ai import upload_files
+    uploaded_info = None
+    is_data = os.path.splitext(job['path'])[1].lower() in DATA_EXTENSIONS
+    if job['product'] in ('Gemini', 'Claude') and not is_data:
+        uploaded_info = upload_files([job['path']], job['product'], margin=upload_margin)
+    return build_pdf_or_csv_prompt(job['path'], job['custom_prompt']), uploaded_info
+
+
+def cleanup_material(job, console=None):
+    """Remove temporary conversion output of a job"""
+    if job and job.get('temp'):
+        try:
+            os.unlink(job['temp'])
+            if console:
+                console.append("✓ Cleaned up temporary file")
+            else:
+                print("✓ Cleaned up temporary file")
+        except OSError:
+            pass
 
 
-def learn_material(file_path, course_dir, console=None, custom_prompt=None, use_preferences=True):
+def learn_material(file_path, course_dir, console=None, custom_prompt=None, use_preferences=True, force=False, progress=None):
     """
     Main entry point: Analyze any study material and generate markdown report
 
     Workflow:
     1. Detect file type
     2. For text files (py, js, etc.) → Use Claude directly
-    3. For Office files (docx, pptx, xlsx) → Convert to PDF/CSV first
-    4. For PDF/CSV → Use Gemini with file upload
+    3. For Office documents (docx, pptx) → Convert to PDF first
+    4. For PDF → Use Gemini with file upload; CSV/XLSX → data profile in the prompt
     5. Save report to Learn/reports/
 
     Args:
@@ -541,6 +848,8 @@ def learn_material(file_path, course_dir, console=None, custom_prompt=None, use_
         console: Optional console widget
         custom_prompt: Optional custom prompt template (overrides default and preferences)
         use_preferences: If True, load prompt from preferences when custom_prompt is None
+        force: Regenerate even if an up-to-date or identical cached report exists
+        progress: Optional TaskProgress (streaming status in Mission Control)
 
     Returns:
         Path to generated report, or None if failed
@@ -551,99 +860,28 @@ def learn_material(file_path, course_dir, console=None, custom_prompt=None, use_
         else:
             print(msg)
 
+    job = None
     try:
-        # Setup directories
-        learn_dir, reports_dir = get_learn_dir(course_dir)
-
-        # Generate output filename
-        base_name = os.path.splitext(os.path.basename(file_path))[0]
-        output_md_path = os.path.join(reports_dir, f"{base_name}.md")
-
-        log(f"=" * 80)
-        log(f"📚 Learn Material: {os.path.basename(file_path)}")
-        log(f"=" * 80)
-
-        ext = os.path.splitext(file_path)[1].lower()
-
-        # Load preferences (prompt + product/model)
-        product_pref = None
-        model_pref = None
-        if use_preferences:
-            sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'gui'))
-            from gui.learn.cfgLearnPrefs import get_prompt, get_product, get_model
-
-            # Get product/model from preferences
-            product_pref = get_product()
-            model_pref = get_model()
-            log(f"✓ Using preferences: Product={product_pref}, Model={model_pref}")
-
-            # Get custom prompt if available
-            if custom_prompt is None:
-                # Determine prompt type based on file extension
-                if ext in ['.py', '.js', '.java', '.cpp', '.c', '.go', '.rs', '.txt', '.md', '.json', '.xml', '.html', '.css', '.sh']:
-                    prompt_type = 'text'
-                elif ext == '.csv':
-                    prompt_type = 'csv'
-                else:
-                    prompt_type = 'pdf'
-
-                custom_prompt = get_prompt(prompt_type)
-                if custom_prompt:
-                    log(f"✓ Using custom prompt from preferences ({prompt_type})")
-
-        # Text files
-        text_extensions = ['.py', '.js', '.java', '.cpp', '.c', '.go', '.rs',
-                          '.txt', '.md', '.json', '.xml', '.html', '.css', '.sh']
-
-        if ext in text_extensions:
-            log("📝 Text file detected")
-            success = process_text_file(file_path, output_md_path, console, custom_prompt, product_pref, model_pref)
-
-        # Office files → Convert first
-        elif ext in ['.docx', '.pptx', '.xlsx']:
-            log(f"📄 Office file detected → Converting to {'PDF' if ext != '.xlsx' else 'CSV'}")
-            converted_path = convert_office_to_pdf(file_path, console)
-
-            if converted_path:
-                log(f"✓ Conversion successful")
-                success = process_pdf_or_csv(converted_path, output_md_path, console, custom_prompt, product_pref, model_pref)
-
-                # Cleanup temporary converted file if different from original
-                if converted_path != file_path and '_converted' in converted_path:
-                    try:
-                        os.unlink(converted_path)
-                        log("✓ Cleaned up temporary file")
-                    except:
-                        pass
-            else:
-                log("✗ Conversion failed")
-                success = False
-
-        # PDF/CSV
-        elif ext in ['.pdf', '.csv']:
-            log("📄 PDF/CSV file detected")
-            success = process_pdf_or_csv(file_path, output_md_path, console, custom_prompt, product_pref, model_pref)
-
-        else:
-            log(f"✗ Unsupported file type: {ext}")
-            log(f"  Supported: {', '.join(text_extensions + ['.docx', '.pptx', '.xlsx', '.pdf', '.csv'])}")
+        job = prepare_material(file_path, course_dir, console, custom_prompt, use_preferences, force)
+        if not job:
             return None
 
-        if success:
-            log(f"\n{'=' * 80}")
-            log(f"✅ Learning guide generated successfully!")
-            log(f"📄 Report: {output_md_path}")
-            log(f"{'=' * 80}")
-            return output_md_path
-        else:
-            return None
+        on_status = (lambda text: progress.update(status=text)) if progress else None
+        output_md_path = generate_material(job, console, on_status)
+
+        log(f"\n{'=' * 80}")
+        log(f"✅ Learning guide generated successfully!")
+        log(f"📄 Report: {output_md_path}")
+        log(f"{'=' * 80}")
+        return output_md_path
 
     except Exception as e:
-        log(f"✗ Error: {e}")
-        import traceback
-        log(traceback.format_exc())
+        _log_error(console, f"✗ Error: {e}")
         return None
 
+    finally:
+        cleanup_material(job, console)
+
 
 def load_from_decon(course_dir, console=None):
     """
@@ -653,8 +891,10 @@ def load_from_decon(course_dir, console=None):
         course_dir: Course directory
         console: Optional console widget
 
+    Chapters are reflinked/hardlinked (func/utilWorkspace), not copied.
+
     Returns:
-        List of copied file paths
+        List of placed file paths
     """
     def log(msg):
         if console:
@@ -663,7 +903,7 @@ def load_from_decon(course_dir, console=None):
             print(msg)
 
     try:
-        import shutil
+        from func.utilWorkspace import link_file
 
         learn_dir, _ = get_learn_dir(course_dir)
         decon_dir = os.path.join(course_dir, 'Files', 'Textbook', 'decon')
@@ -688,15 +928,15 @@ def load_from_decon(course_dir, console=None):
 
         log(f"Found {len(chapter_pdfs)} chapters")
 
-        # Copy files
+        # Link files (zero-copy on the same filesystem)
         copied_files = []
         for pdf in chapter_pdfs:
             src = os.path.join(decon_dir, pdf)
             dst = os.path.join(learn_dir, pdf)
 
-            shutil.copy2(src, dst)
+            method = link_file(src, dst)
             copied_files.append(dst)
-            log(f"  ✓ {pdf}")
+            log(f"  ✓ {pdf} ({method})")
 
         log(f"\n✓ Loaded {len(copied_files)} chapters to Learn directory")
         return copied_files
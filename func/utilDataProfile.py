@@ -0,0 +1,220 @@
+"""Data profiling - streaming CSV/XLSX profiles for AI prompts
+
+Profiles are computed chunk by chunk in bounded memory (vectorized pandas/NumPy):
+    - per column: inferred type, null rate, distinct count (exact up to MAX_DISTINCT),
+      min / max / mean / std, top values
+    - quantiles and correlations from a uniform row sample (bottom-k sampling)
+XLSX is read with openpyxl in read-only mode, every sheet.
+
+Usage:
+    from func.utilDataProfile import profile_file, format_profiles
+    text = format_profiles(profile_file('data.xlsx'))
+"""
+import os
+import re
+from collections import Counter
+
+CHUNK_ROWS = 50_000
+SAMPLE_ROWS = 10_000     # Row sample for quantiles + correlations
+MAX_DISTINCT = 10_000    # Cardinality tracked exactly up to this
+TOP_VALUES = 5
+MAX_CORR_COLUMNS = 20
+TOP_CORRELATIONS = 10
+SAMPLE_PREVIEW_ROWS = 5
+QUANTILES = [5, 25, 50, 75, 95]
+
+_DATE_LIKE = re.compile(r'\d{1,4}[-/.年]\d{1,2}')
+
+
+class TableProfiler:
+    """Accumulates a profile over DataFrame chunks (all columns read as strings)"""
+
+    def __init__(self, name):
+        import numpy as np
+        self.name = name
+        self.rows = 0
+        self.columns = {}
+        self.preview = None
+        self._sample = None   # numeric view of sampled rows
+        self._keys = None     # sampling keys of sampled rows
+        self._rng = np.random.default_rng(0)
+
+    def update(self, df):
+        import numpy as np
+        import pandas as pd
+
+        if df.empty:
+            return
+        if self.preview is None:
+            self.preview = df.head(SAMPLE_PREVIEW_ROWS)
+
+        numeric = df.apply(pd.to_numeric, errors='coerce')
+        for col in df.columns:
+            s, num = df[col], numeric[col]
+            st = self.columns.setdefault(col, {'non_null': 0, 'numeric': 0, 'min': None, 'max': None,
+                                               'sum': 0.0, 'sumsq': 0.0, 'distinct': set(), 'top': Counter(),
+                                               'dates': None, 'first': None, 'last': None})
+            valid = s.dropna()
+            valid = valid[valid.astype(str).str.strip() != '']
+            st['non_null'] += len(valid)
+
+            nums = num.dropna().to_numpy(dtype='float64')
+            if len(nums):
+                st['numeric'] += len(nums)
+                st['min'] = float(nums.min()) if st['min'] is None else min(st['min'], float(nums.min()))
+                st['max'] = float(nums.max()) if st['max'] is None else max(st['max'], float(nums.max()))
+                st['sum'] += float(nums.sum())
+                st['sumsq'] += float(np.square(nums).sum())
+
+            values = valid.astype(str)
+            if st['distinct'] is not None:
+                st['distinct'].update(values.unique())
+                if len(st['distinct']) > MAX_DISTINCT:
+                    st['distinct'] = None
+            st['top'].update(values.value_counts().head(200).to_dict())
+            if len(st['top']) > 2000:
+                st['top'] = Counter(dict(st['top'].most_common(500)))
+
+            if st['dates'] is None and len(values) and not len(nums):
+                probe = values.head(200)
+                st['dates'] = bool(probe.str.contains(_DATE_LIKE).mean() > 0.9 and
+                                   pd.to_datetime(probe, errors='coerce', format='mixed').notna().mean() > 0.9)
+            if st['dates'] and len(values):
+                dates = pd.to_datetime(values, errors='coerce', format='mixed').dropna()
+                if len(dates):
+                    st['first'] = dates.min() if st['first'] is None else min(st['first'], dates.min())
+                    st['last'] = dates.max() if st['last'] is None else max(st['last'], dates.max())
+
+        # Bottom-k sampling: keep the SAMPLE_ROWS rows with the smallest random keys
+        keys = self._rng.random(len(df))
+        sample = numeric.reset_index(drop=True)
+        if self._sample is not None:
+            sample = pd.concat([self._sample, sample], ignore_index=True)
+            keys = np.concatenate([self._keys, keys])
+        if len(keys) > SAMPLE_ROWS:
+            keep = np.argpartition(keys, SAMPLE_ROWS)[:SAMPLE_ROWS]
+            sample, keys = sample.iloc[keep].reset_index(drop=True), keys[keep]
+        self._sample, self._keys = sample, keys
+        self.rows += len(df)
+
+    def result(self):
+        """Profile dict: {'name', 'rows', 'columns': [...], 'correlations': [...], 'preview'}"""
+        import numpy as np
+
+        cols = []
+        for name, st in self.columns.items():
+            non_null = st['non_null']
+            numeric = non_null and st['numeric'] >= 0.95 * non_null
+            distinct = len(st['distinct']) if st['distinct'] is not None else None
+            kind = 'numeric' if numeric else ('datetime' if st['dates'] else
+                                              ('categorical' if distinct is not None and distinct <= 50 else 'text'))
+            top = [(v, n) for v, n in st['top'].most_common(TOP_VALUES) if n > 1]  # Unique ids say nothing
+            col = {'name': str(name), 'type': kind, 'null_rate': 1 - non_null / self.rows if self.rows else 0,
+                   'distinct': distinct, 'top': top}
+            if kind == 'datetime' and st['first'] is not None:
+                col.update(min=str(st['first']), max=str(st['last']))
+            if numeric and st['numeric']:
+                n = st['numeric']
+                mean = st['sum'] / n
+                col.update(min=st['min'], max=st['max'], mean=mean,
+                           std=float(np.sqrt(max(st['sumsq'] / n - mean * mean, 0.0))))
+                sample = self._sample[name].dropna().to_numpy(dtype='float64')
+                if len(sample):
+                    col['quantiles'] = [float(q) for q in np.percentile(sample, QUANTILES)]
+            cols.append(col)
+
+        corr = []
+        num_cols = [c['name'] for c in cols if c['type'] == 'numeric' and c.get('std')]
+        num_cols = sorted(num_cols, key=lambda c: self.columns[c]['numeric'], reverse=True)[:MAX_CORR_COLUMNS]
+        if len(num_cols) >= 2:
+            m = self._sample[num_cols].corr().to_numpy()
+            pairs = [(abs(m[i, j]), num_cols[i], num_cols[j], m[i, j])
+                     for i in range(len(num_cols)) for j in range(i + 1, len(num_cols)) if not np.isnan(m[i, j])]
+            corr = [(a, b, float(r)) for _, a, b, r in sorted(pairs, reverse=True)[:TOP_CORRELATIONS]]
+
+        return {'name': self.name, 'rows': self.rows, 'columns': cols, 'correlations': corr,
+                'sample_rows': len(self._keys) if self._keys is not None else 0, 'preview': self.preview}
+
+
+def profile_csv(path):
+    """Profile a CSV in CHUNK_ROWS chunks"""
+    import pandas as pd
+    prof = TableProfiler(os.path.basename(path))
+    for chunk in pd.read_csv(path, chunksize=CHUNK_ROWS, dtype=str, encoding_errors='replace', on_bad_lines='skip'):
+        prof.update(chunk)
+    return [prof.result()]
+
+
+def profile_xlsx(path):
+    """Profile every sheet of an XLSX (openpyxl read-only, CHUNK_ROWS rows at a time)"""
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    profiles = []
+    try:
+        for ws in wb.worksheets:
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header:
+                continue
+            names, seen = [], Counter()
+            for i, h in enumerate(header):
+                h = str(h).strip() if h is not None else f"column_{i + 1}"
+                seen[h] += 1
+                names.append(h if seen[h] == 1 else f"{h}.{seen[h] - 1}")
+
+            prof = TableProfiler(ws.title)
+            width, buf = len(names), []
+            for row in rows:
+                row = [None if v is None else str(v) for v in row[:width]]
+                buf.append(row + [None] * (width - len(row)))  # Read-only rows can be ragged
+                if len(buf) >= CHUNK_ROWS:
+                    prof.update(pd.DataFrame(buf, columns=names))
+                    buf = []
+            if buf:
+                prof.update(pd.DataFrame(buf, columns=names))
+            profiles.append(prof.result())
+    finally:
+        wb.close()
+    return profiles
+
+
+def profile_file(path):
+    """Profile a .csv or .xlsx file → list of table profiles (one per sheet)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.xlsx':
+        return profile_xlsx(path)
+    if ext == '.csv':
+        return profile_csv(path)
+    raise ValueError(f"Unsupported data file: {ext}")
+
+
+def _fmt(v):
+    if v is None:
+        return ''
+    if isinstance(v, float):
+        return f"{int(v):,}" if v.is_integer() and abs(v) < 1e15 else f"{v:,.4g}"
+    return str(v)
+
+
+def format_profiles(profiles):
+    """Compact markdown rendering of profile_file() output (for the CSV prompt)"""
+    out = []
+    for p in profiles:
+        out.append(f"### {p['name']}: {p['rows']:,} rows × {len(p['columns'])} columns")
+        out.append("| Column | Type | Null % | Distinct | Min | Max | Mean | Std | p5/p25/p50/p75/p95 | Top values |")
+        out.append("|---|---|---|---|---|---|---|---|---|---|")
+        for c in p['columns']:
+            distinct = f"{c['distinct']:,}" if c['distinct'] is not None else f">{MAX_DISTINCT:,}"
+            quant = ' / '.join(_fmt(q) for q in c.get('quantiles', []))
+            top = ', '.join(f"{str(v)[:20]} ({n:,})" for v, n in c['top']) if c['type'] != 'numeric' else ''
+            out.append(f"| {c['name']} | {c['type']} | {c['null_rate'] * 100:.1f} | {distinct} | {_fmt(c.get('min'))} | "
+                       f"{_fmt(c.get('max'))} | {_fmt(c.get('mean'))} | {_fmt(c.get('std'))} | {quant} | {top} |")
+        if p['correlations']:
+            pairs = '; '.join(f"{a} ~ {b}: {r:+.2f}" for a, b, r in p['correlations'])
+            out.append(f"\nStrongest correlations (Pearson, {p['sample_rows']:,}-row sample): {pairs}")
+        if p['preview'] is not None:
+            out.append(f"\nFirst {len(p['preview'])} rows:\n```csv\n{p['preview'].to_csv(index=False).strip()}\n```")
+        out.append('')
+    return '\n'.join(out)
@@ -0,0 +1,43 @@
+"""Content hashing helpers - SHA-256 of files, memoized by (path, size, mtime)"""
+import os
+import hashlib
+import threading
+
+_CHUNK = 1024 * 1024  # 1 MB read blocks
+_memo = {}  # abs_path -> (size, mtime_ns, digest)
+_lock = threading.Lock()
+
+
+def sha256_file(path):
+    """SHA-256 hex digest of a file's content
+
+    Results are memoized per (size, mtime) so re-hashing a multi-hundred-MB
+    textbook on every call is free until the file actually changes.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    with _lock:
+        hit = _memo.get(path)
+    if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+        return hit[2]
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_CHUNK), b''):
+            h.update(block)
+    digest = h.hexdigest()
+
+    with _lock:
+        _memo[path] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+
+def sha256_text(text):
+    """SHA-256 hex digest of a string (utf-8)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+if __name__ == '__main__':
+    import sys
+    for p in sys.argv[1:]:
+        print(f"{sha256_file(p)}  {p}")
@@ -6,6 +6,9 @@ import json
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import config
 
+# Bump when split output (file naming, page handling) changes - invalidates decon cache
+SPLITTER_VERSION = 1
+
 
 def split_pdf_by_chapters(pdf_path, chapters_json, output_dir):
     """Split PDF into chapters based on JSON metadata
@@ -61,9 +64,12 @@ def split_pdf_by_chapters(pdf_path, chapters_json, output_dir):
         for page_num in range(start_page - 1, end_page):
             writer.add_page(reader.pages[page_num])
 
-        # Save chapter PDF
-        with open(output_path, 'wb') as output_file:
+        # Save chapter PDF (temp + replace: output_path may be hardlinked with
+        # the decon cache and other courses - never write through the link)
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as output_file:
             writer.write(output_file)
+        os.replace(tmp_path, output_path)
 
         created_files.append(output_path)
         print(f"[SPLIT] Chapter {chapter_num}: {chapter_name} → {filename} ({end_page - start_page + 1} pages)")
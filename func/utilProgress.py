@@ -83,6 +83,24 @@ class TaskProgress:
         except Exception as e:
             print(f"[WARN] Callback failed: {e}")
 
+    def item(self, key, status, state='running'):
+        """
+        逐项进度 (批处理中每个文件一行, 不节流)
+
+        Args:
+            key (str): 行标识 (e.g. 文件名)
+            status (str): 该行状态文本
+            state (str): pending / running / warning / done / error
+        """
+        if not self.callback:
+            print(f"  [{state}] {key}: {status}")
+            return
+
+        try:
+            self.callback({'timestamp': time.time(), 'item': {'key': key, 'status': status, 'state': state}})
+        except Exception as e:
+            print(f"[WARN] Callback failed: {e}")
+
     def elapsed(self):
         """返回已用时间(秒)"""
         return time.time() - self.start_time
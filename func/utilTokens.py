@@ -0,0 +1,117 @@
+"""Token budget utilities - local token estimate, per-model input budgets, logical text splitting"""
+import os
+import re
+
+# Context windows (tokens) by model family
+CONTEXT_WINDOWS = {'gemini': 1_048_576, 'claude': 200_000}
+OUTPUT_RESERVE = 16384          # max_tokens of a report
+MAX_REQUEST_TOKENS = 120_000    # Cap per request: beyond this latency/quality drop, split instead
+SAFETY = 0.8                    # Estimator is approximate - keep headroom
+
+_CJK = re.compile(r'[　-鿿가-힯＀-￯]')
+
+# Top-level definitions (column 0) that start a new logical block in code
+_CODE_BOUNDARY = re.compile(
+    r'^(?:@|def |async def |class |function |async function |export |func |fn |pub |impl |struct |enum |'
+    r'interface |type |public |private |protected |static |template|#include|package |import |const |let |var )')
+_MD_BOUNDARY = re.compile(r'^#{1,3} ')
+MARKDOWN_EXTENSIONS = ('.md', '.txt', '.html', '.xml')
+
+
+def estimate_tokens(text):
+    """Approximate token count: ~1 per CJK character, ~4 characters per token otherwise"""
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def input_budget(model):
+    """Input tokens one request to model may carry (template included)"""
+    family = next((f for f in CONTEXT_WINDOWS if f in (model or '').lower()), 'claude')
+    return min(int((CONTEXT_WINDOWS[family] - OUTPUT_RESERVE) * SAFETY), MAX_REQUEST_TOKENS)
+
+
+def _blocks(text, ext):
+    """Split text into logical blocks (code: top-level definitions, markdown: headings)"""
+    boundary = _MD_BOUNDARY if ext in MARKDOWN_EXTENSIONS else _CODE_BOUNDARY
+    blocks, current = [], []
+    for line in text.splitlines(keepends=True):
+        if current and boundary.match(line) and not (current[-1].startswith('@') and boundary is _CODE_BOUNDARY):
+            blocks.append(''.join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append(''.join(current))
+    return blocks
+
+
+def _slices(line, budget):
+    """Cut one line into pieces of at most budget tokens (bisecting the width, so CJK text fits too)"""
+    i = 0
+    while i < len(line):
+        lo, hi = i + 1, min(len(line), i + budget * 4)
+        while lo < hi:  # Largest end with estimate_tokens(line[i:end]) <= budget
+            mid = (lo + hi + 1) // 2
+            if estimate_tokens(line[i:mid]) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        yield line[i:lo]
+        i = lo
+
+
+def split_text(text, ext, budget):
+    """
+    Split text into parts of at most ~budget tokens on logical boundaries
+
+    Adjacent blocks are packed greedily; a single block over budget is cut on line breaks.
+    """
+    parts, current, size = [], [], 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            parts.append(''.join(current))
+        current, size = [], 0
+
+    for block in _blocks(text, ext.lower()):
+        tokens = estimate_tokens(block)
+        if tokens > budget:
+            flush()
+            for line in block.splitlines(keepends=True):
+                for piece in _slices(line, budget):  # Minified / one-line dumps
+                    t = estimate_tokens(piece)
+                    if size + t > budget:
+                        flush()
+                    current.append(piece)
+                    size += t
+            flush()
+            continue
+        if size + tokens > budget:
+            flush()
+        current.append(block)
+        size += tokens
+    flush()
+    return parts
+
+
+def pack(items, budget, max_items=8):
+    """Greedy packing of (key, tokens) pairs into groups under budget (input order kept)"""
+    groups, current, size = [], [], 0
+    for key, tokens in items:
+        if current and (size + tokens > budget or len(current) >= max_items):
+            groups.append(current)
+            current, size = [], 0
+        current.append(key)
+        size += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def file_tokens(path):
+    """Token estimate of a text file (size-based for files too big to read cheaply)"""
+    size = os.path.getsize(path)
+    if size > 4 * 1024 * 1024:
+        return size // 4
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return estimate_tokens(f.read())
@@ -0,0 +1,226 @@
+"""Workspace file layer - zero-copy placement of large files (reflink > hardlink > copy)
+
+Decon chapters, Learn materials and drag-dropped textbooks are usually the same
+bytes living in several folders. Instead of shutil.copy2 we:
+    1. reflink (FICLONE, copy-on-write: independent files, shared blocks)
+    2. hardlink (same inode: deleting one path keeps the other, but writes are
+       shared - only used for sources inside AAFS/, whose writers never write
+       through an existing file: they replace it (temp + os.replace) or, when
+       streaming (procLearnMaterial.ReportStream), unlink it first. A new
+       writer must do the same, or place with hardlink=False)
+    3. copy_file_range / copy2 (crossing filesystems, or external sources
+       where reflink is unavailable)
+
+Every placement is recorded in a provenance registry (dst → src, method).
+Deleting through remove_file()/remove_tree() (clean, decon cache invalidation)
+re-points placements that named a deleted path as their source.
+
+The registry is an append-only JSONL log, loaded once per process; entries
+whose file is gone are pruned and the log is compacted on load.
+"""
+import os
+import sys
+import json
+import errno
+import shutil
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+
+REGISTRY_FILE = os.path.join(config.JSONS_DIR, 'workspace_links.jsonl')
+FICLONE = 0x40049409  # linux/fs.h _IOW(0x94, 9, int)
+
+_lock = threading.Lock()
+_registry = None        # dst → {'src', 'method'}; loaded on first use
+
+
+# === Registry ===
+
+def _get_registry():
+    """Registry dict (caller holds _lock); replays the log and prunes on first use"""
+    global _registry
+    if _registry is not None:
+        return _registry
+    reg, lines = {}, 0
+    try:
+        with open(REGISTRY_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line
+                lines += 1
+                if rec.get('src') is None:
+                    reg.pop(rec['dst'], None)
+                else:
+                    reg[rec['dst']] = {'src': rec['src'], 'method': rec['method']}
+    except IOError:
+        pass
+    _registry = {d: e for d, e in reg.items() if os.path.exists(d)}  # Deleted outside the app
+    if lines > len(_registry):
+        _compact()
+    return _registry
+
+
+def _compact():
+    os.makedirs(os.path.dirname(REGISTRY_FILE), exist_ok=True)
+    tmp = REGISTRY_FILE + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for dst, e in _registry.items():
+            f.write(json.dumps({'dst': dst, **e}, ensure_ascii=False) + '\n')
+    os.replace(tmp, REGISTRY_FILE)
+
+
+def _append(changes):
+    """Apply and log {dst: entry or None (removed)} (caller holds _lock)"""
+    reg = _get_registry()
+    os.makedirs(os.path.dirname(REGISTRY_FILE), exist_ok=True)
+    with open(REGISTRY_FILE, 'a', encoding='utf-8') as f:
+        for dst, e in changes.items():
+            if e is None:
+                reg.pop(dst, None)
+                f.write(json.dumps({'dst': dst, 'src': None}, ensure_ascii=False) + '\n')
+            else:
+                reg[dst] = e
+                f.write(json.dumps({'dst': dst, **e}, ensure_ascii=False) + '\n')
+
+
+def get_provenance(path):
+    """Return {'src', 'method'} for a placed file, or None"""
+    with _lock:
+        return _get_registry().get(os.path.abspath(path))
+
+
+# === Placement strategies ===
+
+def _reflink(src, dst):
+    """Copy-on-write clone (btrfs, xfs, bcachefs...). Raises OSError if unsupported."""
+    if not sys.platform.startswith('linux'):
+        raise OSError(errno.EOPNOTSUPP, "reflink not supported on this platform")
+    import fcntl
+    with open(src, 'rb') as fs, open(dst, 'wb') as fd:
+        try:
+            fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+        except OSError:
+            fd.close()
+            os.unlink(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+def _copy(src, dst):
+    """In-kernel copy where available, plain copy otherwise"""
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fs, open(dst, 'wb') as fd:
+                remaining = os.fstat(fs.fileno()).st_size
+                while remaining > 0:
+                    n = os.copy_file_range(fs.fileno(), fd.fileno(), remaining)
+                    if n == 0:
+                        break
+                    remaining -= n
+            if remaining == 0:
+                shutil.copystat(src, dst)
+                return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+def _inside(path, root):
+    root = os.path.abspath(root)
+    try:
+        return os.path.commonpath([path, root]) == root
+    except ValueError:  # Different drives
+        return False
+
+
+def link_file(src, dst, hardlink=None):
+    """Place src at dst without duplicating data when possible
+
+    Args:
+        src: Existing source file
+        dst: Target path (replaced if it exists and is a different file)
+        hardlink: Allow hardlinks; None = only for sources inside AAFS/ (a
+            user's own file must not share writes with the workspace copy)
+
+    Returns:
+        str: Method used - 'same', 'reflink', 'hardlink' or 'copy'
+    """
+    src, dst = os.path.abspath(src), os.path.abspath(dst)
+    if hardlink is None:
+        hardlink = _inside(src, config.AAFS_DIR)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+
+    if os.path.exists(dst):
+        if os.path.samefile(src, dst):
+            if src != dst and get_provenance(dst) is None:
+                _record(src, dst, 'hardlink')  # Same inode under another name
+            return 'same'
+        os.unlink(dst)
+
+    method = None
+    strategies = (('reflink', _reflink), ('hardlink', os.link)) if hardlink else (('reflink', _reflink),)
+    for name, fn in strategies:
+        try:
+            fn(src, dst)
+            method = name
+            break
+        except (OSError, NotImplementedError):
+            continue
+    if method is None:
+        _copy(src, dst)
+        method = 'copy'
+
+    _record(src, dst, method)
+    return method
+
+
+def _record(src, dst, method):
+    with _lock:
+        _append({dst: {'src': src, 'method': method}})
+
+
+def _forget(paths):
+    """Drop registry entries of deleted paths; re-point placements sourced from them (caller holds _lock)"""
+    reg = _get_registry()
+    changes = {}
+    for path in paths:
+        entry = reg.get(path)
+        changes[path] = None
+        dependants = [d for d, e in reg.items() if e['src'] == path and d not in paths]
+        new_src = entry['src'] if entry and entry['src'] not in paths and os.path.exists(entry['src']) \
+            else (dependants[0] if dependants else None)
+        for d in dependants:
+            if d == new_src:
+                changes[d] = {'src': d, 'method': 'origin'}
+            else:
+                changes[d] = {'src': new_src, 'method': reg[d]['method']}
+        for d, e in changes.items():  # Later paths see earlier re-pointing
+            if e is not None:
+                reg[d] = e
+    _append(changes)
+
+
+def remove_file(path):
+    """Delete one view of a file, keeping every other placement valid
+
+    Placements that named this path as their source are re-pointed at a
+    surviving sibling (hardlinks/reflinks/copies all own their data already).
+    """
+    path = os.path.abspath(path)
+    with _lock:
+        _forget({path})
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+def remove_tree(path):
+    """shutil.rmtree, with remove_file bookkeeping for registered files below path"""
+    path = os.path.abspath(path)
+    with _lock:
+        inside = {d for d in _get_registry() if _inside(d, path)}
+        if inside:
+            _forget(inside)
+    shutil.rmtree(path, ignore_errors=True)
@@ -1,12 +1,44 @@
 """Keyboard Handler - WASD navigation and shortcuts"""
 import sys, os, webbrowser
 from PyQt6.QtWidgets import QListWidget
-from PyQt6.QtCore import QEvent, Qt
+from PyQt6.QtCore import QEvent, Qt, QTimer
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 import config
 from gui._internal.mgrCourseDetail import CourseDetailManager
 from gui._internal.mgrAutoDetail import AutoDetailManager
+from gui._internal.wgtRecordList import RecordListView
+
+LIST_TYPES = (QListWidget, RecordListView)
+NAV_DEBOUNCE_MS = 120
+
+
+def debounced(fn, delay_ms=NAV_DEBOUNCE_MS):
+    """
+    Wrap a selection handler: a single call runs at once; during a burst (a held
+    W/S or arrow key) only the last call runs, once the burst pauses for delay_ms.
+    """
+    timer = QTimer()
+    timer.setSingleShot(True)
+    timer.setInterval(delay_ms)
+    pending = []
+
+    def flush():
+        if pending:
+            args = pending.pop()
+            fn(*args)
+
+    def call(*args):
+        if timer.isActive():
+            pending[:] = [args]
+        else:
+            pending.clear()
+            fn(*args)
+        timer.start()
+
+    timer.timeout.connect(flush)
+    call.timer = timer
+    return call
 
 
 class KeyboardHandler:
@@ -58,7 +90,7 @@ class KeyboardHandler:
         current = self.app.stacked_widget.currentWidget()
 
         # Launcher WASD
-        if self.lo.isVisible() and isinstance(obj, QListWidget):
+        if self.lo.isVisible() and isinstance(obj, LIST_TYPES):
             if key in [Qt.Key.Key_W, Qt.Key.Key_A, Qt.Key.Key_S, Qt.Key.Key_D]:
                 self._handle_launcher_wasd(key, obj)
                 return True
@@ -73,21 +105,20 @@ class KeyboardHandler:
             return False
 
         # WASD navigation
-        if key in [Qt.Key.Key_W, Qt.Key.Key_A, Qt.Key.Key_S, Qt.Key.Key_D] and isinstance(obj, QListWidget):
+        if key in [Qt.Key.Key_W, Qt.Key.Key_A, Qt.Key.Key_S, Qt.Key.Key_D] and isinstance(obj, LIST_TYPES):
             self._handle_wasd(key, current)
             return True
 
         # Space - open course detail
         if key == Qt.Key.Key_Space:
             if current == self.mw and self.mw.categoryList.currentRow() == 0:
-                ii = self.mw.itemList.currentRow()
-                if ii >= 0:
-                    courses = self.app.dm.get('courses')
-                    if ii < len(courses):
-                        self.app.course_detail_mgr = CourseDetailManager(courses[ii], self.app.dm.get('todos'), self.app.dm.get('history_todos'))
-                        self.app.course_view.populate_window()
-                        self.app.stacked_widget.setCurrentWidget(self.cdw)
-                        return True
+                item = self.mw.itemList.currentItem()
+                course = item.data(Qt.ItemDataRole.UserRole + 1) if item else None
+                if course:
+                    self.app.course_detail_mgr = CourseDetailManager(course, self.app.dm.get('todos'), self.app.dm.get('history_todos'))
+                    self.app.course_view.populate_window()
+                    self.app.stacked_widget.setCurrentWidget(self.cdw)
+                    return True
             elif current == self.cdw:
                 ii = self.cdw.itemList.currentRow()
                 if ii >= 0:
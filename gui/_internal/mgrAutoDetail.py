@@ -1,5 +1,5 @@
 """AutoDetail Manager - Modern GitHub Dark themed HTML generation"""
-import os, sys, re, base64
+import os, sys, re
 from datetime import datetime
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import config
@@ -58,34 +58,40 @@ class AutoDetailManager:
             fp = os.path.join(preview_dir, fn)
             if os.path.exists(fp):
                 try:
-                    return self._markdown_to_html(open(fp, encoding='utf-8').read(), fn, preview_dir)
+                    return self._render_file(fp, preview_dir)
                 except:
                     pass
         return None
 
     def load_homework_preview(self, output_dir):
         fp = os.path.join(output_dir, 'answer.md')
-        return self._markdown_to_html(open(fp, encoding='utf-8').read(), 'answer.md', output_dir) if os.path.exists(fp) else None
+        return self._render_file(fp, output_dir) if os.path.exists(fp) else None
+
+    def _render_file(self, path, base_dir):
+        """_markdown_to_html of a preview file, via the rendered-HTML cache (keyed by mtime + images/)"""
+        from gui._internal.mgrHtmlCache import get_html_cache, theme_key
+        images_dir = os.path.join(base_dir, 'images') if self.is_quiz else None
+        return get_html_cache().render_file(
+            f"auto_detail:{'quiz' if self.is_quiz else 'page'}", path,
+            lambda text: self._markdown_to_html(text, os.path.basename(path), base_dir),
+            theme=theme_key(C), deps=[images_dir] if images_dir else ())
 
     def _markdown_to_html(self, md_content, source_filename, base_dir=None):
         import markdown as md_lib
         html_body = md_lib.markdown(md_content, extensions=['extra', 'nl2br', 'tables'])
 
-        # Embed images for quiz
+        # Quiz images: thumbnails served by ThumbnailTextBrowser (no data URIs)
         if base_dir and self.is_quiz:
             images_dir = os.path.join(base_dir, 'images')
             if os.path.exists(images_dir):
+                from gui._internal.mgrThumbnails import image_tag
                 def replace_image_ref(match):
                     filename = match.group(1)
                     img_path = os.path.join(images_dir, filename)
                     if os.path.exists(img_path):
                         try:
-                            with open(img_path, 'rb') as f:
-                                img_data = base64.b64encode(f.read()).decode()
-                            ext = filename.split('.')[-1].lower()
-                            mime = {'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'gif': 'image/gif', 'webp': 'image/webp'}.get(ext, 'image/png')
-                            return f'<img src="data:{mime};base64,{img_data}" style="max-width:280px;border:1px solid {C["border"]};border-radius:8px;margin:8px 0;"/>'
-                        except:
+                            return image_tag(img_path, f'border:1px solid {C["border"]};border-radius:8px;margin:8px 0;')
+                        except Exception:
                             pass
                     return match.group(0)
                 html_body = re.sub(r'\(Imgs:\s*([a-zA-Z0-9_]+\.(?:png|jpg|jpeg|gif|webp))\)', replace_image_ref, html_body, flags=re.IGNORECASE)
@@ -0,0 +1,213 @@
+"""Rendered-HTML cache - markdown tabs, reports and previews are rendered once
+
+Rendering (markdown.markdown + answer-list regex passes + image embedding) ran
+on every selection. Results are keyed by
+    files : renderer, theme, path + mtime + size (+ stamps of deps, e.g. images/)
+    text  : renderer, theme, content hash
+and held in an in-memory LRU (MEMORY_CHARS) and on disk as
+AAFS/cache/html/<key>.html.gz (LRU by file mtime, DISK_BYTES budget). An edited
+file, another palette or a bumped RENDER_VERSION gives a new key; stale entries
+age out of both levels.
+
+Usage:
+    from gui._internal.mgrHtmlCache import get_html_cache, theme_key
+    html = get_html_cache().render_file('quiz_preview', path, to_html, theme=theme_key(C), deps=[images_dir])
+    html = get_html_cache().render_text('course_tab', md, to_html)
+"""
+import os
+import sys
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import config
+
+RENDER_VERSION = 2                  # Bump when a renderer's output changes
+MEMORY_CHARS = 32 * 1024 * 1024     # Rendered HTML kept in memory
+DISK_BYTES = 100 * 1024 * 1024      # Compressed size budget on disk
+
+
+def theme_key(colors):
+    """Short stable key of a palette dict"""
+    return hashlib.sha1(json.dumps(colors, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _stamp(path):
+    """[path, mtime_ns, size]; a directory is stamped by its files (overwriting one keeps the dir mtime)"""
+    try:
+        if os.path.isdir(path):
+            stats = [e.stat() for e in os.scandir(path) if e.is_file()]
+            return [path, max((s.st_mtime_ns for s in stats), default=0), sum(s.st_size for s in stats), len(stats)]
+        st = os.stat(path)
+        return [path, st.st_mtime_ns, st.st_size]
+    except OSError:
+        return [path, None]
+
+
+class HtmlCache:
+    """Two-level (memory LRU + gzip files) cache of rendered HTML"""
+
+    def __init__(self, cache_dir=None, memory_chars=MEMORY_CHARS, disk_bytes=DISK_BYTES):
+        self.cache_dir = cache_dir or config.HTML_CACHE_DIR
+        self.memory_chars = memory_chars
+        self.disk_bytes = disk_bytes
+        self._mem = OrderedDict()
+        self._mem_chars = 0
+        self._disk_total = None     # Scanned on first write
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(renderer, theme, parts):
+        raw = json.dumps([RENDER_VERSION, renderer, theme, parts], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.html.gz")
+
+    def render_file(self, renderer, path, render_fn, theme='', deps=()):
+        """HTML of the file at path: cached, or render_fn(text) (stored)"""
+        key = self.key(renderer, theme, [_stamp(path)] + [_stamp(d) for d in deps])
+        html = self.get(key)
+        if html is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = render_fn(f.read())
+            self.put(key, html)
+        return html
+
+    def render_text(self, renderer, text, render_fn, theme=''):
+        """HTML of text: cached, or render_fn(text) (stored)"""
+        digest = hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+        key = self.key(renderer, theme, [digest])
+        html = self.get(key)
+        if html is None:
+            html = render_fn(text)
+            self.put(key, html)
+        return html
+
+    def get(self, key):
+        """Cached HTML, or None"""
+        with self._lock:
+            html = self._mem.get(key)
+            if html is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return html
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                html = f.read()
+            os.utime(path)  # Disk LRU order
+        except (OSError, EOFError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, html)
+        return html
+
+    def put(self, key, html):
+        with self._lock:
+            self._remember(key, html)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(html)
+            os.replace(tmp, path)
+            self._evict_disk(os.path.getsize(path))
+        except OSError as e:
+            print(f"[html-cache] Write failed: {e}")
+
+    def _remember(self, key, html):
+        """Add to the memory LRU (caller holds the lock)"""
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_chars -= len(old)
+        if len(html) > self.memory_chars // 4:
+            return  # One huge document must not flush everything else
+        self._mem[key] = html
+        self._mem_chars += len(html)
+        while self._mem_chars > self.memory_chars:
+            _, dropped = self._mem.popitem(last=False)
+            self._mem_chars -= len(dropped)
+
+    def _entries(self):
+        """[(mtime, size, path)] of cache files"""
+        out = []
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                if e.name.endswith('.html.gz'):
+                    st = e.stat()
+                    out.append((st.st_mtime, st.st_size, e.path))
+        return out
+
+    def _evict_disk(self, added):
+        with self._lock:
+            if self._disk_total is None:
+                self._disk_total = sum(size for _, size, _ in self._entries())
+            else:
+                self._disk_total += added
+            if self._disk_total <= self.disk_bytes:
+                return
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.disk_bytes * 0.8:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except OSError:
+                    pass
+            self._disk_total = total
+
+    def stats(self):
+        """{'memory_entries', 'memory_chars', 'disk_entries', 'disk_bytes', 'hits', 'misses'}"""
+        entries = self._entries() if os.path.isdir(self.cache_dir) else []
+        with self._lock:
+            return {'memory_entries': len(self._mem), 'memory_chars': self._mem_chars,
+                    'disk_entries': len(entries), 'disk_bytes': sum(size for _, size, _ in entries),
+                    'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            self._mem_chars = 0
+            self._disk_total = 0
+        if os.path.isdir(self.cache_dir):
+            for _, _, path in self._entries():
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_html_cache():
+    """Process-wide HtmlCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HtmlCache()
+        return _cache
+
+
+if __name__ == '__main__':
+    cache = get_html_cache()
+    if sys.argv[1:] == ['clear']:
+        cache.clear()
+        print("✓ HTML cache cleared")
+    else:
+        s = cache.stats()
+        print(f"{s['disk_entries']} rendered documents, {s['disk_bytes'] / 1024 / 1024:.1f} MB "
+              f"(limit {cache.disk_bytes / 1024 / 1024:.0f} MB)")
+        print("Usage: python mgrHtmlCache.py [clear]")
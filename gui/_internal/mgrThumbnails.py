@@ -0,0 +1,111 @@
+"""Preview thumbnails - downscaled images served to QTextBrowser by URL
+
+Previews used to embed referenced images as base64 data URIs of the full-size
+files: every render re-read and re-encoded them and the document held multi-MB
+strings. Now:
+    image_tag(path)      <img src="thumb:<sha256>"> sized for display; creates
+                         AAFS/cache/thumbs/<sha256>_<THUMB_WIDTH>.png on first use
+                         (decoded at reduced size by QImageReader)
+    ThumbnailTextBrowser QTextBrowser resolving thumb: URLs through QPixmapCache
+
+Usage:
+    from gui._internal.mgrThumbnails import image_tag, ThumbnailTextBrowser
+"""
+import os
+import sys
+import threading
+
+from PyQt6.QtWidgets import QTextBrowser
+from PyQt6.QtGui import QImageReader, QPixmap, QPixmapCache, QTextDocument
+from PyQt6.QtCore import QSize
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import config
+from func.utilHash import sha256_file
+
+THUMB_WIDTH = 560       # Stored width: 2× the display width for HiDPI screens
+DISPLAY_WIDTH = 280     # Width images are shown at in previews
+SCHEME = 'thumb'
+
+_sizes = {}             # digest → (width, height) of the thumbnail
+_sources = {}           # digest → source path (regenerates a deleted thumbnail)
+_lock = threading.Lock()
+
+
+def _thumb_path(digest):
+    return os.path.join(config.THUMBS_CACHE_DIR, f"{digest}_{THUMB_WIDTH}.png")
+
+
+def _make_thumbnail(src, out):
+    """Write a ≤ THUMB_WIDTH wide PNG of src; returns (width, height)"""
+    reader = QImageReader(src)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and size.width() > THUMB_WIDTH:
+        reader.setScaledSize(QSize(THUMB_WIDTH, max(1, round(size.height() * THUMB_WIDTH / size.width()))))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Cannot read image {os.path.basename(src)}: {reader.errorString()}")
+    os.makedirs(config.THUMBS_CACHE_DIR, exist_ok=True)
+    tmp = f"{out}.{threading.get_ident()}.tmp.png"
+    if not image.save(tmp, 'PNG'):
+        raise OSError(f"Cannot write thumbnail {tmp}")
+    os.replace(tmp, out)
+    return image.width(), image.height()
+
+
+def thumbnail(path):
+    """(digest, width, height) of the cached thumbnail of the image at path"""
+    digest = sha256_file(path)
+    with _lock:
+        _sources[digest] = path
+        size = _sizes.get(digest)
+    if size:
+        return (digest,) + size
+    out = _thumb_path(digest)
+    header = QImageReader(out).size() if os.path.exists(out) else None
+    size = (header.width(), header.height()) if header and header.isValid() else _make_thumbnail(path, out)
+    with _lock:
+        _sizes[digest] = size
+    return (digest,) + size
+
+
+def image_tag(path, style=''):
+    """<img> of the image at path, served from the thumbnail cache at ≤ DISPLAY_WIDTH"""
+    digest, w, h = thumbnail(path)
+    dw = min(w, DISPLAY_WIDTH)
+    dh = max(1, round(h * dw / w))
+    return f'<img src="{SCHEME}:{digest}" width="{dw}" height="{dh}" style="{style}"/>'
+
+
+def load_pixmap(digest):
+    """QPixmap of a thumbnail (QPixmapCache, then disk; regenerated if the file was cleaned), or None"""
+    key = f"{SCHEME}:{digest}"
+    pm = QPixmapCache.find(key)
+    if pm is not None and not pm.isNull():
+        return pm
+    out = _thumb_path(digest)
+    if not os.path.exists(out):
+        with _lock:
+            src = _sources.get(digest)
+        if not src or not os.path.exists(src):
+            return None
+        try:
+            _make_thumbnail(src, out)
+        except (OSError, ValueError) as e:
+            print(f"[thumbs] {e}")
+            return None
+    pm = QPixmap(out)
+    if pm.isNull():
+        return None
+    QPixmapCache.insert(key, pm)
+    return pm
+
+
+class ThumbnailTextBrowser(QTextBrowser):
+    """QTextBrowser that resolves thumb:<digest> images from the thumbnail cache"""
+
+    def loadResource(self, type, url):
+        if url.scheme() == SCHEME and type == QTextDocument.ResourceType.ImageResource.value:
+            return load_pixmap(url.path())
+        return super().loadResource(type, url)
@@ -361,7 +361,7 @@ def on_learn_material_clicked(canvas_app, console_widget=None):
     ext = os.path.splitext(file_path)[1].lower()
     if ext in ['.py', '.js', '.java', '.cpp', '.c', '.go', '.rs', '.txt', '.md', '.json', '.xml', '.html', '.css', '.sh']:
         prompt_type = 'text'
-    elif ext == '.csv':
+    elif ext in ('.csv', '.xlsx'):
         prompt_type = 'csv'
     else:
         prompt_type = 'pdf'
@@ -393,7 +393,9 @@ def on_learn_material_clicked(canvas_app, console_widget=None):
         progress.update(progress=10, status=f"Processing {filename}...")
         print(f"📚 Learn: {filename} | Course: {course_name}")
 
-        report_path = learn_material(file_path, course_dir, None, custom_prompt=custom_prompt, use_preferences=True)
+        # Explicit single-file request → always regenerate (batch uses the report cache)
+        report_path = learn_material(file_path, course_dir, None, custom_prompt=custom_prompt, use_preferences=True,
+                                     force=True, progress=progress)
 
         if report_path:
             progress.finish("Report generated!")
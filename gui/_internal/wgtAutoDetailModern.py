@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QColor
+from gui._internal.mgrThumbnails import ThumbnailTextBrowser
 
 # Mission Control Dark theme colors (darker, cleaner)
 COLORS = {
@@ -590,7 +591,7 @@ class ModernAutoDetailWidget(QWidget):
         layout.addWidget(tabs)
 
         # Preview content with custom CSS for question cards
-        self.aiPreviewView = QTextBrowser()
+        self.aiPreviewView = ThumbnailTextBrowser()  # Resolves thumb: images of quiz previews
         self.aiPreviewView.setStyleSheet(f"""
             QTextBrowser {{
                 background-color: {COLORS['bg_secondary']};
@@ -17,12 +17,20 @@ class TaskCard(QFrame):
     """单个任务卡片"""
     dismissed = pyqtSignal(str)  # task_id
 
+    BASE_HEIGHT = 72
+    ITEM_HEIGHT = 16
+    MAX_ITEM_ROWS = 8  # Visible per-item rows; more scroll inside the card
+    USAGE_HEIGHT = 16
+    ITEM_COLORS = {'pending': '#555555', 'running': '#3b82f6', 'warning': '#f59e0b',
+                   'done': '#10b981', 'error': '#ef4444'}
+
     def __init__(self, task_id, name, parent=None):
         super().__init__(parent)
         self.task_id = task_id
         self.name = name
         self._completed = False
         self._error = False
+        self._items = {}  # key -> QLabel (per-file rows of batch tasks)
 
         self.setObjectName("TaskCard")
         self.setStyleSheet("""
@@ -32,7 +40,7 @@ class TaskCard(QFrame):
                 border: 1px solid rgba(255, 255, 255, 0.05);
             }
         """)
-        self.setFixedHeight(72)
+        self.setFixedHeight(self.BASE_HEIGHT)
         self.setMinimumWidth(340)
         self.setMaximumWidth(340)
 
@@ -94,7 +102,33 @@ class TaskCard(QFrame):
         self.progress_bar.setFixedWidth(0)
         content.addWidget(self.progress_bar)
 
+        # AI usage rollup (func/mgrLedger, 首次 AI 调用后显示)
+        self.usage_label = QLabel("")
+        self.usage_label.setFont(QFont("Inter", 9))
+        self.usage_label.setStyleSheet("color: #666666; background: transparent;")
+        self.usage_label.setFixedHeight(self.USAGE_HEIGHT)
+        self.usage_label.hide()
+        content.addWidget(self.usage_label)
+
+        # Per-item rows (批处理逐文件状态, 首个 item 到达时显示; 超过 MAX_ITEM_ROWS 行滚动)
+        items_widget = QWidget()
+        items_widget.setStyleSheet("background: transparent;")
+        self.items_layout = QVBoxLayout(items_widget)
+        self.items_layout.setContentsMargins(0, 0, 0, 0)
+        self.items_layout.setSpacing(0)
+        self.items_scroll = QScrollArea()
+        self.items_scroll.setWidget(items_widget)
+        self.items_scroll.setWidgetResizable(True)
+        self.items_scroll.setFrameShape(QFrame.Shape.NoFrame)
+        self.items_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.items_scroll.setStyleSheet("QScrollArea { background: transparent; }"
+                                        "QScrollBar:vertical { width: 4px; background: transparent; }"
+                                        "QScrollBar::handle:vertical { background: #444444; border-radius: 2px; }")
+        self.items_scroll.hide()
+        content.addWidget(self.items_scroll)
+
         layout.addLayout(content, 1)
+        layout.setAlignment(self.status_dot, Qt.AlignmentFlag.AlignTop)
 
         # Dismiss button (完成后显示)
         self.dismiss_btn = QPushButton("×")
@@ -140,6 +174,15 @@ class TaskCard(QFrame):
         if 'speed' in data:
             self.speed_label.setText(data['speed'])
 
+        if 'item' in data:
+            self._update_item(data['item'])
+
+        if data.get('usage'):
+            self.usage_label.setText(data['usage'])
+            if self.usage_label.isHidden():
+                self.usage_label.show()
+                self._fit_height()
+
         if 'error' in data:
             self._error = True
             self.status_dot.setStyleSheet("color: #ef4444; background: transparent;")  # Red
@@ -148,6 +191,33 @@ class TaskCard(QFrame):
             self.status_label.setText(f"Error: {data['error']}")
             self.dismiss_btn.show()
 
+    def _update_item(self, item):
+        """Add or update one per-item row"""
+        label = self._items.get(item['key'])
+        if label is None:
+            label = QLabel()
+            label.setFont(QFont("Inter", 9))
+            label.setFixedHeight(self.ITEM_HEIGHT)
+            self.items_layout.addWidget(label)
+            self._items[item['key']] = label
+            self._fit_height()
+
+        color = self.ITEM_COLORS.get(item.get('state'), '#888888')
+        label.setText(f"<span style='color:{color};'>●</span> {item['key']} "
+                      f"<span style='color:#666666;'>— {item.get('status', '')}</span>")
+        label.setStyleSheet("color: #aaaaaa; background: transparent;")
+
+    def _fit_height(self):
+        height = self.BASE_HEIGHT
+        if not self.usage_label.isHidden():
+            height += self.USAGE_HEIGHT + 4
+        if self._items:
+            rows = min(len(self._items), self.MAX_ITEM_ROWS) * self.ITEM_HEIGHT
+            self.items_scroll.setFixedHeight(rows)
+            self.items_scroll.show()
+            height += 6 + rows
+        self.setFixedHeight(height)
+
     @property
     def is_done(self):
         return self._completed or self._error
@@ -316,6 +386,10 @@ class MissionControl(QWidget):
         # Connect signal
         self.update_signal.connect(self._handle_update)
 
+        # Per-task AI usage rollups (ledger rows are attributed via task_scope in start_task)
+        from func.mgrLedger import get_ledger
+        get_ledger().add_listener(self._on_ai_call)
+
     # === Drag Support ===
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -366,9 +440,11 @@ class MissionControl(QWidget):
         # Start thread
         def wrapper():
             from func.utilProgress import TaskProgress
+            from func.mgrLedger import task_scope
             try:
                 progress = TaskProgress(callback=self._create_callback(task_id))
-                func(progress=progress)
+                with task_scope(task_id, name):
+                    func(progress=progress)
             except Exception as e:
                 import traceback
                 traceback.print_exc()
@@ -385,6 +461,13 @@ class MissionControl(QWidget):
             self.update_signal.emit(task_id, data)
         return callback
 
+    def _on_ai_call(self, row):
+        """Ledger listener (worker thread): refresh the owning card's usage rollup"""
+        task_id = row.get('task_id')
+        if task_id in self.tasks:
+            from func.mgrLedger import get_ledger, format_rollup
+            self.update_signal.emit(task_id, {'usage': format_rollup(get_ledger().task_rollup(task_id))})
+
     def _handle_update(self, task_id, data):
         """处理更新 (主线程)"""
         if task_id not in self.tasks:
@@ -0,0 +1,231 @@
+"""Record list - model/view replacement for QListWidget lists of dicts
+
+RecordListModel  : QAbstractListModel over a list of records (todo/course/file
+                   dicts or strings). Rows are exposed lazily in FETCH_BATCH
+                   steps (canFetchMore/fetchMore); display text and metadata
+                   are computed on first use and cached per row.
+RecordFilterProxy: QSortFilterProxyModel whose filters are predicates over the
+                   row metadata (UserRole) - e.g. classify_todo flags.
+RecordListView   : QListView with the QListWidget calls the views and keyboard
+                   handler use (currentRow, setCurrentRow, count, item, clear,
+                   currentRowChanged, itemDoubleClicked). item(row) returns a
+                   QModelIndex, which answers .data(role) like a QListWidgetItem.
+
+Roles (same as the QListWidget items they replace, so delegates are unchanged):
+    DisplayRole    text_fn(record)
+    UserRole       meta_fn(record)       e.g. classify_todo(todo), has_file
+    UserRole + 1   the record itself
+    CheckStateRole done_fn(record)       checkable lists only
+    ForegroundRole gray if done_fn(record) (else the stylesheet text color)
+
+Used via .ui <customwidgets> for the dashboard, automation and course lists.
+"""
+from PyQt6.QtWidgets import QListView
+from PyQt6.QtGui import QBrush, QColor
+from PyQt6.QtCore import (Qt, QAbstractListModel, QSortFilterProxyModel, QModelIndex,
+                          pyqtSignal)
+
+FETCH_BATCH = 200       # rows exposed per fetchMore
+MIN_VISIBLE = 50        # rows fetched ahead when a filter hides most loaded rows
+
+_DONE_BRUSH = QBrush(QColor(Qt.GlobalColor.gray))
+
+
+class RecordListModel(QAbstractListModel):
+    """Lazily exposed list of records"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._records = []
+        self._loaded = 0
+        self._text = []
+        self._meta = []
+        self._text_fn = str
+        self._meta_fn = None
+        self._done_fn = None
+        self._on_check = None
+
+    def set_records(self, records, text_fn=str, meta_fn=None, done_fn=None, on_check=None):
+        """
+        Replace all rows
+
+        Args:
+            text_fn: record → display text
+            meta_fn: record → UserRole value (filter predicates receive it)
+            done_fn: record → bool; gray foreground when True
+            on_check: fn(record, checked) - makes rows checkable (check state = done_fn)
+        """
+        self.beginResetModel()
+        self._records = list(records)
+        self._loaded = min(FETCH_BATCH, len(self._records))
+        self._text = [None] * len(self._records)
+        self._meta = [None] * len(self._records)
+        self._text_fn, self._meta_fn = text_fn, meta_fn
+        self._done_fn, self._on_check = done_fn, on_check
+        self.endResetModel()
+
+    def clear(self):
+        self.set_records([])
+
+    def record(self, row):
+        return self._records[row]
+
+    def meta(self, row):
+        """UserRole value of row (cached)"""
+        if self._meta_fn is None:
+            return None
+        m = self._meta[row]
+        if m is None:
+            m = self._meta[row] = self._meta_fn(self._records[row])
+        return m
+
+    def find(self, record):
+        """Row of record (exposing rows up to it), or -1"""
+        for row, r in enumerate(self._records):
+            if r is record or r == record:
+                self.ensure_loaded(row)
+                return row
+        return -1
+
+    def ensure_loaded(self, row):
+        if row >= self._loaded:
+            self.beginInsertRows(QModelIndex(), self._loaded, row)
+            self._loaded = row + 1
+            self.endInsertRows()
+
+    # === QAbstractListModel ===
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._records)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        n = min(FETCH_BATCH, len(self._records) - self._loaded)
+        if n > 0:
+            self.ensure_loaded(self._loaded + n - 1)
+
+    def flags(self, index):
+        f = super().flags(index)
+        if self._on_check is not None:
+            f |= Qt.ItemFlag.ItemIsUserCheckable
+        return f
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            text = self._text[row]
+            if text is None:
+                text = self._text[row] = self._text_fn(self._records[row])
+            return text
+        if role == Qt.ItemDataRole.UserRole:
+            return self.meta(row)
+        if role == Qt.ItemDataRole.UserRole + 1:
+            return self._records[row]
+        if role == Qt.ItemDataRole.CheckStateRole and self._on_check is not None:
+            return Qt.CheckState.Checked if self._done_fn(self._records[row]) else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.ForegroundRole and self._done_fn is not None:
+            return _DONE_BRUSH if self._done_fn(self._records[row]) else None
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole or self._on_check is None:
+            return False
+        checked = Qt.CheckState(value) == Qt.CheckState.Checked
+        self._on_check(self._records[index.row()], checked)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole, Qt.ItemDataRole.ForegroundRole])
+        return True
+
+
+class RecordFilterProxy(QSortFilterProxyModel):
+    """Rows whose metadata passes every predicate"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._predicates = ()
+
+    def set_filter(self, *predicates):
+        """predicates: fn(meta) → bool; none = show all"""
+        self._predicates = tuple(p for p in predicates if p)
+        self.invalidateFilter()
+        self.fill()
+
+    def fill(self):
+        """Fetch source batches until enough rows pass the filter (or the source is exhausted)"""
+        source = self.sourceModel()
+        while self.rowCount() < MIN_VISIBLE and source.canFetchMore(QModelIndex()):
+            source.fetchMore(QModelIndex())
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._predicates:
+            return True
+        meta = self.sourceModel().meta(source_row)
+        return meta is not None and all(p(meta) for p in self._predicates)
+
+
+class RecordListView(QListView):
+    """QListView over RecordListModel + RecordFilterProxy with a QListWidget-style API"""
+
+    currentRowChanged = pyqtSignal(int)
+    itemDoubleClicked = pyqtSignal(QModelIndex)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.source = RecordListModel(self)
+        self.proxy = RecordFilterProxy(self)
+        self.proxy.setSourceModel(self.source)
+        self.setModel(self.proxy)
+        self.setUniformItemSizes(True)  # One sizeHint per list, not per row
+        self.selectionModel().currentRowChanged.connect(
+            lambda cur, _prev: self.currentRowChanged.emit(cur.row() if cur.isValid() else -1))
+        self.doubleClicked.connect(self.itemDoubleClicked.emit)
+
+    def set_records(self, records, **kwargs):
+        """See RecordListModel.set_records; the filter is reset"""
+        self.source.set_records(records, **kwargs)
+        self.proxy.set_filter()
+
+    def set_filter(self, *predicates):
+        self.proxy.set_filter(*predicates)
+
+    def select_record(self, record):
+        """Make record current; False if it is not in the list or filtered out"""
+        row = self.source.find(record)
+        index = self.proxy.mapFromSource(self.source.index(row)) if row >= 0 else QModelIndex()
+        if index.isValid():
+            self.setCurrentIndex(index)
+        return index.isValid()
+
+    # === QListWidget compatibility ===
+
+    def clear(self):
+        self.set_records([])
+
+    def count(self):
+        return self.proxy.rowCount()
+
+    def item(self, row):
+        """Index of visible row (answers .data(role)), or None"""
+        index = self.proxy.index(row, 0)
+        return index if index.isValid() else None
+
+    def currentItem(self):
+        index = self.currentIndex()
+        return index if index.isValid() else None
+
+    def currentRow(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def setCurrentRow(self, row):
+        if row >= self.count() - 1 and self.proxy.canFetchMore(QModelIndex()):
+            self.proxy.fetchMore(QModelIndex())  # Keyboard stepping past the loaded rows
+        index = self.proxy.index(row, 0)
+        if index.isValid():
+            self.setCurrentIndex(index)
+            self.scrollTo(index)
@@ -203,7 +203,7 @@ class CanvasApp(QMainWindow):
         self.launcher_overlay.setParent(self.main_window)
         self.launcher_overlay.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
         from gui.widgets import TodoItemDelegate, CourseItemDelegate
-        self.launcher_overlay.todoList.setItemDelegate(TodoItemDelegate(self.launcher_overlay.todoList, launcher_mode=True))
+        TodoItemDelegate.install(self.launcher_overlay.todoList, launcher_mode=True)
         self.launcher_overlay.courseList.setItemDelegate(CourseItemDelegate(self.launcher_overlay.courseList))
 
         # Add HUD corner decorations to centerPanel
@@ -341,6 +341,7 @@ class CanvasApp(QMainWindow):
     def _init_bindings(self):
         """Initialize all button bindings"""
         from gui._internal import utilQtInteract as qt_interact
+        from gui._internal.keyboard import debounced
         mw, sw, aw, cdw, adw = self.main_window, self.settings_overlay, self.automation_window, self.course_detail_window, self.auto_detail_window
 
         # Main window
@@ -355,8 +356,7 @@ class CanvasApp(QMainWindow):
         mw.openFolderBtn.clicked.connect(self.main_view.on_open_folder_clicked)
         mw.courseDetailBtn.clicked.connect(self.course_view.open)
         mw.categoryList.currentRowChanged.connect(self.main_view.on_category_changed)
-        mw.itemList.currentRowChanged.connect(self.main_view.on_item_changed)
-        mw.itemList.itemChanged.connect(self.main_view.on_checkbox_changed)
+        mw.itemList.currentRowChanged.connect(debounced(self.main_view.on_item_changed))
         mw.itemList.itemDoubleClicked.connect(self.main_view.on_item_double_clicked)
         for f in [mw.filterHomework, mw.filterQuiz, mw.filterDiscussion, mw.filterAutomatable]:
             f.stateChanged.connect(self.main_view.apply_filters)
@@ -385,8 +385,7 @@ class CanvasApp(QMainWindow):
             cat_list = getattr(aw, f'{prefix}CategoryList')
             item_list = getattr(aw, f'{prefix}ItemList')
             cat_list.currentRowChanged.connect(lambda idx, ti=tab_idx: self.auto_view.on_category_changed(idx, ti))
-            item_list.currentRowChanged.connect(lambda idx, ti=tab_idx: self.auto_view.on_item_changed(idx, ti))
-            item_list.itemChanged.connect(self.auto_view.on_checkbox_changed)
+            item_list.currentRowChanged.connect(debounced(lambda idx, ti=tab_idx: self.auto_view.on_item_changed(idx, ti)))
             item_list.itemDoubleClicked.connect(self.auto_view.on_item_double_clicked)
 
         # Course detail window
@@ -398,7 +397,7 @@ class CanvasApp(QMainWindow):
         cdw.learnMaterialBtn.clicked.connect(lambda: qt_interact.on_learn_material_clicked(self))
         cdw.itemList.itemDoubleClicked.connect(self.course_view.on_item_double_clicked)
         cdw.categoryList.currentRowChanged.connect(self.course_view.on_category_changed)
-        cdw.itemList.currentRowChanged.connect(self.course_view.on_item_changed)
+        cdw.itemList.currentRowChanged.connect(self.course_view.on_item_nav)
         cdw.itemList.dragEnterEvent = self.course_view.drag_enter
         cdw.itemList.dragMoveEvent = self.course_view.drag_move
         cdw.itemList.dropEvent = self.course_view.drag_drop
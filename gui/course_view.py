@@ -1,15 +1,18 @@
 """Course View - CourseDetail Window (merged from handlers/course_detail.py)"""
-import sys, os, json, threading, re, tempfile, shutil
-from PyQt6.QtWidgets import QListWidgetItem, QStyledItemDelegate, QMessageBox, QInputDialog
+import sys, os, json, threading, re, tempfile
+from PyQt6.QtWidgets import QStyledItemDelegate, QMessageBox, QInputDialog
 from PyQt6.QtCore import Qt
 from bs4 import BeautifulSoup
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import config
 from gui._internal.mgrCourseDetail import CourseDetailManager
+from gui._internal.keyboard import debounced
 from gui.widgets import FileItemDelegate
 from gui.learn import format_course, format_todo
 
+TOC_PAGES = 80  # Leading pages sent to the AI for TOC analysis (decon without bookmarks)
+
 
 class CourseView:
     """Handles CourseDetail window operations"""
@@ -17,6 +20,7 @@ class CourseView:
     def __init__(self, app):
         self.app = app
         self.cdw = app.course_detail_window
+        self.on_item_nav = debounced(self.on_item_changed)  # Held W/S renders only where it stops
 
     @property
     def mgr(self):
@@ -25,18 +29,18 @@ class CourseView:
     def open(self):
         """Open course detail from main window"""
         mw = self.app.main_window
-        ci, ii = mw.categoryList.currentRow(), mw.itemList.currentRow()
+        ci, item = mw.categoryList.currentRow(), mw.itemList.currentItem()
 
         if ci != 0:
             return QMessageBox.warning(self.app, "Invalid", "Please select a Course first.")
-        if ii < 0:
+        if item is None:
             return QMessageBox.warning(self.app, "No Selection", "Please select a course first.")
 
-        courses = self.app.dm.get('courses')
-        if ii >= len(courses):
+        course = item.data(Qt.ItemDataRole.UserRole + 1)
+        if not course:
             return QMessageBox.warning(self.app, "Error", "Invalid course selection.")
 
-        self.app.course_detail_mgr = CourseDetailManager(courses[ii], self.app.dm.get('todos'), self.app.dm.get('history_todos'))
+        self.app.course_detail_mgr = CourseDetailManager(course, self.app.dm.get('todos'), self.app.dm.get('history_todos'))
         self.populate_window()
         self.app.stacked_widget.setCurrentWidget(self.cdw)
 
@@ -58,7 +62,7 @@ class CourseView:
         categories = self.mgr.get_categories()
         self.cdw.categoryList.addItems(categories)
         self.cdw.categoryList.currentRowChanged.connect(self.on_category_changed)
-        self.cdw.itemList.currentRowChanged.connect(self.on_item_changed)
+        self.cdw.itemList.currentRowChanged.connect(self.on_item_nav)
 
         self._prefetch_all_tabs()
 
@@ -90,14 +94,9 @@ class CourseView:
             self._hide_learn_widget()
 
         # Populate items
-        items = self.mgr.get_items_for_category(category)
-        for item_data in items:
-            item = QListWidgetItem(item_data['name'])
-            item.setData(Qt.ItemDataRole.UserRole, item_data.get('has_file', False))
-            item.setData(Qt.ItemDataRole.UserRole + 1, item_data)
-            if item_data.get('is_done', False):
-                item.setForeground(Qt.GlobalColor.gray)
-            self.cdw.itemList.addItem(item)
+        self.cdw.itemList.set_records(self.mgr.get_items_for_category(category), text_fn=lambda d: d['name'],
+                                      meta_fn=lambda d: d.get('has_file', False),
+                                      done_fn=lambda d: d.get('is_done', False))
 
         # Delegate
         delegate = FileItemDelegate(self.cdw.itemList) if category in ['Syllabus', 'Textbook', 'Learn'] else QStyledItemDelegate()
@@ -138,7 +137,8 @@ class CourseView:
         if index < 0 or not self.mgr:
             return
 
-        item_data = self.cdw.itemList.item(index).data(Qt.ItemDataRole.UserRole + 1)
+        item = self.cdw.itemList.item(index)
+        item_data = item.data(Qt.ItemDataRole.UserRole + 1) if item else None
         if not item_data:
             return
 
@@ -209,25 +209,44 @@ class CourseView:
         if not ok or not selected_file:
             return
 
-        reply = QMessageBox.question(
-            self.cdw, "Decon Textbook",
-            f"This will:\n1. Analyze chapter structure using Gemini AI\n2. Split PDF into individual chapter files\n3. Save to: {textbook_dir}/decon/\n\nContinue?",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-        )
-        if reply != QMessageBox.StandardButton.Yes:
+        box = QMessageBox(QMessageBox.Icon.Question, "Decon Textbook",
+            f"This will:\n1. Analyze chapter structure using Gemini AI\n2. Split PDF into individual chapter files\n3. Save to: {textbook_dir}/decon/\n\n"
+            f"A previous decon of the same PDF is reused automatically.\nContinue?", parent=self.cdw)
+        btn_run = box.addButton("Continue", QMessageBox.ButtonRole.AcceptRole)
+        btn_rebuild = box.addButton("Force Rebuild", QMessageBox.ButtonRole.DestructiveRole)
+        box.addButton(QMessageBox.StandardButton.Cancel)
+        box.exec()
+        if box.clickedButton() not in (btn_run, btn_rebuild):
             return
 
         file_path = os.path.join(textbook_dir, selected_file)
-        self._run_decon_task(file_path, selected_file, textbook_dir)
+        self._run_decon_task(file_path, selected_file, textbook_dir, force=box.clickedButton() is btn_rebuild)
+
+    def _run_decon_task(self, file_path, selected_file, textbook_dir, force=False):
+        """Run decon task with Mission Control
 
-    def _run_decon_task(self, file_path, selected_file, textbook_dir):
-        """Run decon task with Mission Control"""
+        Results are cached by PDF content hash (func/mgrDeconCache); force=True rebuilds.
+        """
         def run_decon(progress):
             try:
+                from func import mgrDeconCache
+
+                decon_dir = os.path.join(textbook_dir, 'decon')
+                progress.update(progress=5, status="Checking decon cache...")
+                if force:
+                    mgrDeconCache.invalidate(file_path)
+                else:
+                    cached = mgrDeconCache.lookup(file_path)
+                    if cached:
+                        created_files = mgrDeconCache.materialize(cached, decon_dir, selected_file)
+                        print(f"[DECON] Cache hit: {cached['dir']}")
+                        progress.finish(f"Done (cached): {len(created_files)} chapters")
+                        return
+
                 progress.update(progress=14, status="Step 1/7: Selecting model...")
 
                 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'func'))
-                from ai import upload_files, call_ai, get_best_gemini_model
+                from func.ai import get_best_gemini_model
                 from utilPdfSplitter import split_pdf_by_chapters
                 from utilPdfBookmark import extract_chapters_from_bookmarks, format_bookmark_chapters, repair_pdf_references
                 from PyPDF2 import PdfReader, PdfWriter
@@ -235,7 +254,17 @@ class CourseView:
 
                 pref_product, pref_model = get_product(), get_pref_model()
 
-                if pref_product == 'Auto' or pref_model == 'Auto':
+                from func.mgrModelSelect import AUTO_FAST, select_model, material_tokens
+                product = 'Fake' if pref_product == 'Fake' else 'Gemini'  # Decon needs vision: Gemini, or offline fake
+                choice = None
+                if product != 'Fake' and pref_model == AUTO_FAST:
+                    choice = select_model(['Gemini'], material_tokens(file_path, max_pages=TOC_PAGES))  # Only the TOC pages are sent
+                if product == 'Fake':
+                    from func.ai import FAKE_MODEL
+                    model_name = FAKE_MODEL
+                elif choice:
+                    model_name = choice[1]
+                elif pref_product == 'Auto' or pref_model in ('Auto', AUTO_FAST):
                     model_name = get_best_gemini_model()
                 elif pref_product == 'Gemini':
                     model_name = pref_model
@@ -264,7 +293,8 @@ class CourseView:
                     ]
                 else:
                     pdf_to_split = file_path
-                    all_chapters = self._analyze_toc_with_ai(file_path, reader, total_pages, model_name, progress)
+                    all_chapters = self._analyze_toc_with_ai(file_path, reader, total_pages, model_name, progress,
+                                                             product)
 
                 progress.update(progress=85, status="Step 6/7: Validating...")
                 for i in range(len(all_chapters) - 1):
@@ -272,7 +302,6 @@ class CourseView:
                         all_chapters[i]['end_page'] = all_chapters[i + 1]['start_page'] - 1
 
                 progress.update(progress=95, status=f"Step 7/7: Splitting {len(all_chapters)} PDFs...")
-                decon_dir = os.path.join(textbook_dir, 'decon')
                 os.makedirs(decon_dir, exist_ok=True)
 
                 metadata_file = os.path.join(decon_dir, f"{os.path.splitext(selected_file)[0]}_chapters.json")
@@ -280,6 +309,8 @@ class CourseView:
                     json.dump(all_chapters, f, indent=2, ensure_ascii=False)
 
                 created_files = split_pdf_by_chapters(pdf_to_split, all_chapters, decon_dir)
+                if created_files:
+                    mgrDeconCache.store(file_path, all_chapters, created_files)
                 progress.finish(f"Done: {len(created_files)} chapters")
 
                 if repaired_pdf_path and repaired_pdf_path != file_path and os.path.exists(repaired_pdf_path):
@@ -296,29 +327,45 @@ class CourseView:
 
         self.app.mission_control.start_task(f"Decon: {selected_file}", run_decon)
 
-    def _analyze_toc_with_ai(self, file_path, reader, total_pages, model_name, progress):
+    def _analyze_toc_with_ai(self, file_path, reader, total_pages, model_name, progress, product='Gemini'):
         """Analyze TOC with AI (fallback when no bookmarks)"""
-        from func.ai import upload_files, call_ai
+        from func.ai import call_ai, response_cache_key, cached_response, upload_files
+        from func.mgrUploads import get_upload_manager
+        from func.utilHash import sha256_file
+        from gui.learn import get_use_response_cache
         from PyPDF2 import PdfWriter
 
-        TOC_PAGES = min(80, total_pages)
-        writer = PdfWriter()
-        for i in range(TOC_PAGES):
-            writer.add_page(reader.pages[i])
-
-        temp_toc_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='_toc.pdf')
-        writer.write(temp_toc_pdf)
-        temp_toc_pdf.close()
-
-        progress.update(progress=42, status="Step 3/7: Analyzing TOC...")
-        uploaded_info = upload_files([temp_toc_pdf.name], 'Gemini')
+        toc_pages = min(TOC_PAGES, total_pages)
+        uploads = get_upload_manager()
+        toc_key = f"{sha256_file(file_path)}:toc{toc_pages}"  # Key by source, the extracted PDF is not byte-stable
 
         toc_prompt = """Analyze this textbook PDF and extract the Table of Contents.
 Return ONLY a valid JSON object with chapters and delta (page offset).
 {"delta": -16, "chapters": [{"chapter": 1, "name": "Introduction", "book_page": 1}]}"""
 
-        result = call_ai(toc_prompt, 'Gemini', model_name, uploaded_info=uploaded_info)
-        os.unlink(temp_toc_pdf.name)
+        progress.update(progress=42, status="Step 3/7: Analyzing TOC...")
+        use_cache = get_use_response_cache()
+        result = None
+        if use_cache:  # Same book + prompt + model → reuse the TOC answer, no upload or AI call
+            result = cached_response(response_cache_key(toc_prompt, product, model_name, [toc_key]),
+                                     lambda msg: progress.update(status=f"Step 3/7: {msg}"))
+
+        uploaded_info = None if result is not None else uploads.lookup(product, toc_key)
+        if result is None and not uploaded_info:
+            writer = PdfWriter()
+            for i in range(toc_pages):
+                writer.add_page(reader.pages[i])
+
+            temp_toc_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='_toc.pdf')
+            writer.write(temp_toc_pdf)
+            temp_toc_pdf.close()
+            try:
+                uploaded_info = upload_files([temp_toc_pdf.name], product, keys=[toc_key])
+            finally:
+                os.unlink(temp_toc_pdf.name)
+
+        if result is None:
+            result = call_ai(toc_prompt, product, model_name, uploaded_info=uploaded_info, cache=use_cache)
 
         progress.update(progress=57, status="Step 4/7: Parsing TOC...")
         result_clean = result.strip()
@@ -326,7 +373,13 @@ Return ONLY a valid JSON object with chapters and delta (page offset).
             lines = result_clean.split('\n')
             result_clean = '\n'.join(lines[1:-1]) if len(lines) > 2 else result_clean
 
-        toc_data = json.loads(result_clean)
+        try:
+            toc_data = json.loads(result_clean)
+        except json.JSONDecodeError:
+            if use_cache:  # Never replay an unparseable answer
+                from func.mgrResponseCache import get_response_cache
+                get_response_cache().forget(response_cache_key(toc_prompt, product, model_name, [toc_key]))
+            raise
         delta = toc_data.get('delta', 0)
         toc_chapters = toc_data.get('chapters', [])
 
@@ -370,11 +423,12 @@ Return ONLY a valid JSON object with chapters and delta (page offset).
         if event.mimeData().hasUrls():
             target_dir = self.mgr.get_textbook_dir() if category.text() == 'Textbook' else self.mgr.get_learn_dir()
 
+            from func.utilWorkspace import link_file
             for url in event.mimeData().urls():
                 file_path = url.toLocalFile()
                 if os.path.isfile(file_path):
                     try:
-                        shutil.copy2(file_path, os.path.join(target_dir, os.path.basename(file_path)))
+                        link_file(file_path, os.path.join(target_dir, os.path.basename(file_path)), hardlink=False)
                     except Exception as e:
                         print(f"[DRAG-DROP] Error: {e}")
 
@@ -417,8 +471,8 @@ Return ONLY a valid JSON object with chapters and delta (page offset).
 
         if os.path.exists(md_path):
             try:
-                with open(md_path, 'r', encoding='utf-8') as f:
-                    self.app.signals.tab_content_update.emit(f"MARKDOWN:{f.read()}")
+                from gui._internal.mgrHtmlCache import get_html_cache
+                self.cdw.detailView.setHtml(get_html_cache().render_file('course_tab', md_path, self._tab_markdown_to_html))
             except Exception as e:
                 self.cdw.detailView.setHtml(f"<h2 style='color: #ef4444;'>Error</h2><p>{e}</p>")
         else:
@@ -466,13 +520,20 @@ Return ONLY a valid JSON object with chapters and delta (page offset).
     def update_html(self, html):
         """Update detail view with HTML or markdown"""
         if html.startswith("MARKDOWN:"):
-            import markdown as md_lib
-            md_content = html[9:]
-            lines = md_content.split('\n', 1)
-            title = lines[0].strip('# ')
-            body = lines[1] if len(lines) > 1 else ''
-            html_body = md_lib.markdown(body, extensions=['extra', 'nl2br', 'tables'])
-            styled = f"""<style>
+            from gui._internal.mgrHtmlCache import get_html_cache
+            self.cdw.detailView.setHtml(get_html_cache().render_text('course_tab', html[9:], self._tab_markdown_to_html))
+        else:
+            self.cdw.detailView.setHtml(html)
+
+    @staticmethod
+    def _tab_markdown_to_html(md_content):
+        """Styled HTML of a saved tab ('# title' line, then the page markdown)"""
+        import markdown as md_lib
+        lines = md_content.split('\n', 1)
+        title = lines[0].strip('# ')
+        body = lines[1] if len(lines) > 1 else ''
+        html_body = md_lib.markdown(body, extensions=['extra', 'nl2br', 'tables'])
+        return f"""<style>
 body{{font-family:-apple-system,sans-serif;line-height:1.6;color:#e0e0e0}}
 h1{{color:#3b82f6;border-bottom:2px solid #3b82f6;padding-bottom:8px}}
 h2{{color:#60a5fa;margin-top:24px}}
@@ -482,9 +543,6 @@ th{{background:#2563eb;color:white;padding:12px 16px;text-align:left}}
 td{{padding:10px 16px;border-bottom:1px solid #333}}
 code{{background:#2a2a2a;padding:2px 6px;border-radius:4px;color:#22c55e}}
 </style><h1>{title}</h1>{html_body}"""
-            self.cdw.detailView.setHtml(styled)
-        else:
-            self.cdw.detailView.setHtml(html)
 
     def refresh_category(self):
         """Refresh current category"""
@@ -1,5 +1,5 @@
 """Detail View - AutoDetail Window Handler (merged from handlers/auto_detail.py + details/mgrAutoDetail.py)"""
-import sys, os, json, threading, re, base64
+import sys, os, json, threading, re
 from datetime import datetime
 from PyQt6.QtWidgets import QMessageBox
 from PyQt6.QtCore import QTimer
@@ -551,35 +551,41 @@ class DetailView:
                 fp = os.path.join(output_dir, fn)
                 if os.path.exists(fp):
                     try:
-                        return self._markdown_to_html(open(fp, encoding='utf-8').read(), fn, output_dir)
+                        return self._render_file(fp, output_dir)
                     except Exception:
                         pass
         elif self.mgr.is_homework:
             fp = os.path.join(output_dir, 'answer.md')
             if os.path.exists(fp):
-                return self._markdown_to_html(open(fp, encoding='utf-8').read(), 'answer.md', output_dir)
+                return self._render_file(fp, output_dir)
 
         return None
 
+    def _render_file(self, path, base_dir):
+        """_markdown_to_html of a preview file, via the rendered-HTML cache (keyed by mtime + images/)"""
+        from gui._internal.mgrHtmlCache import get_html_cache, theme_key
+        images_dir = os.path.join(base_dir, 'images') if self.mgr.is_quiz else None
+        return get_html_cache().render_file(
+            f"detail_view:{'quiz' if self.mgr.is_quiz else 'page'}", path,
+            lambda text: self._markdown_to_html(text, os.path.basename(path), base_dir),
+            theme=theme_key(C), deps=[images_dir] if images_dir else ())
+
     def _markdown_to_html(self, content, filename, base_dir=None):
         """Convert markdown to styled HTML"""
         import markdown as md_lib
         html = md_lib.markdown(content, extensions=['extra', 'nl2br', 'tables'])
 
-        # Embed images for quiz
+        # Quiz images: thumbnails served by ThumbnailTextBrowser (no data URIs)
         if base_dir and self.mgr.is_quiz:
             images_dir = os.path.join(base_dir, 'images')
             if os.path.exists(images_dir):
+                from gui._internal.mgrThumbnails import image_tag
                 def replace_img(match):
                     fn = match.group(1)
                     img_path = os.path.join(images_dir, fn)
                     if os.path.exists(img_path):
                         try:
-                            with open(img_path, 'rb') as f:
-                                data = base64.b64encode(f.read()).decode()
-                            ext = fn.split('.')[-1].lower()
-                            mime = {'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'gif': 'image/gif', 'webp': 'image/webp'}.get(ext, 'image/png')
-                            return f'<img src="data:{mime};base64,{data}" style="max-width:280px;border:1px solid {C["border"]};border-radius:8px;margin:8px 0;"/>'
+                            return image_tag(img_path, f'border:1px solid {C["border"]};border-radius:8px;margin:8px 0;')
                         except Exception:
                             pass
                     return match.group(0)
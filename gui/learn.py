@@ -3,12 +3,11 @@ import os
 import sys
 import re
 import json
-import shutil
 import threading
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
                               QListWidget, QPushButton, QLabel, QComboBox,
                               QTextEdit, QGroupBox, QListWidgetItem, QMessageBox,
-                              QAbstractItemView, QFrame, QSizePolicy)
+                              QAbstractItemView, QFrame, QSizePolicy, QCheckBox)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject
 from PyQt6.QtGui import QFont
 
@@ -25,7 +24,8 @@ DEFAULT_PREFERENCES = {
     'model': 'Auto',
     'prompts': {'text': None, 'pdf': None, 'csv': None},
     'available_products': ['Auto', 'Gemini', 'Claude'],
-    'available_models': None
+    'available_models': None,
+    'response_cache': False  # Reuse responses of identical AI requests (func/mgrResponseCache)
 }
 
 
@@ -90,20 +90,38 @@ def set_prompt(prompt_type, prompt_text):
     save_preferences(prefs)
 
 
+def get_use_response_cache():
+    return bool(load_preferences().get('response_cache', False))
+
+
+def set_use_response_cache(enabled):
+    prefs = load_preferences()
+    prefs['response_cache'] = bool(enabled)
+    save_preferences(prefs)
+
+
 def get_available_products():
-    return load_preferences().get('available_products', DEFAULT_PREFERENCES['available_products'])
+    products = load_preferences().get('available_products', DEFAULT_PREFERENCES['available_products'])
+    if os.environ.get('FAKE_AI') is not None and 'Fake' not in products:
+        products = products + ['Fake']  # Offline provider for load tests (func/ai._FakeProvider)
+    return products
+
+
+def _registry_models():
+    """Model lists from the cached registry (no network)"""
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    from func.mgrModels import get_model_registry
+    from func.mgrModelSelect import AUTO_FAST
+    return {'Auto': ['Auto', AUTO_FAST], **{p: ['Auto', AUTO_FAST] + m for p, m in get_model_registry().all().items()}}
 
 
 def refresh_available_models():
     """Refresh model lists from APIs"""
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-    from func.ai import get_gemini_models, get_claude_models
+    from func.mgrModels import get_model_registry
 
-    available_models = {
-        'Auto': ['Auto'],
-        'Gemini': ['Auto'] + get_gemini_models(),
-        'Claude': ['Auto'] + get_claude_models()
-    }
+    get_model_registry().refresh(wait=True)
+    available_models = _registry_models()
 
     prefs = load_preferences()
     prefs['available_models'] = available_models
@@ -112,22 +130,22 @@ def refresh_available_models():
 
 
 def get_available_models(product=None, use_cache=True):
+    """Models for product: registry list + models added by hand (network only if use_cache=False)"""
     if product is None:
         product = get_product()
 
-    prefs = load_preferences()
-    available = prefs.get('available_models')
-
-    if available is None or not use_cache:
-        available = refresh_available_models()
+    if not use_cache:
+        refresh_available_models()
 
-    return available.get(product, ['Auto'])
+    models = _registry_models().get(product, ['Auto'])
+    saved = load_preferences().get('available_models') or {}
+    return models + [m for m in saved.get(product, []) if m not in models]
 
 
 def add_model_to_product(product, model_name):
     prefs = load_preferences()
     if 'available_models' not in prefs or prefs['available_models'] is None:
-        prefs['available_models'] = refresh_available_models()
+        prefs['available_models'] = _registry_models()
 
     if product not in prefs['available_models']:
         prefs['available_models'][product] = ['Auto']
@@ -143,12 +161,19 @@ def reset_to_defaults():
 
 
 def get_resolved_product_model():
-    """Resolve 'Auto' to actual product and model"""
+    """Resolve 'Auto' to actual product and model ('Auto (fast)': choice for a typical 20k-token file)"""
     product = get_product()
     model = get_model()
 
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
     from func.ai import get_best_gemini_model, get_best_claude_model
+    from func.mgrModelSelect import AUTO_FAST, select_model, configured_products
+
+    if model == AUTO_FAST:
+        choice = select_model(configured_products('Gemini') if product == 'Auto' else [product], 20000)
+        if choice:
+            return choice
+        model = 'Auto'
 
     if product == 'Auto':
         product = 'Gemini'
@@ -270,14 +295,15 @@ class DropListWidget(QListWidget):
                     print(f"[ERROR] Failed to create target dir: {e}")
                     return
 
+            from func.utilWorkspace import link_file
             for url in event.mimeData().urls():
                 file_path = url.toLocalFile()
                 if os.path.isfile(file_path):
                     filename = os.path.basename(file_path)
                     dest_path = os.path.join(target_dir, filename)
                     try:
-                        shutil.copy2(file_path, dest_path)
-                        print(f"[DRAG-DROP] Copied: {filename} → {target_dir}")
+                        method = link_file(file_path, dest_path, hardlink=False)
+                        print(f"[DRAG-DROP] Placed ({method}): {filename} → {target_dir}")
                     except Exception as e:
                         print(f"[DRAG-DROP] Error copying {filename}: {e}")
             event.acceptProposedAction()
@@ -542,8 +568,33 @@ class LearnSittingWidget(QWidget):
         prompt_layout.addLayout(prompt_btn_layout)
         layout.addWidget(prompt_group)
 
+        cache_group = QGroupBox("AI Response Cache")
+        cache_layout = QHBoxLayout(cache_group)
+        self.response_cache_check = QCheckBox("Reuse responses of identical requests (same file, prompt, model)")
+        self.response_cache_check.setChecked(get_use_response_cache())
+        self.response_cache_check.toggled.connect(set_use_response_cache)
+        btn_clear_cache = QPushButton("🗑 Clear")
+        btn_clear_cache.clicked.connect(self.on_clear_response_cache)
+        self.response_cache_label = QLabel()
+        cache_layout.addWidget(self.response_cache_check)
+        cache_layout.addStretch()
+        cache_layout.addWidget(self.response_cache_label)
+        cache_layout.addWidget(btn_clear_cache)
+        layout.addWidget(cache_group)
+        self.update_response_cache_label()
+
         return tab
 
+    def update_response_cache_label(self):
+        from func.mgrResponseCache import get_response_cache
+        stats = get_response_cache().stats()
+        self.response_cache_label.setText(f"{stats['entries']} responses, {stats['bytes'] / 1024 / 1024:.1f} MB")
+
+    def on_clear_response_cache(self):
+        from func.mgrResponseCache import get_response_cache
+        get_response_cache().clear()
+        self.update_response_cache_label()
+
     def load_data(self):
         """Initial data load"""
         product = self.prefs.get('product', 'Auto')
@@ -721,51 +772,45 @@ class LearnSittingWidget(QWidget):
             QMessageBox.warning(self, "No Files", "Learn directory is empty.")
             return
 
+        # Staleness (source/prompt/model changed) is decided per file by the report manifest
         files = []
         for item in os.listdir(learn_dir):
             item_path = os.path.join(learn_dir, item)
             if os.path.isfile(item_path):
-                base_name = os.path.splitext(item)[0]
-                report_path = os.path.join(reports_dir, f"{base_name}.md")
-                if not os.path.exists(report_path):
-                    files.append((item, item_path))
+                files.append((item, item_path))
 
         if not files:
-            QMessageBox.information(self, "All Done", "All files already have learning reports!")
+            QMessageBox.information(self, "No Files", "No learning materials found.")
             return
 
-        reply = QMessageBox.question(self, "Batch Generate", f"Generate reports for {len(files)} files?",
-                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-        if reply != QMessageBox.StandardButton.Yes:
+        missing = sum(1 for item, _ in files
+                      if not os.path.exists(os.path.join(reports_dir, f"{os.path.splitext(item)[0]}.md")))
+        box = QMessageBox(QMessageBox.Icon.Question, "Batch Generate",
+                          f"Check {len(files)} files ({missing} without report) and generate missing or stale reports?\n\n"
+                          f"Overnight uses the provider Batch API: cheaper, results within 24 h.", parent=self)
+        btn_now = box.addButton("Generate Now", QMessageBox.ButtonRole.AcceptRole)
+        btn_overnight = box.addButton("Overnight (Batch API)", QMessageBox.ButtonRole.AcceptRole)
+        box.addButton(QMessageBox.StandardButton.Cancel)
+        box.exec()
+        if box.clickedButton() not in (btn_now, btn_overnight):
             return
+        overnight = box.clickedButton() is btn_overnight
 
         course_dir = self.course_detail_mgr.course_dir
         reload_callback = self.reload_files_async
 
         def run_batch(progress):
-            sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'func'))
-            from procLearnMaterial import learn_material
+            if overnight:
+                from func.procLearnBatchApi import run_learn_batch_api as run_learn_batch
+            else:
+                from func.procLearnBatch import run_learn_batch
 
             progress.update(progress=0, status=f"Processing {len(files)} files...")
-            print(f"🚀 Batch Learn: {len(files)} files")
-            success_count = 0
-            failed_files = []
-
-            for i, (filename, file_path) in enumerate(files, 1):
-                pct = int((i - 1) / len(files) * 95)
-                progress.update(progress=pct, status=f"[{i}/{len(files)}] {filename}")
-                print(f"[{i}/{len(files)}] Processing: {filename}")
-                try:
-                    if learn_material(file_path, course_dir, None, use_preferences=True):
-                        success_count += 1
-                    else:
-                        failed_files.append(filename)
-                except Exception as e:
-                    failed_files.append(filename)
-                    print(f"Error: {e}")
+            print(f"🚀 Batch Learn{' (Batch API)' if overnight else ''}: {len(files)} files")
 
-            progress.finish(f"Done: {success_count}/{len(files)} success")
-            print(f"✓ Batch Learn complete: {success_count}/{len(files)} success")
+            result = run_learn_batch([p for _, p in files], course_dir, progress, use_preferences=True)
+            print(f"✓ Batch Learn complete: {len(result['success'])} generated, {len(result['cached'])} cached, "
+                  f"{len(result['failed'])} failed")
 
             QTimer.singleShot(0, reload_callback)
 
@@ -773,7 +818,8 @@ class LearnSittingWidget(QWidget):
             from gui.widgets import show_toast
             show_toast(self.canvas_app, "Batch Learn Complete!", 'success', 3000)
 
-        self.canvas_app.mission_control.start_task("Batch Learn", run_batch, on_success=on_success)
+        self.canvas_app.mission_control.start_task("Batch Learn (overnight)" if overnight else "Batch Learn",
+                                                   run_batch, on_success=on_success)
 
     def on_prompt_type_changed(self, index):
         prompt_types = ['text', 'pdf', 'csv']
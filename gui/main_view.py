@@ -92,35 +92,33 @@ class MainView:
     def on_category_changed(self, index):
         """Category switch: 0=Courses, 1=TODOs, 2=Files"""
         il = self.mw.itemList
-        il.clear()
         self.mw.courseDetailBtn.setVisible(index == 0)
         self.mw.filterWidget.setVisible(index == 1)  # Show filters only for TODOs
 
         if index == 0:  # Courses
-            for c in self.app.dm.get('courses'):
-                il.addItem(c.get('name', 'Unknown'))
+            il.set_records(self.app.dm.get('courses'), text_fn=lambda c: c.get('name', 'Unknown'))
             il.setItemDelegate(QStyledItemDelegate())
 
         elif index == 1:  # TODOs
-            todos = self._get_todos()
-            for todo in todos:
-                item = QListWidgetItem(f"{todo.get('course_name', '')} - {todo.get('name', '')}")
-                item.setData(Qt.ItemDataRole.UserRole, self.app.dm.classify_todo(todo))
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-
-                redirect_url = todo.get('redirect_url', '')
-                is_done = self.app.done_mgr.is_done(redirect_url)
-                item.setCheckState(Qt.CheckState.Checked if is_done else Qt.CheckState.Unchecked)
-                item.setForeground(Qt.GlobalColor.gray if is_done else Qt.GlobalColor.white)
-                item.setData(Qt.ItemDataRole.UserRole + 1, todo)
-                il.addItem(item)
-
-            il.setItemDelegate(TodoItemDelegate(il, history_mode=self.app.history_mode))
+            il.set_records(self._get_todos(), text_fn=self._todo_text, meta_fn=self.app.dm.classify_todo,
+                           done_fn=self._is_done, on_check=self.on_checkbox_changed)
+            TodoItemDelegate.install(il, history_mode=self.app.history_mode)
+            self.apply_filters()
 
         elif index == 2:  # Files
-            il.addItems(self.app.dm.get('files'))
+            il.set_records(self.app.dm.get('files'))
             il.setItemDelegate(QStyledItemDelegate())
 
+        else:
+            il.clear()
+
+    @staticmethod
+    def _todo_text(todo):
+        return f"{todo.get('course_name', '')} - {todo.get('name', '')}"
+
+    def _is_done(self, todo):
+        return self.app.done_mgr.is_done(todo.get('redirect_url', ''))
+
     def _get_todos(self):
         """Get todos (history or current)"""
         if self.app.history_mode:
@@ -133,74 +131,55 @@ class MainView:
         return self.app.dm.get('todos')
 
     def apply_filters(self):
-        """Apply filters to TODO list"""
+        """Apply filters to TODO list (checked types are OR-ed; none checked = all)"""
         if self.mw.categoryList.currentRow() != 1:
             return
 
-        il = self.mw.itemList
-        filters = [
-            self.mw.filterHomework.isChecked(),
-            self.mw.filterQuiz.isChecked(),
-            self.mw.filterDiscussion.isChecked(),
-            self.mw.filterAutomatable.isChecked()
-        ]
-        show_all = not any(filters)
-
-        for i in range(il.count()):
-            item = il.item(i)
-            meta = item.data(Qt.ItemDataRole.UserRole)
-            if meta:
-                matches = [meta.get('is_homework'), meta.get('is_quiz'),
-                          meta.get('is_discussion'), meta.get('is_automatable')]
-                item.setHidden(not (show_all or any(f and v for f, v in zip(filters, matches))))
+        boxes = [(self.mw.filterHomework, 'is_homework'), (self.mw.filterQuiz, 'is_quiz'),
+                 (self.mw.filterDiscussion, 'is_discussion'), (self.mw.filterAutomatable, 'is_automatable')]
+        keys = [key for box, key in boxes if box.isChecked()]
+        self.mw.itemList.set_filter((lambda m: any(m.get(k) for k in keys)) if keys else None)
+
+    def _current_record(self):
+        """Record of the selected dashboard row, or None"""
+        index = self.mw.itemList.currentItem()
+        return index.data(Qt.ItemDataRole.UserRole + 1) if index else None
 
     def on_item_changed(self, index):
         """Item selection -> update detailView"""
-        if index < 0:
-            return
-
         ci = self.mw.categoryList.currentRow()
-        if ci == 1 and self.app.history_mode:
-            data = self._get_todos()
-        else:
-            data = self.app.dm.get(['courses', 'todos', 'files'][ci])
-
-        if index < len(data):
-            fmt = [format_course, format_todo, format_folder][ci]
-            self.mw.detailView.setHtml(fmt(data[index]))
+        item = self.mw.itemList.item(index) if index >= 0 else None
+        if item is None or not 0 <= ci <= 2:
+            return
+        fmt = [format_course, format_todo, format_folder][ci]
+        self.mw.detailView.setHtml(fmt(item.data(Qt.ItemDataRole.UserRole + 1)))
 
-    def on_checkbox_changed(self, item):
+    def on_checkbox_changed(self, todo, checked):
         """Checkbox toggle -> update Done.txt"""
-        todo = item.data(Qt.ItemDataRole.UserRole + 1)
         if not todo or not todo.get('redirect_url'):
             return
-
-        is_checked = item.checkState() == Qt.CheckState.Checked
-        if is_checked:
+        if checked:
             self.app.done_mgr.mark_done(todo['redirect_url'])
         else:
             self.app.done_mgr.mark_undone(todo['redirect_url'])
-        item.setForeground(Qt.GlobalColor.gray if is_checked else Qt.GlobalColor.white)
 
     def on_item_double_clicked(self, item):
         """Double-click: open CourseDetail or AutoDetail"""
         ci = self.mw.categoryList.currentRow()
-        ii = self.mw.itemList.currentRow()
+        record = item.data(Qt.ItemDataRole.UserRole + 1) if item else None
+        if not record:
+            return
 
-        if ci == 0 and ii >= 0:  # Courses
-            courses = self.app.dm.get('courses')
-            if ii < len(courses):
-                self.app.course_detail_mgr = CourseDetailManager(
-                    courses[ii], self.app.dm.get('todos'), self.app.dm.get('history_todos'))
-                self.app.course_view.populate_window()
-                self.app.stacked_widget.setCurrentWidget(self.app.course_detail_window)
+        if ci == 0:  # Courses
+            self.app.course_detail_mgr = CourseDetailManager(
+                record, self.app.dm.get('todos'), self.app.dm.get('history_todos'))
+            self.app.course_view.populate_window()
+            self.app.stacked_widget.setCurrentWidget(self.app.course_detail_window)
 
         elif ci == 1:  # TODOs
-            todo = item.data(Qt.ItemDataRole.UserRole + 1)
-            if todo:
-                self.app.auto_detail_mgr = AutoDetailManager(todo)
-                self.app.detail_view.populate_window()
-                self.app.stacked_widget.setCurrentWidget(self.app.auto_detail_window)
+            self.app.auto_detail_mgr = AutoDetailManager(record)
+            self.app.detail_view.populate_window()
+            self.app.stacked_widget.setCurrentWidget(self.app.auto_detail_window)
 
     def on_history_toggle(self, state):
         """Toggle history mode"""
@@ -211,20 +190,16 @@ class MainView:
     def on_open_folder_clicked(self):
         """Open folder for selected item"""
         ci = self.mw.categoryList.currentRow()
-        ii = self.mw.itemList.currentRow()
-        if ci < 0 or ii < 0:
+        record = self._current_record()
+        if not record:
             return
 
         path = None
         if ci == 1:  # TODO
-            todos = self.app.dm.get('todos')
-            if ii < len(todos):
-                folder = todos[ii].get('assignment_details', {}).get('folder')
-                path = os.path.join(config.TODO_DIR, folder) if folder else None
+            folder = record.get('assignment_details', {}).get('folder')
+            path = os.path.join(config.TODO_DIR, folder) if folder else None
         elif ci == 2:  # Files
-            files = self.app.dm.get('files')
-            if ii < len(files):
-                path = os.path.join(config.TODO_DIR, files[ii])
+            path = os.path.join(config.TODO_DIR, record)
 
         if path and os.path.exists(path):
             self.app.open_folder(path)
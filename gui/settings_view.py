@@ -27,6 +27,7 @@ class SettingsView:
 
         # Setup preferences UI (call after UI is loaded)
         QTimer.singleShot(100, self._setup_preferences_ui)
+        QTimer.singleShot(100, self._setup_usage_ui)
 
     def show(self):
         """Show settings overlay"""
@@ -35,6 +36,7 @@ class SettingsView:
         self.sw.show()
         self.sw.raise_()
         self.refresh_tasks_table()
+        self.refresh_usage()
 
     def hide(self):
         """Hide settings overlay"""
@@ -326,6 +328,103 @@ class SettingsView:
         # Add stretch at the end
         pref_layout.addStretch()
 
+    # === AI USAGE ===
+    USAGE_PERIODS = [('Last 7 days', 7), ('Last 30 days', 30), ('Last 90 days', 90)]
+
+    def _setup_usage_ui(self):
+        """AI Usage tab: per-model summary of the AI call ledger (func/mgrLedger)"""
+        from PyQt6.QtWidgets import QTableWidget, QComboBox, QHeaderView
+
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+
+        header = QHBoxLayout()
+        title = QLabel("AI Usage by Model")
+        title.setStyleSheet("font-size: 16px; font-weight: bold; color: #3b82f6;")
+        header.addWidget(title, 1)
+        self.usage_period = QComboBox()
+        for label, _ in self.USAGE_PERIODS:
+            self.usage_period.addItem(label)
+        self.usage_period.setCurrentIndex(1)
+        self.usage_period.currentIndexChanged.connect(self.refresh_usage)
+        header.addWidget(self.usage_period)
+        refresh_btn = QPushButton("🔄 Refresh")
+        refresh_btn.clicked.connect(self.refresh_usage)
+        header.addWidget(refresh_btn)
+        layout.addLayout(header)
+
+        def table(columns):
+            t = QTableWidget(0, len(columns))
+            t.setHorizontalHeaderLabels(columns)
+            t.setAlternatingRowColors(True)
+            t.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+            t.verticalHeader().hide()
+            t.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+            return t
+
+        self.usage_models_table = table(['Model', 'Calls', 'Failed', 'Retries', 'Input tok', 'Output tok',
+                                         'Cost ($)', 'Avg latency', 'First chunk', 'Output tok/s'])
+        layout.addWidget(self.usage_models_table, 2)
+
+        self.usage_total_label = QLabel("")
+        self.usage_total_label.setStyleSheet("color: #888;")
+        layout.addWidget(self.usage_total_label)
+
+        tasks_title = QLabel("Most Expensive Tasks")
+        tasks_title.setStyleSheet("font-size: 14px; font-weight: bold; color: #3b82f6; margin-top: 8px;")
+        layout.addWidget(tasks_title)
+        self.usage_tasks_table = table(['Task', 'Started', 'Calls', 'Input tok', 'Output tok', 'Cost ($)'])
+        layout.addWidget(self.usage_tasks_table, 1)
+
+        note = QLabel("Cost is estimated from list prices (func/mgrLedger.PRICES); cached responses cost nothing.")
+        note.setStyleSheet("color: #666; font-size: 11px;")
+        layout.addWidget(note)
+
+        self.sw.tabWidget.addTab(tab, "AI Usage")
+        self.sw.tabWidget.currentChanged.connect(
+            lambda i: self.refresh_usage() if self.sw.tabWidget.widget(i) is tab else None)
+
+    def refresh_usage(self):
+        """Reload the AI Usage tables from the ledger"""
+        if not hasattr(self, 'usage_models_table'):
+            return
+        from datetime import datetime
+        from func.mgrLedger import get_ledger
+
+        days = self.USAGE_PERIODS[self.usage_period.currentIndex()][1]
+        try:
+            ledger = get_ledger()
+            models, tasks = ledger.model_summary(days), ledger.task_summary(days)
+        except Exception as e:
+            self.usage_total_label.setText(f"Ledger unavailable: {e}")
+            return
+
+        secs = lambda ms: f"{ms / 1000:.1f}s" if ms else "-"
+        self._fill_table(self.usage_models_table, [
+            [r['model'], r['calls'], r['errors'], r['retries'], f"{r['input_tokens'] or 0:,}",
+             f"{r['output_tokens'] or 0:,}", f"{r['cost_usd'] or 0:.3f}", secs(r['avg_latency_ms']),
+             secs(r['avg_ttfb_ms']), f"{r['output_tps']:.0f}" if r['output_tps'] else "-"] for r in models])
+        self._fill_table(self.usage_tasks_table, [
+            [r['task_name'], datetime.fromtimestamp(r['started']).strftime('%m-%d %H:%M'), r['calls'],
+             f"{r['input_tokens'] or 0:,}", f"{r['output_tokens'] or 0:,}", f"{r['cost_usd'] or 0:.3f}"]
+            for r in tasks])
+
+        calls = sum(r['calls'] for r in models)
+        cost = sum(r['cost_usd'] or 0 for r in models)
+        hits = sum(r['cache_hits'] or 0 for r in models)
+        self.usage_total_label.setText(f"Total: {calls:,} calls ({hits:,} from response cache), ~${cost:.2f}")
+
+    def _fill_table(self, table, rows):
+        table.setRowCount(0)
+        for values in rows:
+            row = table.rowCount()
+            table.insertRow(row)
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if col:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(row, col, item)
+
     def _create_toggle_row(self, key, label, description, initial_value):
         """Create a toggle row widget"""
         container = QWidget()
@@ -46,26 +46,26 @@ def get_base_style():
 
 # === LIST WIDGETS ===
 def get_list_style():
-    """Stylesheet for QListWidget"""
+    """Stylesheet for QListWidget and RecordListView (model-backed lists)"""
     return f"""
-        QListWidget {{
+        QListWidget, RecordListView {{
             background-color: {C['bg_secondary']};
             border: none;
             border-radius: 8px;
             padding: 4px;
             outline: none;
         }}
-        QListWidget::item {{
+        QListWidget::item, RecordListView::item {{
             background-color: transparent;
             border-radius: 6px;
             padding: 8px 12px;
             margin: 2px 4px;
         }}
-        QListWidget::item:selected {{
+        QListWidget::item:selected, RecordListView::item:selected {{
             background-color: {C['bg_tertiary']};
             border: 1px solid {C['border']};
         }}
-        QListWidget::item:hover:!selected {{
+        QListWidget::item:hover:!selected, RecordListView::item:hover:!selected {{
             background-color: {C['bg_card']};
         }}
     """
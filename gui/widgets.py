@@ -1,10 +1,13 @@
 """Merged widgets: delegates, toast, toggle, progress"""
+import math
+import time
 from PyQt6.QtWidgets import (QStyledItemDelegate, QWidget, QLabel, QHBoxLayout,
                               QVBoxLayout, QGraphicsDropShadowEffect, QCheckBox,
-                              QProgressBar, QTextEdit, QSplitter, QTabWidget)
-from PyQt6.QtGui import QPainter, QColor, QFont, QPen
+                              QProgressBar, QTextEdit, QSplitter, QTabWidget,
+                              QStyle, QAbstractItemView)
+from PyQt6.QtGui import QPainter, QColor, QFont, QPen, QPixmap
 from PyQt6.QtCore import (Qt, QPoint, QRect, QSize, QTimer, QPropertyAnimation,
-                          QEasingCurve, pyqtProperty, QRectF, QPointF)
+                          QEasingCurve, pyqtProperty, QRectF, QPointF, QObject, pyqtSignal)
 from datetime import datetime
 
 
@@ -44,8 +47,96 @@ class FileItemDelegate(QStyledItemDelegate):
         return size
 
 
+URGENCY_HORIZON = 168       # hours; later deadlines share the calmest colour (bucket HORIZON + 1)
+_SELECTED = QStyle.StateFlag.State_Selected
+_HOVER = QStyle.StateFlag.State_MouseOver
+_VCENTER_LEFT = Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft
+
+
+def _urgency_colors(hours):
+    """(normal, selected) background for an hour bucket (≤0 = overdue)"""
+    if hours <= 0:
+        r, g, base_alpha = 100, 0, 150
+    else:
+        urgency = math.exp(-3 * min(hours / URGENCY_HORIZON, 1.0))
+        r = int(urgency ** 0.7 * 100)
+        g = int((1 - urgency ** 1.5) * 100)
+        base_alpha = int(60 + urgency * 90)
+    return QColor(r, g, 0, base_alpha), QColor(r, g, 0, 255)
+
+
+# Index = hour bucket: 0 = overdue, 1..HORIZON = hours left (rounded up), HORIZON + 1 = later
+_URGENCY = [_urgency_colors(h) for h in range(URGENCY_HORIZON + 2)]
+_HISTORY_OVERDUE = (QColor(59, 130, 246, 120), QColor(59, 130, 246, 255))
+
+# Launcher date colour by deadline: (hours left up to, colour, flame)
+_DATE_LEVELS = [(24, QColor(239, 68, 68), True), (72, QColor(245, 158, 11), False),
+                (168, QColor(234, 179, 8), False), (float('inf'), QColor(139, 148, 158), False)]
+
+_due = {}                   # due string → (epoch seconds, 'mm/dd') or None; parsed once per value
+_buckets = {}               # due string → hour bucket at the current clock minute
+
+
+def _due_info(todo):
+    """(due string, epoch, 'mm/dd') of todo, or None"""
+    if not isinstance(todo, dict):
+        return None
+    due_date = todo.get('due_date') or todo.get('assignment_details', {}).get('due_at')
+    if not due_date:
+        return None
+    info = _due.get(due_date, False)
+    if info is False:
+        try:
+            dt = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
+            info = (dt.timestamp(), dt.strftime('%m/%d'))
+        except (ValueError, TypeError, AttributeError):
+            info = None
+        if len(_due) > 50000:
+            _due.clear()
+        _due[due_date] = info
+    return (due_date,) + info if info else None
+
+
+def _bucket(due):
+    """Hour bucket of a _due_info tuple (recomputed once per clock minute)"""
+    b = _buckets.get(due[0])
+    if b is None:
+        hours = (due[1] - _clock.now) / 3600
+        b = _buckets[due[0]] = 0 if hours <= 0 else min(math.ceil(hours), URGENCY_HORIZON + 1)
+    return b
+
+
+class _UrgencyClock(QObject):
+    """Single minute tick shared by all todo delegates: clears the bucket cache and repaints"""
+    ticked = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.now = time.time()
+        self._timer = None
+
+    def start(self):
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.timeout.connect(self._tick)
+            self._timer.start(60 * 1000)
+
+    def _tick(self):
+        self.now = time.time()
+        _buckets.clear()
+        self.ticked.emit()
+
+
+_clock = _UrgencyClock()
+
+
 class TodoItemDelegate(QStyledItemDelegate):
-    """Custom delegate for TODO items with colored indicator dots and type labels"""
+    """Custom delegate for TODO items with colored indicator dots and type labels
+
+    Paint does no date parsing and builds no colours or fonts: due dates are parsed
+    once per value, urgency is an hour bucket refreshed on the shared minute tick,
+    colours are precomputed per bucket, fonts/text widths/dot pixmaps are cached.
+    """
     DOTS = [
         ('automatable', QColor(239, 68, 68)),
         ('discussion', QColor(59, 130, 246)),
@@ -66,120 +157,171 @@ class TodoItemDelegate(QStyledItemDelegate):
         'BISC': QColor(16, 185, 129),    # green
         'A-I': QColor(59, 130, 246),     # blue
     }
+    DEFAULT_COURSE_COLOR = QColor(59, 130, 246)
+    CARD_BG = (QColor(24, 27, 33), QColor(34, 27, 33))
+    TAG_BG = QColor(255, 255, 255, 26)
+    BLACK, LABEL_PEN, DATE_PEN = QColor(0, 0, 0), QColor(220, 220, 220), QColor(180, 180, 180)
+    CODE_PEN, TASK_PEN = QColor(139, 148, 158), QColor(224, 224, 224)
 
     def __init__(self, parent=None, history_mode=False, launcher_mode=False):
         super().__init__(parent)
         self.history_mode = history_mode
         self.launcher_mode = launcher_mode
+        self._fonts = None          # Built on first paint (needs the view font)
+        self._widths = {'label': {}, 'list_date': {}, 'date': {}}  # font → {text: width}
+        self._pixmaps = {}          # (kind, dpr) → QPixmap
+        self._height = None
+        _clock.start()
+        if isinstance(parent, QAbstractItemView):
+            _clock.ticked.connect(self._on_tick)
+
+    @classmethod
+    def install(cls, view, history_mode=False, launcher_mode=False):
+        """Make view paint with its TodoItemDelegate - one per view, reused on every repopulate
+
+        A delegate parented to the view lives as long as the view: creating one per
+        populate would pile them up, each with its caches and minute-tick connection.
+        """
+        delegate = view.findChild(cls, options=Qt.FindChildOption.FindDirectChildrenOnly)
+        if delegate is None:
+            delegate = cls(view, history_mode, launcher_mode)
+        elif (delegate.history_mode, delegate.launcher_mode) != (history_mode, launcher_mode):
+            delegate.history_mode, delegate.launcher_mode = history_mode, launcher_mode
+            delegate._height = None  # sizeHint depends on the mode
+        if view.itemDelegate() is not delegate:
+            view.setItemDelegate(delegate)
+        view.viewport().update()
+        return delegate
+
+    def _on_tick(self):
+        self.parent().viewport().update()
+
+    def _init_fonts(self, base):
+        label = QFont(base)
+        label.setPointSize(8)
+        label.setBold(True)
+        list_date = QFont(base)
+        list_date.setPointSize(8)
+        code = QFont('SF Mono, Consolas, monospace')
+        code.setPointSize(9)
+        task = QFont()
+        task.setPointSize(10)
+        task.setWeight(QFont.Weight.Medium)
+        tag = QFont()
+        tag.setPointSize(8)
+        date = QFont()
+        date.setPointSize(9)
+        date.setBold(True)
+        self._fonts = {'label': label, 'list_date': list_date, 'code': code, 'task': task, 'tag': tag, 'date': date}
+
+    def _width(self, p, font, text):
+        """Width of text in fonts[font] (the painter's current font)"""
+        widths = self._widths[font]
+        w = widths.get(text)
+        if w is None:
+            w = widths[text] = p.fontMetrics().boundingRect(text).width()
+        return w
+
+    def _pixmap(self, kind, dpr):
+        """Dot of a DOTS colour (kind = index) or the flame glyph (kind = 'flame')"""
+        pm = self._pixmaps.get((kind, dpr))
+        if pm is None:
+            w, h = (12, 20) if kind == 'flame' else (12, 12)
+            pm = QPixmap(int(w * dpr), int(h * dpr))
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(Qt.GlobalColor.transparent)
+            q = QPainter(pm)
+            q.setRenderHint(QPainter.RenderHint.Antialiasing)
+            q.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+            if kind == 'flame':
+                font = QFont()
+                font.setPointSize(11)
+                q.setFont(font)
+                q.drawText(0, 0, w, h, Qt.AlignmentFlag.AlignCenter, '🔥')
+            else:
+                q.setPen(self.BLACK)
+                q.setBrush(self.DOTS[kind][1])
+                q.drawEllipse(QPoint(6, 6), 5, 5)
+            q.end()
+            self._pixmaps[(kind, dpr)] = pm
+        return pm
+
+    def _background(self, due, selected):
+        bucket = _bucket(due)
+        if self.history_mode:
+            return _HISTORY_OVERDUE[selected] if bucket == 0 else None
+        return _URGENCY[bucket][selected]
 
     def paint(self, p, opt, idx):
-        from PyQt6.QtWidgets import QStyle
-        is_selected = opt.state & QStyle.StateFlag.State_Selected
-
+        if self._fonts is None:
+            self._init_fonts(p.font())
         if self.launcher_mode:
             self._paint_launcher_card(p, opt, idx)
             return
 
+        is_selected = bool(opt.state & _SELECTED)
         todo = idx.data(Qt.ItemDataRole.UserRole + 1)
-        urgency_color = None
-        if todo and isinstance(todo, dict):
-            due_date = todo.get('due_date') or todo.get('assignment_details', {}).get('due_at')
-            if due_date:
-                try:
-                    dt = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    now = datetime.now(dt.tzinfo)
-                    hours_left = (dt - now).total_seconds() / 3600
-
-                    if self.history_mode and hours_left <= 0:
-                        alpha = 255 if is_selected else 120
-                        urgency_color = QColor(59, 130, 246, alpha)
-                    elif not self.history_mode:
-                        if hours_left <= 0:
-                            r, g, base_alpha = 100, 0, 150
-                        else:
-                            t = min(hours_left / 168, 1.0)
-                            import math
-                            urgency = math.exp(-3 * t)
-                            r = int(urgency ** 0.7 * 100)
-                            g = int((1 - urgency ** 1.5) * 100)
-                            base_alpha = int(60 + urgency * 90)
-                        alpha = 255 if is_selected else base_alpha
-                        urgency_color = QColor(r, g, 0, alpha)
-                except: pass
-
-        if urgency_color:
-            p.fillRect(opt.rect, urgency_color)
-
-        opt_copy = opt.__class__(opt)
-        if is_selected:
-            opt_copy.state &= ~QStyle.StateFlag.State_Selected
-        opt_copy.state &= ~QStyle.StateFlag.State_MouseOver
-        super().paint(p, opt_copy, idx)
+        due = _due_info(todo)
+        if due:
+            urgency_color = self._background(due, is_selected)
+            if urgency_color is not None:
+                p.fillRect(opt.rect, urgency_color)
+
+        # Base text without selection/hover chrome (option state restored afterwards, no copy)
+        state = opt.state
+        opt.state = state & ~(_SELECTED | _HOVER)
+        super().paint(p, opt, idx)
+        opt.state = state
 
         m = idx.data(Qt.ItemDataRole.UserRole)
         if not m or 'dots' not in m: return
+        dots = m['dots']
+        if not any(dots.get(key) for key, _ in self.DOTS):
+            return
+
         p.save()
         p.setRenderHint(QPainter.RenderHint.Antialiasing)
         p.setRenderHint(QPainter.RenderHint.TextAntialiasing)
 
-        x_dot = opt.rect.right() - 10
-        y = opt.rect.center().y()
-
-        active_types = [(key, color) for key, color in self.DOTS if m['dots'].get(key)]
+        rect = opt.rect
+        top, height = rect.top(), rect.height()
+        y = rect.center().y()
+        dpr = p.device().devicePixelRatioF()
 
-        if active_types:
-            x = x_dot
-            for key, color in active_types:
+        x = rect.right() - 10
+        for i, (key, _) in enumerate(self.DOTS):
+            if dots.get(key):
                 x -= 10
-                p.setPen(QColor(0, 0, 0))
-                p.setBrush(color)
-                p.drawEllipse(QPoint(x + 5, y), 5, 5)
+                p.drawPixmap(x - 1, y - 6, self._pixmap(i, dpr))
                 x -= 6
 
-            label_x = x - 5
-
-            label_font = QFont(p.font())
-            label_font.setPointSize(8)
-            label_font.setBold(True)
-            p.setFont(label_font)
-
-            p.setPen(QColor(220, 220, 220))
-            for key, color in active_types:
-                label = self.TYPE_LABELS.get(key, '')
-                if label:
-                    label_rect = p.fontMetrics().boundingRect(label)
-                    label_x -= label_rect.width()
-                    p.drawText(QRect(label_x, opt.rect.top(), label_rect.width(), opt.rect.height()),
-                              Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, label)
-                    label_x -= 4
-
-            if todo and isinstance(todo, dict):
-                due_date = todo.get('due_date') or todo.get('assignment_details', {}).get('due_at')
-                if due_date:
-                    try:
-                        dt = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                        due_text = dt.strftime('%m/%d')
-                        date_font = QFont(p.font())
-                        date_font.setPointSize(8)
-                        p.setFont(date_font)
-                        p.setPen(QColor(180, 180, 180))
-                        date_text_rect = p.fontMetrics().boundingRect(due_text)
-                        date_x = label_x - date_text_rect.width() - 6
-                        p.drawText(QRect(date_x, opt.rect.top(), date_text_rect.width(), opt.rect.height()),
-                                  Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, due_text)
-                    except: pass
+        label_x = x - 5
+        p.setFont(self._fonts['label'])
+        p.setPen(self.LABEL_PEN)
+        for key, _ in self.DOTS:
+            label = self.TYPE_LABELS.get(key) if dots.get(key) else None
+            if label:
+                w = self._width(p, 'label', label)
+                label_x -= w
+                p.drawText(label_x, top, w, height, _VCENTER_LEFT, label)
+                label_x -= 4
+
+        if due:
+            due_text = due[2]
+            p.setFont(self._fonts['list_date'])
+            w = self._width(p, 'list_date', due_text)
+            p.setPen(self.DATE_PEN)
+            p.drawText(label_x - w - 6, top, w, height, _VCENTER_LEFT, due_text)
 
         p.restore()
 
     def _paint_launcher_card(self, p, opt, idx):
         """Paint launcher-style card with course code, task name, date, and type tag"""
-        from PyQt6.QtWidgets import QStyle
-        import math
-
-        is_selected = opt.state & QStyle.StateFlag.State_Selected
         todo = idx.data(Qt.ItemDataRole.UserRole + 1)
         if not todo:
             return
+        is_selected = bool(opt.state & _SELECTED)
+        fonts = self._fonts
 
         p.save()
         p.setRenderHint(QPainter.RenderHint.Antialiasing)
@@ -187,138 +329,130 @@ class TodoItemDelegate(QStyledItemDelegate):
 
         # Card geometry with margins
         margin = 4
-        card_rect = opt.rect.adjusted(margin, margin, -margin, -margin)
+        rect = opt.rect
+        left, top = rect.left() + margin, rect.top() + margin
+        width, height = rect.width() - 2 * margin, rect.height() - 2 * margin
 
         # Background
-        bg_color = QColor(34, 27, 33) if is_selected else QColor(24, 27, 33)
-        p.setBrush(bg_color)
+        p.setBrush(self.CARD_BG[is_selected])
         p.setPen(Qt.PenStyle.NoPen)
-        p.drawRoundedRect(card_rect, 12, 12)
+        p.drawRoundedRect(left, top, width, height, 12, 12)
 
         # Left border (course color)
         course_name = todo.get('course_name', '')
-        course_prefix = course_name.split()[0] if course_name else ''
-        border_color = self.COURSE_COLORS.get(course_prefix, QColor(59, 130, 246))
-        border_rect = QRectF(card_rect.left(), card_rect.top(), 4, card_rect.height())
-        p.setBrush(border_color)
-        p.drawRoundedRect(border_rect, 2, 2)
+        course_prefix = course_name.split(None, 1)[0] if course_name else ''
+        p.setBrush(self.COURSE_COLORS.get(course_prefix, self.DEFAULT_COURSE_COLOR))
+        p.drawRoundedRect(left, top, 4, height, 2, 2)
 
         # Text area
-        text_x = card_rect.left() + 20
-        text_y = card_rect.top() + 10
-        text_width = card_rect.width() - 140
+        text_x = left + 20
+        text_y = top + 10
+        text_width = width - 140
 
         # Course code (small, gray, monospace)
-        code_font = QFont('SF Mono, Consolas, monospace')
-        code_font.setPointSize(9)
-        p.setFont(code_font)
-        p.setPen(QColor(139, 148, 158))
-        p.drawText(QRectF(text_x, text_y, text_width, 16),
-                   Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
-                   course_name)
+        p.setFont(fonts['code'])
+        p.setPen(self.CODE_PEN)
+        p.drawText(text_x, text_y, text_width, 16, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, course_name)
 
         # Task name (normal size, white)
-        task_font = QFont()
-        task_font.setPointSize(10)
-        task_font.setWeight(QFont.Weight.Medium)
-        p.setFont(task_font)
-        p.setPen(QColor(224, 224, 224))
-        task_name = todo.get('name', '')
-        p.drawText(QRectF(text_x, text_y + 20, text_width, 20),
-                   Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
-                   task_name)
+        p.setFont(fonts['task'])
+        p.setPen(self.TASK_PEN)
+        p.drawText(text_x, text_y + 20, text_width, 20, _VCENTER_LEFT, todo.get('name', ''))
 
         # Right side: date and type tag
-        right_x = card_rect.right() - 10
-        right_y = card_rect.center().y()
+        right_x = left + width - 10
+        right_y = top + height // 2
 
         # Type tag (small, gray background)
         m = idx.data(Qt.ItemDataRole.UserRole)
         type_label = ''
         if m and 'dots' in m:
             dots = m['dots']
-            if dots.get('quiz'):
-                type_label = 'QZ'
-            elif dots.get('discussion'):
-                type_label = 'DB'
-            else:
-                type_label = 'HW'
-
-        tag_font = QFont()
-        tag_font.setPointSize(8)
-        p.setFont(tag_font)
-        tag_width = 24
-        tag_height = 18
-        tag_rect = QRectF(right_x - tag_width, right_y - tag_height/2, tag_width, tag_height)
-        p.setBrush(QColor(255, 255, 255, 26))
+            type_label = 'QZ' if dots.get('quiz') else 'DB' if dots.get('discussion') else 'HW'
+
+        tag_width, tag_height = 24, 18
+        tag_x, tag_y = right_x - tag_width, right_y - tag_height // 2
+        p.setFont(fonts['tag'])
+        p.setBrush(self.TAG_BG)
         p.setPen(Qt.PenStyle.NoPen)
-        p.drawRoundedRect(tag_rect, 4, 4)
-        p.setPen(QColor(139, 148, 158))
-        p.drawText(tag_rect, Qt.AlignmentFlag.AlignCenter, type_label)
+        p.drawRoundedRect(tag_x, tag_y, tag_width, tag_height, 4, 4)
+        p.setPen(self.CODE_PEN)
+        p.drawText(tag_x, tag_y, tag_width, tag_height, Qt.AlignmentFlag.AlignCenter, type_label)
 
         # Date (colored by urgency) with flame icon for urgent tasks
-        due_date = todo.get('due_date') or todo.get('assignment_details', {}).get('due_at')
-        if due_date:
-            try:
-                dt = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                now = datetime.now(dt.tzinfo)
-                hours_left = (dt - now).total_seconds() / 3600
-
-                date_text = dt.strftime('%m/%d')
-                show_flame = False
-
-                # Color by urgency levels
-                if hours_left <= 0:
-                    date_color = QColor(239, 68, 68)  # red (overdue)
-                    show_flame = True
-                elif hours_left <= 24:
-                    date_color = QColor(239, 68, 68)  # red (<24h)
-                    show_flame = True
-                elif hours_left <= 72:  # 1-3 days
-                    date_color = QColor(245, 158, 11)  # orange
-                elif hours_left <= 168:  # 3-7 days
-                    date_color = QColor(234, 179, 8)  # yellow
-                else:
-                    date_color = QColor(139, 148, 158)  # gray
-
-                date_font = QFont()
-                date_font.setPointSize(9)
-                date_font.setBold(True)
-                p.setFont(date_font)
-                p.setPen(date_color)
-
-                date_rect = p.fontMetrics().boundingRect(date_text)
-                flame_width = 12 if show_flame else 0
-                total_width = date_rect.width() + flame_width + (3 if show_flame else 0)
-                date_x = right_x - tag_width - total_width - 10
-
-                # Draw date text
-                p.drawText(QRectF(date_x, right_y - 10, date_rect.width(), 20),
-                          Qt.AlignmentFlag.AlignCenter, date_text)
-
-                # Draw flame icon for urgent tasks
-                if show_flame:
-                    flame_font = QFont()
-                    flame_font.setPointSize(11)
-                    p.setFont(flame_font)
-                    flame_x = date_x + date_rect.width() + 3
-                    p.drawText(QRectF(flame_x, right_y - 10, flame_width, 20),
-                              Qt.AlignmentFlag.AlignCenter, '🔥')
-            except:
-                pass
+        due = _due_info(todo)
+        if due:
+            bucket = _bucket(due)
+            date_color, show_flame = next((c, f) for limit, c, f in _DATE_LEVELS if bucket <= limit)
+            date_text = due[2]
+            p.setFont(fonts['date'])
+            p.setPen(date_color)
+            w = self._width(p, 'date', date_text)
+            flame_width = 12 if show_flame else 0
+            total_width = w + flame_width + (3 if show_flame else 0)
+            date_x = right_x - tag_width - total_width - 10
+            p.drawText(date_x, right_y - 10, w, 20, Qt.AlignmentFlag.AlignCenter, date_text)
+            if show_flame:
+                p.drawPixmap(date_x + w + 3, right_y - 10, self._pixmap('flame', p.device().devicePixelRatioF()))
 
         p.restore()
 
     def sizeHint(self, opt, idx):
-        s = super().sizeHint(opt, idx)
-        if self.launcher_mode:
-            s.setHeight(max(s.height(), 60))  # Taller cards for launcher
-        else:
-            s.setHeight(max(s.height(), 36))
+        # Row height depends only on the font: measured once, then reused
+        if self._height is None:
+            s = super().sizeHint(opt, idx)
+            self._height = max(s.height(), 60 if self.launcher_mode else 36)  # Taller cards for launcher
         # Use full available width - no width constraint on cards
-        if hasattr(opt, 'rect'):
-            s.setWidth(opt.rect.width())
-        return s
+        return QSize(opt.rect.width(), self._height)
+
+
+def benchmark_todo_delegate(rows=2000, rounds=5, launcher_mode=False):
+    """
+    Paint/sizeHint micro-benchmark of TodoItemDelegate (needs a QApplication)
+
+    Paints every row of a synthetic todo list into an offscreen image.
+
+    Returns:
+        dict: paint_us, size_hint_us (per row, best round), rows
+    """
+    from PyQt6.QtGui import QImage, QStandardItemModel, QStandardItem
+    from PyQt6.QtWidgets import QListView, QStyleOptionViewItem
+
+    now = time.time()
+    model = QStandardItemModel()
+    for i in range(rows):
+        due = datetime.fromtimestamp(now + (i % 400 - 50) * 3600 + i).astimezone().isoformat()
+        item = QStandardItem(f"CMPSC 131 - Assignment {i}")
+        item.setData({'dots': {'automatable': i % 2 == 0, 'quiz': i % 3 == 0, 'homework': i % 3 != 0}},
+                     Qt.ItemDataRole.UserRole)
+        item.setData({'name': f"Assignment {i}", 'course_name': 'CMPSC 131', 'due_date': due},
+                     Qt.ItemDataRole.UserRole + 1)
+        model.appendRow(item)
+    view = QListView()
+    view.setModel(model)
+    delegate = TodoItemDelegate(view, launcher_mode=launcher_mode)
+    indexes = [model.index(i, 0) for i in range(rows)]
+
+    height = 60 if launcher_mode else 36
+    image = QImage(480, height, QImage.Format.Format_ARGB32_Premultiplied)
+    opt = QStyleOptionViewItem()
+    opt.rect = QRect(0, 0, 480, height)
+    opt.font, opt.palette = view.font(), view.palette()
+    opt.state = QStyle.StateFlag.State_Enabled
+
+    painter = QPainter(image)
+    paint, size = float('inf'), float('inf')
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for index in indexes:
+            delegate.paint(painter, opt, index)
+        t1 = time.perf_counter()
+        for index in indexes:
+            delegate.sizeHint(opt, index)
+        t2 = time.perf_counter()
+        paint, size = min(paint, t1 - t0), min(size, t2 - t1)
+    painter.end()
+    return {'paint_us': paint / rows * 1e6, 'size_hint_us': size / rows * 1e6, 'rows': rows}
 
 
 class CourseItemDelegate(QStyledItemDelegate):
@@ -625,3 +759,15 @@ def create_console_with_progress(console_tab_widget, tab_name):
     console_tab_widget.setCurrentWidget(splitter)
 
     return console_widget, progress_widget
+
+
+if __name__ == '__main__':
+    # Delegate paint micro-benchmark: python -m gui.widgets [rows]
+    import sys
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for launcher in (False, True):
+        r = benchmark_todo_delegate(rows, launcher_mode=launcher)
+        print(f"{'launcher' if launcher else 'list':<8} paint {r['paint_us']:6.1f} µs/row, "
+              f"sizeHint {r['size_hint_us']:5.2f} µs/row ({rows} rows)")